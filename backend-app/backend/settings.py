@@ -19,8 +19,42 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / '.env')
 ZS_MODE = os.getenv("ZS_MODE", "mock").lower()
 ZAPSIGN_BASE = os.getenv("ZAPSIGN_BASE", "https://sandbox.api.zapsign.com.br/api/v1")
+ZAPSIGN_WEBHOOK_SECRET = os.getenv("ZAPSIGN_WEBHOOK_SECRET", "")   # header X-ZapSign-Secret do webhook
+ZS_POOL_SIZE = int(os.getenv("ZS_POOL_SIZE", "10"))               # conexões keep-alive por processo
+ZS_ASYNC_POOL_SIZE = int(os.getenv("ZS_ASYNC_POOL_SIZE", "200"))  # conexões simultâneas à ZapSign por worker ASGI (views async)
+ZS_ASYNC_KEEPALIVE = int(os.getenv("ZS_ASYNC_KEEPALIVE", "20"))   # conexões ociosas mantidas no pool async
+ZS_CONNECT_TIMEOUT = float(os.getenv("ZS_CONNECT_TIMEOUT", "5"))
+ZS_CREATE_TIMEOUT = float(os.getenv("ZS_CREATE_TIMEOUT", "20"))   # leitura em POST /docs/
+ZS_STATUS_TIMEOUT = float(os.getenv("ZS_STATUS_TIMEOUT", "10"))   # leitura em GET /docs/<token>/
+ZS_MAX_RETRIES = int(os.getenv("ZS_MAX_RETRIES", "3"))            # 429/5xx, com backoff + Retry-After
+ZS_DISPATCH = os.getenv("ZS_DISPATCH", "inline").lower()  # inline | queue (ver process_zapsign_queue)
+ZS_MAX_WORKERS = int(os.getenv("ZS_MAX_WORKERS", "8"))          # envios concorrentes no lote
+AUTOMATION_BULK_MAX = int(os.getenv("AUTOMATION_BULK_MAX", "500"))  # itens por chamada em /create_send/bulk/
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "60"))  # segundos; 0 desliga o cache local de X-API-Key
+API_KEY_CACHE_MAX_ENTRIES = int(os.getenv("API_KEY_CACHE_MAX_ENTRIES", "1024"))  # LRU em memória
+API_KEY_CACHE_ALIAS = os.getenv("API_KEY_CACHE_ALIAS", "")  # alias em CACHES (ex.: redis) compartilhado entre processos; vazio = só local
+REPORT_PAGE_SIZE = int(os.getenv("REPORT_PAGE_SIZE", "200"))  # itens por página do relatório (?limit=)
+REPORT_STREAM_CHUNK = int(os.getenv("REPORT_STREAM_CHUNK", "500"))  # linhas por fetch no ?output=ndjson
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))  # por quanto tempo uma Idempotency-Key repete a resposta
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "300"))  # chave "em andamento" mais velha que isso foi abandonada e pode ser retomada
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # middleware + /metrics (queries, chamadas externas, latência)
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"  # header Server-Timing nas respostas (expõe tempos internos: só dev)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # /metrics exige "Authorization: Bearer <token>"; sem token, 403
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"  # /metrics sem token (só em rede interna)
 AI_MODE = os.getenv("AI_MODE", "mock").lower()   # openai no seu caso
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_BASE = os.getenv("OPENAI_BASE", "https://api.openai.com/v1")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "25"))
+AI_CHUNK_TOKENS = int(os.getenv("AI_CHUNK_TOKENS", "3000"))        # orçamento por trecho (map-reduce)
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))     # requests simultâneos à OpenAI
+AI_ASYNC_MAX_CONCURRENCY = int(os.getenv("AI_ASYNC_MAX_CONCURRENCY", "64"))  # idem, por worker ASGI (views async)
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(25 * 1024 * 1024)))  # corte duro do download
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "2"))          # processos p/ extrair páginas
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))                     # 0 = todas
+PDF_TEXT_REVALIDATE_SECONDS = int(os.getenv("PDF_TEXT_REVALIDATE_SECONDS", "3600"))  # sem download nesse intervalo
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", str(7 * 24 * 3600)))   # segundos; 0 desliga o cache
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "10000"))  # LRU por last_used_at
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
@@ -61,6 +95,43 @@ CORS_ALLOWED_ORIGINS = [
 
 REST_FRAMEWORK = { 
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # sem ?limit= as listagens continuam devolvendo o array inteiro
+    "DEFAULT_PAGINATION_CLASS": "documents.pagination.OptInLimitOffsetPagination",
+    # orjson (mesma saída do JSONRenderer/JSONParser do DRF, bem mais rápido em payloads grandes)
+    "DEFAULT_RENDERER_CLASSES": [
+        "documents.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "documents.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Logs em JSON no stdout, escritos por um thread (QueueListener) fora do caminho da request.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "documents.usecases.get_status=0.1")  # logger=fração dos DEBUG/INFO mantidos
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "correlation": {"()": "documents.logs.CorrelationFilter"},
+        "sampling": {"()": "documents.logs.SamplingFilter", "rates": LOG_SAMPLE_RATES},
+    },
+    "handlers": {
+        "queue": {
+            "()": "documents.logs.QueueLogHandler",
+            "fmt": LOG_FORMAT,
+            "filters": ["sampling", "correlation"],
+        },
+    },
+    "root": {"handlers": ["queue"], "level": LOG_LEVEL},
+    "loggers": {
+        # sem o console padrão do Django em DEBUG: tudo sai pela fila
+        "django": {"handlers": ["queue"], "level": "INFO", "propagate": False},
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -81,6 +152,8 @@ SPECTACULAR_SETTINGS = {
 } 
 
 MIDDLEWARE = [
+    "documents.metrics.RequestMetricsMiddleware",  # primeiro: mede a request inteira
+    "documents.logs.RequestIdMiddleware",  # X-Request-ID -> request_id nos logs
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
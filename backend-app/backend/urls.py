@@ -19,12 +19,15 @@ from django.urls import include, path
 from django.http import JsonResponse
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from documents.metrics import metrics_view
+
 def health(_):
     return JsonResponse({"status": "ok"})
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', health),
+    path("metrics", metrics_view),  # Prometheus (sem barra final, como o scrape padrão)
     path("api/", include("documents.urls")),
     path("automations/", include("documents.urls")),
     # OpenAPI JSON
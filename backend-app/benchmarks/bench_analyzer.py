@@ -0,0 +1,104 @@
+"""Benchmark do analisador local (AI_MODE=mock).
+
+Compara TextAnalyzer com a implementação anterior de _mock_analyze em
+textos grandes e confere que o resultado é idêntico.
+
+    cd backend-app && python benchmarks/bench_analyzer.py [--words 200000] [--repeat 5]
+"""
+import argparse
+import pathlib
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from documents.services.ai import STOPWORDS, TextAnalyzer  # noqa: E402
+
+
+def legacy_analyze(text: str) -> dict:
+    # cópia fiel de _mock_analyze antes do TextAnalyzer
+    txt = (text or "").strip()
+    words = re.findall(r"\b[\w-]{4,}\b", txt.lower())
+    words = [w for w in words if w not in STOPWORDS]
+    freq = {}
+    for w in words:
+        freq[w] = freq.get(w, 0) + 1
+    topics = [w for w, _ in sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:5]]
+    emails = re.findall(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", txt)
+    money = re.findall(r"(?:R\$\s?\d[\d\.\,]*)", txt)
+    cpf = re.findall(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", txt)
+    cnpj = re.findall(r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b", txt)
+    lower = txt.lower()
+    risk = 10
+    for kw, inc in [
+        ("multa", 15), ("exclusividade", 10), ("indenização", 15),
+        ("prazo indeterminado", 15), ("renovação automática", 10),
+        ("rescisão", -5), ("foro", -5), ("confidencialidade", -5),
+    ]:
+        if kw in lower:
+            risk += inc
+    risk = max(0, min(95, risk))
+    summary = txt[:220] + ("..." if len(txt) > 220 else "")
+    return {
+        "summary": summary or "(sem conteúdo informado)",
+        "topics": topics,
+        "risk_score": risk,
+        "extracted": {"emails": emails, "money": money, "cpf": cpf, "cnpj": cnpj},
+        "flags": [
+            msg for cond, msg in [
+                ("rescisão" not in lower, "Possível falta de cláusula de rescisão"),
+                ("foro" not in lower, "Possível falta de cláusula de foro"),
+                ("confidencialidade" not in lower, "Possível falta de cláusula de confidencialidade"),
+            ] if cond
+        ],
+    }
+
+
+VOCAB = (
+    "contrato de prestação serviços entre as partes CONTRATANTE CONTRATADA pagamento mensal "
+    "vigência obrigações multa rescisão foro comarca São Paulo cliente fornecedor cláusula "
+    "prazo 12-meses reajuste IPCA anexo R$ 1.500,00 12.345.678/0001-99 123.456.789-00 "
+    "juridico@acme.com.br e o a em que para com"
+).split()
+
+
+def make_text(n_words: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    lines, line = [], []
+    for _ in range(n_words):
+        line.append(rnd.choice(VOCAB))
+        if len(line) == 14:
+            lines.append(" ".join(line))
+            line = []
+    return "\n".join(lines)
+
+
+def best_of(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    analyzer = TextAnalyzer()
+    for n in (args.words // 100, args.words // 10, args.words):
+        text = make_text(n)
+        assert analyzer.analyze(text) == legacy_analyze(text), "resultado divergente"
+        old = best_of(legacy_analyze, text, args.repeat)
+        new = best_of(analyzer.analyze, text, args.repeat)
+        print(f"{len(text) / 1e6:6.2f} MB  legado {old * 1000:8.1f} ms  "
+              f"TextAnalyzer {new * 1000:8.1f} ms  speedup {old / new:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
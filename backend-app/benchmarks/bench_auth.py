@@ -0,0 +1,90 @@
+"""Benchmark da autenticação por X-API-Key.
+
+Compara a busca antiga (texto puro, sem índice), a busca pelo hash indexado
+sem cache e o caminho quente (cache em memória, zero queries). Usa o banco do
+.env; os dados são criados numa transação desfeita no final.
+
+    cd backend-app && python benchmarks/bench_auth.py [--companies 20000] [--repeat 2000]
+"""
+import argparse
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from documents.apikeys import get_cache, hash_api_key  # noqa: E402
+from documents.auth import ApiKeyAuthentication  # noqa: E402
+from documents.models import Company  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--companies", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=2_000)
+    args = ap.parse_args()
+
+    try:
+        with transaction.atomic():
+            Company.objects.bulk_create([
+                Company(name=f"C{i}", api_token=f"token-{i:08d}", api_token_hash=hash_api_key(f"token-{i:08d}"))
+                for i in range(args.companies)
+            ], batch_size=2_000)
+            with connection.cursor() as cur:
+                cur.execute(f"ANALYZE {Company._meta.db_table}")
+
+            key = f"token-{args.companies - 1:08d}"
+            request = APIRequestFactory().get("/", HTTP_X_API_KEY=key)
+            auth = ApiKeyAuthentication()
+            cache = get_cache()
+
+            def legacy():
+                Company.objects.filter(api_token=key).first()
+
+            def cold():
+                cache.clear()
+                auth.authenticate(request)
+
+            def warm():
+                auth.authenticate(request)
+
+            results = [
+                ("texto puro (antes)", timed(legacy, args.repeat)),
+                ("hash indexado, sem cache", timed(cold, args.repeat)),
+            ]
+            auth.authenticate(request)
+            with CaptureQueriesContext(connection) as ctx:
+                results.append(("cache quente", timed(warm, args.repeat)))
+            assert not ctx.captured_queries, "caminho quente fez queries"
+
+            print(f"{args.companies} empresas, {args.repeat} autenticações por cenário")
+            for name, us in results:
+                print(f"  {name:<26} {us:9.1f} µs/auth")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
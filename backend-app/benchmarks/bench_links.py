@@ -0,0 +1,105 @@
+"""Benchmark da serialização da listagem de documentos (links hypermedia).
+
+Compara os links antigos (reverse() do DRF por link, por objeto), os templates
+pré-resolvidos (documents/links.py) e `?links=false`. Os objetos são lidos uma
+vez; só a serialização é medida. Dados numa transação desfeita no final.
+
+    cd backend-app && python benchmarks/bench_links.py [--documents 500] [--signers 3] [--repeat 5]
+"""
+import argparse
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.reverse import reverse  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from documents.models import Company, Document, Signer  # noqa: E402
+from documents.serializers import DocumentSerializer, SignerSerializer  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+class LegacySignerSerializer(SignerSerializer):
+    def get_links(self, obj):
+        req = self.context.get("request")
+        return {
+            "self": reverse("signer-detail", args=[obj.pk], request=req),
+            "document": reverse("document-detail", args=[obj.document_id], request=req),
+        }
+
+
+class LegacyDocumentSerializer(DocumentSerializer):
+    signers = LegacySignerSerializer(many=True, required=False)
+
+    def get_links(self, obj):
+        req = self.context.get("request")
+        return {
+            "self": reverse("document-detail", args=[obj.pk], request=req),
+            "send": reverse("document-send-to-zapsign", args=[obj.pk], request=req),
+            "status": reverse("document-status", args=[obj.pk], request=req),
+            "content": reverse("document-content", args=[obj.pk], request=req),
+            "analysis": reverse("document-analysis", args=[obj.pk], request=req),
+        }
+
+
+def timed(serializer_cls, docs, query: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # request nova a cada rodada: o cache de templates por request não vaza entre elas
+        req = Request(APIRequestFactory().get(f"/api/documents/{query}", HTTP_HOST="localhost"))
+        start = time.perf_counter()
+        serializer_cls(docs, many=True, context={"request": req}).data
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--documents", type=int, default=500)
+    ap.add_argument("--signers", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    try:
+        with transaction.atomic():
+            company = Company.objects.create(name="Bench", api_token="bench-links")
+            created = Document.objects.bulk_create([
+                Document(company=company, name=f"Doc {i}", created_by="bench") for i in range(args.documents)
+            ])
+            Signer.objects.bulk_create([
+                Signer(document=d, name=f"S{j}", email=f"s{j}@ex.com")
+                for d in created for j in range(args.signers)
+            ])
+            docs = list(
+                Document.objects.filter(company=company).select_related("company").prefetch_related("signers")
+            )
+
+            results = [
+                ("reverse() por link (antes)", timed(LegacyDocumentSerializer, docs, "", args.repeat)),
+                ("templates pré-resolvidos", timed(DocumentSerializer, docs, "", args.repeat)),
+                ("?links=false", timed(DocumentSerializer, docs, "?links=false", args.repeat)),
+            ]
+            links = args.documents * (5 + 2 * args.signers)
+            print(f"{args.documents} documentos x {args.signers} signatários ({links} links), melhor de {args.repeat}")
+            for name, ms in results:
+                print(f"  {name:<28} {ms:8.1f} ms")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
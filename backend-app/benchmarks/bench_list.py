@@ -0,0 +1,92 @@
+"""Benchmark da listagem de documentos: ORM + DocumentSerializer vs values() + documents/rows.py.
+
+Mede leitura + serialização (o que a listagem faz por request): tempo (melhor de N) e pico
+de memória (tracemalloc). Dados numa transação desfeita no final.
+
+    cd backend-app && python benchmarks/bench_list.py [--documents 1000] [--signers 3] [--repeat 5]
+"""
+import argparse
+import os
+import pathlib
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from documents.models import Company, Document, Signer  # noqa: E402
+from documents.rows import DOCUMENT_COLUMNS, document_rows  # noqa: E402
+from documents.serializers import DocumentSerializer  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def serializer_path(ctx):
+    qs = Document.objects.select_related("company").prefetch_related("signers").order_by("-created_at")
+    return DocumentSerializer(qs, many=True, context=ctx).data
+
+
+def rows_path(ctx):
+    qs = Document.objects.order_by("-created_at", "-id").values(*DOCUMENT_COLUMNS)
+    return document_rows(list(qs), ctx)
+
+
+def measure(fn, repeat: int) -> tuple[float, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        ctx = {"request": Request(APIRequestFactory().get("/api/documents/", HTTP_HOST="localhost"))}
+        start = time.perf_counter()
+        fn(ctx)
+        best = min(best, time.perf_counter() - start)
+    ctx = {"request": Request(APIRequestFactory().get("/api/documents/", HTTP_HOST="localhost"))}
+    tracemalloc.start()
+    fn(ctx)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 2**20
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--documents", type=int, default=1000)
+    ap.add_argument("--signers", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    try:
+        with transaction.atomic():
+            company = Company.objects.create(name="Bench", api_token="bench-list")
+            created = Document.objects.bulk_create([
+                Document(company=company, name=f"Doc {i}", created_by="bench") for i in range(args.documents)
+            ])
+            Signer.objects.bulk_create([
+                Signer(document=d, name=f"S{j}", email=f"s{j}@ex.com")
+                for d in created for j in range(args.signers)
+            ])
+
+            results = [
+                ("ORM + DocumentSerializer", *measure(serializer_path, args.repeat)),
+                ("values() + rows", *measure(rows_path, args.repeat)),
+            ]
+            n = Document.objects.count()
+            print(f"{n} documentos x {args.signers} signatários, melhor de {args.repeat}")
+            for name, ms, mib in results:
+                print(f"  {name:<26} {ms:8.1f} ms  {ms * 1000 / n:6.1f} µs/linha  pico {mib:6.1f} MiB")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
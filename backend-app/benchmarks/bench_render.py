@@ -0,0 +1,83 @@
+"""Benchmark do render JSON de um relatório grande: JSONRenderer do DRF vs ORJSONRenderer.
+
+O payload é o do relatório (`/api/automations/reports/documents/`) com todos os documentos
+numa página; só o render é medido. Dados numa transação desfeita no final.
+
+    cd backend-app && python benchmarks/bench_render.py [--documents 5000] [--signers 3] [--repeat 5]
+"""
+import argparse
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from documents.models import Company, Document, Signer  # noqa: E402
+from documents.renderers import ORJSONRenderer, orjson  # noqa: E402
+from documents.repo.orm import DocumentRepoORM  # noqa: E402
+from documents.rows import REPORT_COLUMNS, report_rows  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def timed(renderer, payload, repeat: int) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(renderer.render(payload))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--documents", type=int, default=5000)
+    ap.add_argument("--signers", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    try:
+        with transaction.atomic():
+            company = Company.objects.create(name="Bench", api_token="bench-render")
+            created = Document.objects.bulk_create([
+                Document(company=company, name=f"Contrato nº {i}", created_by="bench") for i in range(args.documents)
+            ])
+            Signer.objects.bulk_create([
+                Signer(document=d, name=f"Signatário {j}", email=f"s{j}@ex.com")
+                for d in created for j in range(args.signers)
+            ])
+            DocumentRepoORM().rebuild_status_summary(company.id)
+
+            rows = Document.objects.filter(company=company).order_by("-created_at", "-id").values(*REPORT_COLUMNS)
+            payload = {
+                "summary": DocumentRepoORM().status_summary(company.id),
+                "items": report_rows(list(rows)),
+                "next_cursor": None,
+            }
+
+            results = [
+                ("JSONRenderer (stdlib json)", *timed(JSONRenderer(), payload, args.repeat)),
+                ("ORJSONRenderer", *timed(ORJSONRenderer(), payload, args.repeat)),
+            ]
+            print(f"relatório com {args.documents} documentos x {args.signers} signatários, melhor de {args.repeat}"
+                  + ("" if orjson else " (orjson não instalado: fallback)"))
+            for name, ms, size in results:
+                print(f"  {name:<28} {ms:8.1f} ms  {size / 2**20:5.1f} MiB")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
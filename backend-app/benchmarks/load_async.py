@@ -0,0 +1,99 @@
+"""Carga: cliente síncrono (threads) x AsyncZapSignClient contra um stub local.
+
+Simula N envios à ZapSign com latência fixa. O caminho síncrono fica limitado
+às threads do worker (gunicorn gthread / sync_to_async); o async mantém todos
+os envios em voo num único thread.
+
+    cd backend-app && python benchmarks/load_async.py [--requests 400] [--latency 0.5] [--threads 8 32]
+"""
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import pathlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from documents.services.zapsign import AsyncZapSignClient, ZapSignClient  # noqa: E402
+from stubs import StubServer  # noqa: E402
+
+
+def _serve(latency: float, in_flight, peak, conn):
+    # processo separado: o stub não disputa o GIL com os clientes medidos
+    lock = threading.Lock()
+
+    def handler(method, path, body):
+        with lock:
+            in_flight.value += 1
+            peak.value = max(peak.value, in_flight.value)
+        time.sleep(latency)
+        with lock:
+            in_flight.value -= 1
+        signers = [{"email": s["email"], "token": "t"} for s in (body or {}).get("signers", [])]
+        return 200, {}, {"open_id": 1, "token": "doc", "status": "sent", "signers": signers}
+
+    conn.send(StubServer(handler).url)
+    threading.Event().wait()
+
+
+PAYLOAD = {"name": "Contrato", "markdown_text": "# Demo", "signers": [{"name": "A", "email": "a@ex.com"}]}
+
+
+def run_sync(url: str, n: int, threads: int) -> float:
+    client = ZapSignClient(url, pool_size=threads)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: client.create_document("tok", PAYLOAD), range(n)))
+    elapsed = time.perf_counter() - started
+    client.close()
+    return elapsed
+
+
+async def run_async(url: str, n: int, pool_size: int) -> float:
+    client = AsyncZapSignClient(url, pool_size=pool_size)
+    started = time.perf_counter()
+    await asyncio.gather(*(client.create_document("tok", PAYLOAD) for _ in range(n)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--latency", type=float, default=0.5, help="segundos por resposta do stub")
+    ap.add_argument("--threads", type=int, nargs="+", default=[8, 32])
+    ap.add_argument("--async-pool", type=int, default=200)
+    args = ap.parse_args()
+
+    in_flight, peak = mp.Value("i", 0, lock=False), mp.Value("i", 0, lock=False)
+    parent, child = mp.Pipe()
+    proc = mp.Process(target=_serve, args=(args.latency, in_flight, peak, child), daemon=True)
+    proc.start()
+    url = parent.recv()
+    try:
+        print(f"{args.requests} envios, latência do stub {args.latency * 1000:.0f} ms")
+        for t in args.threads:
+            peak.value = 0
+            el = run_sync(url, args.requests, t)
+            print(f"  sync  {t:>4} threads   {el:6.2f}s  {args.requests / el:7.1f} req/s  pico em voo={peak.value}")
+        peak.value = 0
+        el = asyncio.run(run_async(url, args.requests, args.async_pool))
+        print(f"  async pool {args.async_pool:<4}  {el:6.2f}s  {args.requests / el:7.1f} req/s  pico em voo={peak.value}"
+              "  (1 thread)")
+    finally:
+        proc.terminate()
+
+if __name__ == "__main__":
+    main()
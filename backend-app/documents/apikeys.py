@@ -0,0 +1,88 @@
+# documents/apikeys.py
+# API keys das empresas: hash para busca no banco + cache hash -> (id, name) da empresa.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_PREFIX = "apikey:"
+
+def hash_api_key(api_key: str) -> str:
+    # tokens já são aleatórios e longos: sha256 simples basta para indexar/comparar
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+class CompanyKeyCache:
+    """TTL + LRU em memória do processo, opcionalmente apoiado no cache do Django.
+
+    O cache do Django (API_KEY_CACHE_ALIAS) é compartilhado entre processos e recebe
+    as invalidações; a camada local só fica desatualizada até o TTL em outros workers.
+    Guarda só (id, name) da empresa, imutável e sem segredo: nenhuma Company dividida
+    entre threads e nenhum api_token em texto puro no Redis.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, alias: str = ""):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.alias = alias
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key_hash: str):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key_hash)
+            if hit and hit[0] > now:
+                self._data.move_to_end(key_hash)
+                return hit[1]
+            if hit:
+                del self._data[key_hash]
+        if self.alias:
+            company = caches[self.alias].get(CACHE_PREFIX + key_hash)
+            if company is not None:
+                self._put_local(key_hash, company)
+                return company
+        return None
+
+    def set(self, key_hash: str, company):
+        self._put_local(key_hash, company)
+        if self.alias:
+            caches[self.alias].set(CACHE_PREFIX + key_hash, company, timeout=self.ttl)
+
+    def invalidate(self, *key_hashes: str):
+        hashes = [h for h in key_hashes if h]
+        with self._lock:
+            for h in hashes:
+                self._data.pop(h, None)
+        if self.alias and hashes:
+            caches[self.alias].delete_many([CACHE_PREFIX + h for h in hashes])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _put_local(self, key_hash: str, company):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key_hash] = (time.monotonic() + self.ttl, company)
+            self._data.move_to_end(key_hash)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> CompanyKeyCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CompanyKeyCache(
+                    ttl=settings.API_KEY_CACHE_TTL,
+                    max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+                    alias=settings.API_KEY_CACHE_ALIAS,
+                )
+    return _cache
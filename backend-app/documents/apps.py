@@ -4,3 +4,28 @@ from django.apps import AppConfig
 class DocumentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'documents'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        if settings.METRICS_ENABLED:
+            from .metrics import install_db_wrapper
+            connection_created.connect(install_db_wrapper, dispatch_uid="documents.metrics")
+            self._register_samples()
+
+    @staticmethod
+    def _register_samples():
+        # contadores globais do processo: só em /metrics (token de operador), nunca por API key
+        from .logs import dropped_records
+        from .metrics import register_sample
+        from .repo.orm import DocumentRepoORM
+        from .usecases.analyze_document import cache_stats
+
+        for name in ("hits", "misses", "evictions"):
+            register_sample(f"zapflow_analysis_cache_{name}_total", "counter",
+                            f"Cache de análises: {name} (processo).", lambda name=name: cache_stats()[name])
+        register_sample("zapflow_analysis_cache_entries", "gauge", "Linhas em AnalysisCacheEntry.",
+                        lambda: DocumentRepoORM().count_cached_analyses())
+        register_sample("zapflow_log_records_dropped_total", "counter",
+                        "Logs DEBUG/INFO descartados com a fila de log cheia.", dropped_records)
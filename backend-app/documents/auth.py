@@ -1,9 +1,15 @@
 # documents/auth.py
+import hmac
+
+from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
+from documents.apikeys import get_cache, hash_api_key
+from documents.logs import bind_context
 from documents.models import Company
 
 APIKEY_HEADER = "HTTP_X_API_KEY"
+WEBHOOK_SECRET_HEADER = "HTTP_X_ZAPSIGN_SECRET"
 
 class ApiKeyUser:
     def __init__(self, company):
@@ -12,13 +18,53 @@ class ApiKeyUser:
     def is_authenticated(self):
         return True
 
+def _company_for_request(snapshot: tuple) -> Company:
+    # instância própria da request; api_token fica adiado (só vai ao banco se alguém ler)
+    return Company.from_db(None, ["id", "name"], list(snapshot))
+
 class ApiKeyAuthentication(BaseAuthentication):
     def authenticate(self, request):
         api_key = request.META.get(APIKEY_HEADER)
         if not api_key:
             return None
-        company = Company.objects.filter(api_token=api_key).first()
-        if not company:
-            raise exceptions.AuthenticationFailed("API key inválida.")
+        key_hash = hash_api_key(api_key)
+        cache = get_cache()
+        snapshot = cache.get(key_hash)
+        if snapshot is None:
+            snapshot = Company.objects.filter(api_token_hash=key_hash).values_list("id", "name").first()
+            if not snapshot:
+                raise exceptions.AuthenticationFailed("API key inválida.")
+            cache.set(key_hash, snapshot)
+        company = _company_for_request(snapshot)
         request.company = company
-        return (ApiKeyUser(company), None)  
+        bind_context(company_id=company.id)
+        return (ApiKeyUser(company), None)
+
+async def acompany_for_api_key(api_key: str) -> Company | None:
+    """Versão async (views ASGI) da busca do ApiKeyAuthentication."""
+    if not api_key:
+        return None
+    key_hash = hash_api_key(api_key)
+    cache = get_cache()
+    snapshot = cache.get(key_hash)
+    if snapshot is None:
+        snapshot = await Company.objects.filter(api_token_hash=key_hash).values_list("id", "name").afirst()
+        if not snapshot:
+            return None
+        cache.set(key_hash, snapshot)
+    return _company_for_request(snapshot)
+
+class ZapSignWebhookUser:
+    is_authenticated = True
+
+class ZapSignWebhookAuthentication(BaseAuthentication):
+    # a ZapSign envia o header configurado no painel (X-ZapSign-Secret: <ZAPSIGN_WEBHOOK_SECRET>)
+    def authenticate(self, request):
+        expected = getattr(settings, "ZAPSIGN_WEBHOOK_SECRET", "")
+        received = request.META.get(WEBHOOK_SECRET_HEADER, "")
+        if not expected or not hmac.compare_digest(received.encode(), expected.encode()):
+            raise exceptions.AuthenticationFailed("Webhook não autorizado.")
+        return (ZapSignWebhookUser(), None)
+
+    def authenticate_header(self, request):
+        return "X-ZapSign-Secret"
@@ -0,0 +1,65 @@
+# documents/conditional.py
+# GET condicional (ETag/Last-Modified) a partir de um agregado barato do queryset:
+# se o cliente já tem a versão atual, 304 sem ler nem serializar as linhas.
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Document, DocumentContent
+
+def _aggregate(qs, field: str, scope) -> tuple[str, object] | None:
+    agg = qs.order_by().aggregate(last=Max(field), n=Count("pk"))
+    if not agg["n"]:
+        return None
+    last = agg["last"]
+    return _etag(f"{scope}:{agg['n']}:{last.timestamp() if last else ''}"), last
+
+def validators_for(qs, field: str = "last_updated_at", scope=""):
+    """(etag, None) de Max(field) + Count de uma coleção; None se o queryset não tem linhas.
+
+    Sem Last-Modified: remoção (ou documento saindo do filtro) não aumenta o Max, e um
+    If-Modified-Since sozinho receberia 304 desatualizado. O ETag (com a contagem) pega os dois.
+    `scope`: entra no ETag quando a mesma URL responde coisas diferentes (ex.: empresa da API key).
+    """
+    found = _aggregate(qs, field, scope)
+    return (found[0], None) if found else None
+
+def document_validators(pk):
+    """(etag, last_modified) de um documento: aqui o carimbo é do próprio objeto."""
+    try:
+        qs = Document.objects.filter(pk=pk)
+    except (TypeError, ValueError):
+        return None  # pk inválido na URL: a view responde o 404 de sempre
+    return _aggregate(qs, "last_updated_at", "")
+
+def content_validators(document_id):
+    """Conteúdo não tem carimbo de atualização: o ETag sai do sha256 do texto + tipo/URL."""
+    try:
+        row = (DocumentContent.objects.filter(document_id=document_id)
+               .values_list("content_type", "sha256", "pdf_url").first())
+    except (TypeError, ValueError):
+        return None
+    if row is None:
+        return None
+    return _etag("|".join(row)), None
+
+def _etag(raw: str) -> str:
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+def conditional(request, validators, build):
+    """304 se If-None-Match/If-Modified-Since batem com `validators`; senão build() com os cabeçalhos."""
+    if validators is None:
+        return build()
+    etag, last = validators
+    ts = int(last.timestamp()) if last else None
+    not_modified = get_conditional_response(request, etag=etag, last_modified=ts)
+    if not_modified is not None:
+        return not_modified
+    response = build()
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if ts is not None:
+            response["Last-Modified"] = http_date(ts)
+    return response
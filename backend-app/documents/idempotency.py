@@ -0,0 +1,80 @@
+# documents/idempotency.py
+# Header Idempotency-Key nas rotas que criam/enviam documentos: o retry (timeout no n8n) recebe
+# a resposta da primeira execução em vez de criar outro documento e pagar a ZapSign de novo.
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from documents.repo.orm import DocumentRepoORM
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IN_PROGRESS_RETRY_AFTER = 2  # segundos sugeridos à duplicata que chega com a primeira em andamento
+
+def request_fingerprint(scope: str, request, kwargs: dict) -> str:
+    # kwargs da URL (pk) + corpo já parseado: a mesma rota montada em /api/ e /automations/ casa
+    raw = json.dumps([scope, request.method, kwargs, request.data], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def idempotent(scope: str):
+    """Decora o handler (self, request, ...) de uma view DRF.
+
+    Sem o header, nada muda. Com ele, a chave é reservada ("em andamento") numa transação curta
+    e o handler roda fora dela, sem travar nada durante a chamada à ZapSign. Respostas 2xx são
+    guardadas e repetidas por IDEMPOTENCY_TTL_HOURS; erros liberam a chave (o retry executa de
+    novo). Duplicata com a primeira em andamento: 409 + Retry-After. Mesma chave com outro
+    corpo/rota: 422.
+    """
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return handler(self, request, *args, **kwargs)
+            if not key or len(key) > 255 or not key.isprintable():
+                return Response({"detail": "Idempotency-Key inválida."}, status=status.HTTP_400_BAD_REQUEST)
+
+            company = getattr(request, "company", None)
+            fingerprint = request_fingerprint(scope, request, kwargs)
+            now = timezone.now()
+            repo = DocumentRepoORM()
+            entry, claimed = repo.claim_idempotency_key(
+                company.id if company else None, scope, key, fingerprint,
+                created_after=now - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+                stale_before=now - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS),
+            )
+            if not claimed:
+                if entry.request_hash != fingerprint:
+                    return Response(
+                        {"detail": "Idempotency-Key já usada com outra requisição."},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                if entry.status_code is None:
+                    return Response(
+                        {"detail": "Requisição com esta Idempotency-Key ainda em andamento."},
+                        status=status.HTTP_409_CONFLICT,
+                        headers={"Retry-After": str(IN_PROGRESS_RETRY_AFTER)},
+                    )
+                return Response(entry.response_body, status=entry.status_code, headers={REPLAYED_HEADER: "true"})
+
+            try:
+                response = handler(self, request, *args, **kwargs)
+            except BaseException:
+                repo.release_idempotency_key(entry)
+                raise
+            if status.is_success(response.status_code):
+                repo.save_idempotent_response(entry, response.status_code, response.data)
+            else:
+                repo.release_idempotency_key(entry)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,52 @@
+# documents/links.py
+# Links hypermedia dos serializers sem reverse() por objeto: cada rota é resolvida uma vez
+# por processo (com um id sentinela) e o id é só concatenado no template.
+from django.urls import get_script_prefix, reverse
+
+_SENTINEL = "987654321"  # casa com <int:pk> e com o [^/.]+ do router do DRF
+
+_templates: dict[tuple, tuple[str, str]] = {}
+
+def _path_template(name: str, with_pk: bool) -> tuple[str, str]:
+    key = (name, with_pk, get_script_prefix())
+    tpl = _templates.get(key)
+    if tpl is None:
+        if with_pk:
+            head, _, tail = reverse(name, args=[_SENTINEL]).partition(_SENTINEL)
+        else:
+            head, tail = reverse(name), ""
+        tpl = _templates[key] = (head, tail)
+    return tpl
+
+class LinkBuilder:
+    """URLs absolutas para a request (mesmo resultado do reverse(..., request=req) do DRF)."""
+
+    def __init__(self, request=None):
+        # sem request o DRF devolve caminhos relativos; aqui também
+        self.base = request.build_absolute_uri("/")[:-1] if request is not None else ""
+        self._resolved: dict[tuple, tuple[str, str]] = {}
+
+    def url(self, name: str, pk=None) -> str:
+        key = (name, pk is not None)
+        tpl = self._resolved.get(key)
+        if tpl is None:
+            head, tail = _path_template(name, pk is not None)
+            tpl = self._resolved[key] = (self.base + head, tail)
+        if pk is None:
+            return tpl[0]
+        return f"{tpl[0]}{pk}{tpl[1]}"
+
+def link_builder(context: dict) -> LinkBuilder:
+    """Um LinkBuilder por request (guardado nela), compartilhado por todos os serializers."""
+    request = context.get("request")
+    if request is None:
+        return LinkBuilder()
+    builder = getattr(request, "_link_builder", None)
+    if builder is None:
+        builder = request._link_builder = LinkBuilder(request)
+    return builder
+
+def links_enabled(context: dict) -> bool:
+    request = context.get("request")
+    params = getattr(request, "query_params", None)
+    return params is None or params.get("links", "").lower() not in ("false", "0", "no")
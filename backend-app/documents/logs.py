@@ -0,0 +1,223 @@
+# documents/logs.py
+# Logging estruturado: JSON numa fila (o I/O sai do thread da request), amostragem por
+# logger e ids de correlação (request/documento/empresa) via contextvar.
+import contextlib
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_context: contextvars.ContextVar[dict] = contextvars.ContextVar("log_context", default={})
+
+def current_context() -> dict:
+    return _context.get()
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Acrescenta campos (request_id, document_id, ...) a todo log emitido no bloco."""
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+def bind_context(**fields):
+    """Como log_context, sem bloco: vale até o fim da request (o middleware restaura).
+
+    Fora de uma request (sem request_id) não faz nada, para não vazar entre chamadas do thread.
+    """
+    ctx = _context.get()
+    if "request_id" in ctx:
+        _context.set({**ctx, **{k: v for k, v in fields.items() if v is not None}})
+
+class CorrelationFilter(logging.Filter):
+    # roda no thread que loga (antes da fila), onde o contextvar é o da request
+    def filter(self, record):
+        for k, v in _context.get().items():
+            if not hasattr(record, k):
+                setattr(record, k, v)
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Guarda só uma fração dos DEBUG/INFO de loggers barulhentos; WARNING+ sempre passa.
+
+    `rates`: {"documents.usecases.get_status": 0.1} (ou "logger=0.1,..."); vale também para os
+    filhos do logger.
+    """
+
+    def __init__(self, rates: dict | str | None = None):
+        super().__init__()
+        self.rates = parse_rates(rates) if isinstance(rates, str) else dict(rates or {})
+        self._cache: dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate, probe = 1.0, name
+            while probe:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+_RESERVED = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        out = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # extra=..., campos de correlação
+        out.update((k, v) for k, v in record.__dict__.items() if k not in _RESERVED and not k.startswith("_"))
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+class _StdoutHandler(logging.StreamHandler):
+    # sys.stdout no momento da escrita (pytest/gunicorn trocam o stream depois do setup)
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+_queue_handlers: "weakref.WeakSet[QueueLogHandler]" = weakref.WeakSet()
+
+def dropped_records() -> int:
+    """Logs abaixo de WARNING descartados com a fila cheia (exposto em /metrics)."""
+    return sum(h.dropped for h in list(_queue_handlers))
+
+class QueueLogHandler(QueueHandler):
+    """Handler da config: enfileira; um QueueListener (thread) formata e escreve no stdout.
+
+    O listener sobe no primeiro log de cada processo (depois do fork do gunicorn).
+    Fila cheia: DEBUG/INFO são descartados (contados em `dropped`); WARNING+ é escrito
+    direto no thread de quem logou.
+    """
+
+    def __init__(self, fmt: str = "json", maxsize: int = 10_000):
+        super().__init__(queue.Queue(maxsize))
+        target = _StdoutHandler()
+        target.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s", defaults={"request_id": "-"}))
+        self.target = target
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+        _queue_handlers.add(self)
+
+    def prepare(self, record):
+        # mensagem e traceback viram texto aqui (args podem mudar depois); o JSON fica no listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                # aviso/erro não se perde: escrita síncrona (handle já serializa com o listener)
+                self.target.handle(record)
+                return
+            # sob rajada, perder DEBUG/INFO é melhor que travar a request
+            with self._lock:
+                self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        super().emit(record)
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def flush(self):
+        # espera o listener esvaziar a fila (testes, shutdown)
+        if self._listener is not None and self._pid == os.getpid():
+            self.queue.join()
+
+    def close(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+        super().close()
+
+def parse_rates(raw: str) -> dict[str, float]:
+    """"documents.usecases.get_status=0.1,documents.services.ai=0.5" -> dict."""
+    rates = {}
+    for item in filter(None, (p.strip() for p in (raw or "").split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+class RequestIdMiddleware:
+    """request_id por request (reaproveita X-Request-ID do proxy) em todos os logs e na resposta."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _request_id(request) -> str:
+        rid = request.headers.get(REQUEST_ID_HEADER, "")
+        return rid[:64] if rid.isprintable() and rid else uuid.uuid4().hex
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        rid = self._request_id(request)
+        with log_context(request_id=rid):
+            response = self.get_response(request)
+        response[REQUEST_ID_HEADER] = rid
+        return response
+
+    async def __acall__(self, request):
+        rid = self._request_id(request)
+        with log_context(request_id=rid):
+            response = await self.get_response(request)
+        response[REQUEST_ID_HEADER] = rid
+        return response
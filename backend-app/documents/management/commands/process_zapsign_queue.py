@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.dispatch_queue import ProcessZapSignQueue
+
+
+class Command(BaseCommand):
+    help = "Drena a fila de envios à ZapSign com um pool de threads (retries com backoff)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Threads de envio simultâneas.")
+        parser.add_argument("--batch", type=int, default=50,
+                            help="Máximo de jobs reservados por rodada (nunca mais que as threads livres).")
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument("--backoff-base", type=float, default=2.0, help="Segundos (dobra a cada tentativa).")
+        parser.add_argument("--backoff-max", type=float, default=300.0)
+        parser.add_argument("--lease", type=int, default=120,
+                            help="Segundos até um job 'running' voltar a ser elegível (worker morto).")
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--once", action="store_true", help="Sai quando não houver jobs elegíveis.")
+
+    def handle(self, *args, **opts):
+        uc = ProcessZapSignQueue(
+            DocumentRepoORM(),
+            max_attempts=opts["max_attempts"],
+            backoff_base=opts["backoff_base"],
+            backoff_max=opts["backoff_max"],
+            lease_seconds=opts["lease"],
+        )
+
+        def run(job):
+            try:
+                return uc.run_job(job)
+            finally:
+                # cada thread abre a própria conexão; fecha ao terminar o job
+                connection.close()
+
+        # só reserva o que as threads livres vão começar agora: job parado na fila do pool
+        # deixaria o lease vencer e outro worker enviaria o mesmo documento
+        workers = max(1, opts["workers"])
+        sent = failed = skipped = 0
+        inflight = set()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                free = workers - len(inflight)
+                jobs = uc.claim(min(opts["batch"], free)) if free else []
+                inflight.update(pool.submit(run, job) for job in jobs)
+                if not inflight:
+                    if opts["once"]:
+                        break
+                    time.sleep(opts["poll_interval"])
+                    continue
+                done, inflight = wait(inflight, timeout=opts["poll_interval"], return_when=FIRST_COMPLETED)
+                for fut in done:
+                    ok = fut.result()
+                    if ok is None:
+                        skipped += 1
+                    elif ok:
+                        sent += 1
+                    else:
+                        failed += 1
+
+        self.stdout.write(f"enviados={sent} falhas={failed} ignorados={skipped}")
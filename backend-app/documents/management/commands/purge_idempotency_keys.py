@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from documents.repo.orm import DocumentRepoORM
+
+
+class Command(BaseCommand):
+    help = "Apaga as Idempotency-Keys mais velhas que a retenção (rodar via cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=settings.IDEMPOTENCY_TTL_HOURS,
+                            help="Retenção em horas (padrão: IDEMPOTENCY_TTL_HOURS).")
+
+    def handle(self, *args, **opts):
+        n = DocumentRepoORM().purge_idempotency_keys(timezone.now() - timedelta(hours=opts["hours"]))
+        self.stdout.write(f"chaves removidas: {n}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.repo.orm import DocumentRepoORM
+
+
+class Command(BaseCommand):
+    help = "Recalcula o resumo materializado do relatório (DocumentStatusSummary) a partir dos documentos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, default=None, help="Só a empresa informada.")
+        parser.add_argument("--check", action="store_true",
+                            help="Só compara com a contagem real; sai com erro se houver divergência.")
+
+    def handle(self, *args, **opts):
+        repo = DocumentRepoORM()
+        if not opts["check"]:
+            n = repo.rebuild_status_summary(opts["company"])
+            self.stdout.write(f"resumo recalculado: {n} linhas")
+            return
+
+        live = repo.live_status_summary(opts["company"])
+        stored = repo.stored_status_summary(opts["company"])
+        diffs = sorted(
+            (key, stored.get(key, 0), live.get(key, 0))
+            for key in live.keys() | stored.keys()
+            if stored.get(key, 0) != live.get(key, 0)
+        )
+        for (company_id, day, status), got, expected in diffs:
+            self.stdout.write(f"empresa={company_id} dia={day} status={status} resumo={got} real={expected}")
+        if diffs:
+            raise CommandError(f"{len(diffs)} divergência(s) no resumo; rode sem --check para recalcular.")
+        self.stdout.write("resumo consistente")
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.get_status import SyncZapSignStatus
+
+
+class Command(BaseCommand):
+    help = "Sincroniza em lote o status dos documentos 'sent' com a ZapSign."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Consultas simultâneas à ZapSign.")
+        parser.add_argument("--fresh-seconds", type=int, default=300,
+                            help="Ignora documentos consultados há menos de N segundos.")
+        parser.add_argument("--limit", type=int, default=None, help="Máximo de documentos por rodada.")
+        parser.add_argument("--interval", type=float, default=None,
+                            help="Roda em loop, esperando N segundos entre rodadas.")
+
+    def handle(self, *args, **opts):
+        uc = SyncZapSignStatus(
+            DocumentRepoORM(),
+            workers=opts["workers"],
+            fresh_seconds=opts["fresh_seconds"],
+            limit=opts["limit"],
+        )
+        while True:
+            out = uc.execute()
+            self.stdout.write(
+                "consultados={checked} atualizados={documents_updated} signers={signers_updated} "
+                "erros={errors} frescos={skipped_fresh} empresas={companies} "
+                "tempo={elapsed_s}s ({docs_per_s} docs/s)".format(**out)
+            )
+            if opts["interval"] is None:
+                break
+            time.sleep(opts["interval"])
@@ -0,0 +1,244 @@
+# documents/metrics.py
+# Métricas por request: queries SQL, chamadas externas (ZapSign/OpenAI/PDF) e latência.
+# Saem em /metrics (formato texto do Prometheus) e, se ligado, no header Server-Timing.
+import bisect
+import contextvars
+import functools
+import hmac
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _fmt(v) -> str:
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+def _label(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Histogram:
+    """Histograma em memória do processo (cada worker gunicorn/uvicorn tem o seu)."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)  # `le` é inclusivo
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                # contagem por faixa (não acumulada) + faixa +Inf + soma
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, s in series:
+            base = ",".join(f'{n}="{_label(v)}"' for n, v in zip(self.labels, labels))
+            sep = "," if base else ""
+            total = 0
+            for le, n in zip([*map(_fmt, self.buckets), "+Inf"], s[:-1]):
+                total += n
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {total}')
+            lines.append(f"{self.name}_sum{{{base}}} {s[-1]!r}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+REQUEST_SECONDS = Histogram(
+    "zapflow_http_request_duration_seconds", "Latência das requests por rota.",
+    ("view", "method", "status"), LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "zapflow_db_queries_per_request", "Queries SQL por request.", ("view",), COUNT_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "zapflow_db_seconds_per_request", "Tempo total em SQL por request.", ("view",), LATENCY_BUCKETS,
+)
+EXTERNAL_SECONDS = Histogram(
+    "zapflow_external_call_duration_seconds",
+    "Chamadas externas (zapsign/openai/pdf); view=\"-\" fora de request (comandos, workers).",
+    ("service", "view", "outcome"), LATENCY_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, DB_QUERIES, DB_SECONDS, EXTERNAL_SECONDS)
+
+# valores que outros módulos já mantêm, lidos a cada scrape: nome -> (tipo, help, read)
+_SAMPLES: dict[str, tuple] = {}
+
+def register_sample(name: str, kind: str, help: str, read):
+    """`read()` devolve o valor atual; kind = "counter" ou "gauge" (registrado em apps.ready)."""
+    _SAMPLES[name] = (kind, help, read)
+
+def _render_samples() -> list[str]:
+    lines = []
+    for name, (kind, help, read) in sorted(_SAMPLES.items()):
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_fmt(read())}"]
+    return lines
+
+# -------- estado da request (contextvar: atravessa sync_to_async e tarefas async) --------
+class RequestStats:
+    __slots__ = ("view", "db_count", "db_time", "calls", "_lock")
+
+    def __init__(self):
+        self.view = "unmatched"
+        self.db_count = 0
+        self.db_time = 0.0
+        self.calls = []  # (service, segundos); append é seguro entre threads
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds: float):
+        # threads do in_request_context dividem o mesmo objeto: "+=" não é atômico
+        with self._lock:
+            self.db_count += 1
+            self.db_time += seconds
+
+_current: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+
+def current() -> RequestStats | None:
+    return _current.get()
+
+def in_request_context(fn):
+    """Para pools de threads: `pool.submit(in_request_context(fn), ...)` conta as chamadas na request."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+def db_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(time.perf_counter() - start)
+
+def install_db_wrapper(sender, connection, **kwargs):
+    # connection_created: vale para toda conexão, inclusive as dos threads do sync_to_async
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, db_wrapper)
+
+def _record_call(service: str, seconds: float, outcome: str):
+    stats = _current.get()
+    EXTERNAL_SECONDS.observe(seconds, service, stats.view if stats else "-", outcome)
+    if stats is not None:
+        stats.calls.append((service, seconds))
+
+def track_external(service: str):
+    """Decorator (sync ou async) que mede uma chamada a serviço externo."""
+
+    def deco(fn):
+        if iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs):
+                start, outcome = time.perf_counter(), "error"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = "ok"
+                    return result
+                finally:
+                    _record_call(service, time.perf_counter() - start, outcome)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start, outcome = time.perf_counter(), "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                _record_call(service, time.perf_counter() - start, outcome)
+        return wrapper
+
+    return deco
+
+# -------- middleware --------
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - start)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _current.get()
+        if stats is not None and request.resolver_match:
+            # rota (não o path) para não explodir a cardinalidade dos labels
+            stats.view = request.resolver_match.route or request.resolver_match.view_name
+        return None
+
+    def _finish(self, request, response, stats: RequestStats, elapsed: float):
+        REQUEST_SECONDS.observe(elapsed, stats.view, request.method, str(response.status_code))
+        DB_QUERIES.observe(stats.db_count, stats.view)
+        DB_SECONDS.observe(stats.db_time, stats.view)
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = server_timing(stats, elapsed)
+        return response
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    parts = [f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_count} queries"']
+    by_service: dict[str, list] = {}
+    for service, seconds in stats.calls:
+        agg = by_service.setdefault(service, [0, 0.0])
+        agg[0] += 1
+        agg[1] += seconds
+    for service, (n, seconds) in sorted(by_service.items()):
+        parts.append(f'{service};dur={seconds * 1000:.1f};desc="{n} calls"')
+    parts.append(f"total;dur={elapsed * 1000:.1f}")
+    return ", ".join(parts)
+
+# -------- /metrics --------
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if token:
+        given = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(given, token):
+            return HttpResponse("unauthorized\n", status=401, content_type="text/plain")
+    elif not settings.METRICS_PUBLIC:
+        return HttpResponse("METRICS_TOKEN não configurado\n", status=403, content_type="text/plain")
+    lines = [line for h in HISTOGRAMS for line in h.render()] + _render_samples()
+    body = "\n".join(lines) + "\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
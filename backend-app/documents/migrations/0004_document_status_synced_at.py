@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_queued_status_dispatch_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='status_synced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_status_synced_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZapSignWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=128, unique=True)),
+                ('event_type', models.CharField(blank=True, default='', max_length=60)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='webhook_events', to='documents.document')),
+            ],
+        ),
+    ]
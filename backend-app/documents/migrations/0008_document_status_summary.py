@@ -0,0 +1,45 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    Document = apps.get_model("documents", "Document")
+    Summary = apps.get_model("documents", "DocumentStatusSummary")
+    rows = (
+        Document.objects.annotate(day=TruncDate("created_at"))
+        .values("company_id", "day", "status")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    Summary.objects.bulk_create([
+        Summary(company_id=r["company_id"], day=r["day"], status=r["status"], total=r["n"]) for r in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_documentcontent_pdf_text_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentStatusSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('queued', 'Queued'), ('sent', 'Sent'), ('signed', 'Signed'), ('canceled', 'Canceled')], max_length=20)),
+                ('total', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_summaries', to='documents.company')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='documentstatussummary',
+            constraint=models.UniqueConstraint(fields=('company', 'day', 'status'), name='uniq_status_summary'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_document_status_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['company', 'status', 'last_updated_at'], name='doc_company_status_upd_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.14 on 2026-10-18 12:34
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    Company = apps.get_model("documents", "Company")
+    companies = list(Company.objects.only("id", "api_token"))
+    for c in companies:
+        c.api_token_hash = hashlib.sha256((c.api_token or "").encode("utf-8")).hexdigest()
+    Company.objects.bulk_update(companies, ["api_token_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0010_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='api_token_hash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
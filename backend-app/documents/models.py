@@ -1,17 +1,45 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
+
+from documents.apikeys import get_cache, hash_api_key
 
 class Company(models.Model):
     name = models.CharField(max_length=120)
+    # também é o Bearer usado na ZapSign, por isso o texto puro continua salvo
     api_token = models.CharField(max_length=200)
+    # sha256 do api_token: é por ele que o X-API-Key é autenticado
+    api_token_hash = models.CharField(max_length=64, db_index=True, editable=False, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        company = super().from_db(db, field_names, values)
+        company._loaded_token_hash = company.__dict__.get("api_token_hash")
+        return company
+
+    def save(self, *args, **kwargs):
+        self.api_token_hash = hash_api_key(self.api_token)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "api_token" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "api_token_hash"}
+        super().save(*args, **kwargs)
+        # token rotacionado (ou dados alterados): sai do cache de autenticação
+        get_cache().invalidate(getattr(self, "_loaded_token_hash", ""), self.api_token_hash)
+        self._loaded_token_hash = self.api_token_hash
+
+    def delete(self, *args, **kwargs):
+        get_cache().invalidate(getattr(self, "_loaded_token_hash", ""), hash_api_key(self.api_token))
+        return super().delete(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
 
 class DocumentStatus(models.TextChoices):
     DRAFT = "draft", "Draft"
+    QUEUED = "queued", "Queued"     # aguardando envio pela fila (process_zapsign_queue)
     SENT = "sent", "Sent"
     SIGNED = "signed", "Signed"
     CANCELED = "canceled", "Canceled"
@@ -38,11 +66,33 @@ class Document(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated_at = models.DateTimeField(auto_now=True)
+    # última consulta de status na ZapSign (sync_zapsign_status / status)
+    status_synced_at = models.DateTimeField(null=True, blank=True)
     created_by = models.CharField(max_length=120, blank=True, default="")
     external_id = models.CharField(
         max_length=120, blank=True, default="", db_index=True, db_column="externalId"  # <- coluna camelCase
     )
 
+    class Meta:
+        indexes = [
+            # documentos parados (automations/reports/stale/)
+            models.Index(fields=["company", "status", "last_updated_at"], name="doc_company_status_upd_idx"),
+            # relatório: empresa [+ status] + faixa de created_at, ordenado pelo cursor (-created_at, -id)
+            models.Index(fields=["company", "-created_at", "-id"], name="doc_company_created_idx"),
+            models.Index(fields=["company", "status", "-created_at", "-id"], name="doc_company_status_created_idx"),
+            # listagem do DocumentViewSet
+            models.Index(fields=["-created_at"], name="doc_created_idx"),
+            # webhook localiza o documento pelo token da ZapSign
+            models.Index(fields=["token"], name="doc_token_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        doc = super().from_db(db, field_names, values)
+        # status como está no banco: o repo usa para atualizar DocumentStatusSummary
+        doc._loaded_status = doc.__dict__.get("status")
+        return doc
+
     def __str__(self):
         return f"{self.name} ({self.status})"
 
@@ -51,7 +101,19 @@ class DocumentContent(models.Model):
     content_type = models.CharField(max_length=20, choices=[("markdown","markdown"),("url_pdf","url_pdf")], default="markdown")
     markdown_text = models.TextField(blank=True, default="")
     pdf_url = models.URLField(blank=True, default="")
-    sha256 = models.CharField(max_length=64, blank=True, default="")  # opcional p/ auditoria
+    sha256 = models.CharField(max_length=64, blank=True, default="")  # sha256 do texto (cache da análise)
+    # texto extraído do PDF + validadores HTTP para GET condicional
+    extracted_text = models.TextField(blank=True, default="")
+    pdf_etag = models.CharField(max_length=200, blank=True, default="")
+    pdf_last_modified = models.CharField(max_length=64, blank=True, default="")
+    pdf_sha256 = models.CharField(max_length=64, blank=True, default="")  # bytes do PDF
+    text_checked_at = models.DateTimeField(null=True, blank=True)
+
+    PDF_CACHE_FIELDS = ["extracted_text", "pdf_etag", "pdf_last_modified", "pdf_sha256", "text_checked_at"]
+
+    def clear_pdf_cache(self):
+        self.extracted_text = self.pdf_etag = self.pdf_last_modified = self.pdf_sha256 = ""
+        self.text_checked_at = None
 
 class SignerStatus(models.TextChoices):
     PENDING = "pending", "Pending"
@@ -84,3 +146,101 @@ class Signer(models.Model):
 
     def __str__(self):
         return f"{self.name} <{self.email}>"
+
+
+class DispatchJobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+class ZapSignDispatchJob(models.Model):
+    # outbox: um job por envio de documento à ZapSign
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="dispatch_jobs")
+    status = models.CharField(
+        max_length=20,
+        choices=DispatchJobStatus.choices,
+        default=DispatchJobStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # pending: quando pode rodar; running: fim do lease (worker morto -> volta a ser elegível)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="dispatch_job_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"job {self.pk} doc={self.document_id} ({self.status})"
+
+
+class ZapSignWebhookEvent(models.Model):
+    # dedupe de callbacks da ZapSign (reentregas do mesmo evento são ignoradas)
+    event_id = models.CharField(max_length=128, unique=True)
+    event_type = models.CharField(max_length=60, blank=True, default="")
+    document = models.ForeignKey(
+        Document, on_delete=models.SET_NULL, null=True, blank=True, related_name="webhook_events"
+    )
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.event_type or 'evento'} {self.event_id}"
+
+
+class AnalysisCacheEntry(models.Model):
+    # resultado de analyze_text por (sha256 do texto, AI_MODE, versão do prompt)
+    key = models.CharField(max_length=64, unique=True)
+    sha256 = models.CharField(max_length=64)
+    ai_mode = models.CharField(max_length=20)
+    prompt_version = models.CharField(max_length=20)
+    result = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)  # LRU
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ai_mode} v{self.prompt_version})"
+
+
+class DocumentStatusSummary(models.Model):
+    # contagem materializada de documentos por empresa/dia de criação/status (relatório)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="status_summaries")
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=DocumentStatus.choices)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["company", "day", "status"], name="uniq_status_summary"),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} {self.day} {self.status}={self.total}"
+
+
+class IdempotencyKey(models.Model):
+    # resposta guardada por (empresa, rota, Idempotency-Key): retries do n8n repetem a resposta, não o efeito
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE, null=True, blank=True, related_name="idempotency_keys"
+    )  # nulo nas rotas sem API key (/api/documents/)
+    scope = models.CharField(max_length=60)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)  # sha256 da rota + corpo: mesma chave, outro pedido -> 422
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)  # nulo = em andamento
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # retenção (purge_idempotency_keys)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["company", "scope", "key"], name="uniq_idempotency_key"),
+            # NULL não colide em índice único: as rotas sem empresa têm o próprio
+            models.UniqueConstraint(fields=["scope", "key"], condition=models.Q(company__isnull=True),
+                                    name="uniq_idempotency_key_public"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} ({self.status_code or 'em andamento'})"
@@ -0,0 +1,41 @@
+# documents/pagination.py
+# Paginação por cursor (keyset) em (created_at, id), ambos decrescentes, e limit/offset opcional
+# das listagens do router.
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.pagination import LimitOffsetPagination
+
+class OptInLimitOffsetPagination(LimitOffsetPagination):
+    """Só pagina com `?limit=` (o front espera um array simples); aí responde {count, next, previous, results}."""
+    default_limit = None
+    max_limit = 1000
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise serializers.ValidationError({"cursor": "Cursor inválido."})
+
+def keyset_page(qs, cursor: str | None, limit: int, field: str = "created_at"):
+    """Retorna (itens, próximo cursor | None); `qs` não precisa estar ordenado."""
+    qs = qs.order_by(f"-{field}", "-id")
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk}))
+    items = list(qs[: limit + 1])
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    if isinstance(last, dict):  # qs.values()
+        return items, encode_cursor(last[field], last["id"])
+    return items, encode_cursor(getattr(last, field), last.pk)
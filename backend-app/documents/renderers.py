@@ -0,0 +1,54 @@
+# documents/renderers.py
+# JSON da API com orjson (renderer e parser do DRF); sem orjson instalado, cai no json da stdlib.
+# A saída é a mesma do JSONRenderer padrão (compacta, UTF-8, datas com "Z").
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # opcional: requirements.txt instala
+    orjson = None
+
+# tipos que o orjson não conhece (Decimal, lazy strings, timedelta, QuerySet, ...) seguem as regras do DRF
+_default = JSONEncoder().default
+
+_LINE_SEPARATORS = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")  # U+2028/U+2029, escapados como no DRF
+
+def dumps(data) -> bytes:
+    """JSON compacto em bytes; ReturnList/ReturnDict e datas como no JSONRenderer do DRF."""
+    if orjson is None:
+        return renderers.JSONRenderer().render(data)
+    try:
+        ret = orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z)
+    except TypeError:
+        # chaves não-string, inteiros > 64 bits, ...: o json da stdlib resolve
+        return renderers.JSONRenderer().render(data)
+    if b"\xe2\x80" in ret:
+        ret = ret.replace(_LINE_SEPARATORS[0], b"\\u2028").replace(_LINE_SEPARATORS[1], b"\\u2029")
+    return ret
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # indentação (API navegável, "; indent=4") e configurações fora do padrão ficam com o DRF
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson já recusa NaN/Infinity (o STRICT_JSON do DRF)
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
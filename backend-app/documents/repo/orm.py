@@ -1,29 +1,93 @@
-from documents.models import Company, Document, DocumentContent, Signer
-from documents.usecases.errors import NotFoundError
+import hashlib
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from documents.models import (
+    AnalysisCacheEntry, Company, DispatchJobStatus, Document, DocumentContent, DocumentStatus, DocumentStatusSummary,
+    IdempotencyKey, Signer, ZapSignDispatchJob, ZapSignWebhookEvent,
+)
+from documents.usecases.errors import NotFoundError, ValidationError
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+def _summary_key(doc: Document, status: str) -> tuple:
+    # mesmo "dia" que created_at__date / TruncDate usam (fuso atual)
+    return doc.company_id, timezone.localdate(doc.created_at), status
+
+def _status_deltas(docs: list[Document]) -> Counter:
+    """Transições de status (em relação ao que foi lido do banco) -> deltas do resumo."""
+    deltas = Counter()
+    for d in docs:
+        old = getattr(d, "_loaded_status", None)
+        if old != d.status:
+            if old is not None:
+                deltas[_summary_key(d, old)] -= 1
+            deltas[_summary_key(d, d.status)] += 1
+        d._loaded_status = d.status
+    return deltas
 
 class DocumentRepoORM:
     def create_document_with_signers(self, data: dict) -> Document:
-        company = Company.objects.filter(id=data["company"]).first()
+        # mesmo caminho do lote: transação + bulk_create dos signatários
+        return self.create_documents_with_signers([data])[0]
+
+    @transaction.atomic
+    def create_documents_with_signers(self, payloads: list[dict]) -> list[Document]:
+        # lote inteiro numa transação, com um bulk_create por tabela
+        company_ids = {p["company"] for p in payloads}
+        if len(company_ids) != 1:
+            raise ValidationError("Todos os documentos do lote devem ser da mesma empresa.")
+        company = Company.objects.filter(id=company_ids.pop()).first()
         if not company:
             raise NotFoundError("Empresa não encontrada.")
 
-        doc = Document.objects.create(
-            company=company,
-            name=data["name"],
-            created_by=data.get("created_by", ""),
-            external_id=data.get("external_id", ""),
-            # status/open_id/token: defaults do model
-        )
+        docs = Document.objects.bulk_create([
+            Document(
+                company=company,
+                name=p["name"],
+                created_by=p.get("created_by", ""),
+                external_id=p.get("external_id", ""),
+            )
+            for p in payloads
+        ])
 
-        for s in data.get("signers", []):
-            Signer.objects.create(
-                document=doc,
-                name=s["name"],
-                email=s["email"],
-                external_id=s.get("external_id", ""),
+        signers, contents = [], []
+        for doc, p in zip(docs, payloads):
+            signers.extend(
+                Signer(
+                    document=doc,
+                    name=s["name"],
+                    email=s["email"],
+                    external_id=s.get("external_id", ""),
+                )
+                for s in p.get("signers", [])
             )
-        return doc
-    
+            c = p.get("content")
+            if c:
+                md = c.get("markdown_text", "") if c["content_type"] == "markdown" else ""
+                contents.append(DocumentContent(
+                    document=doc,
+                    content_type=c["content_type"],
+                    markdown_text=md,
+                    pdf_url=c.get("pdf_url", "") if c["content_type"] == "url_pdf" else "",
+                    sha256=text_sha256(md) if md else "",
+                ))
+        Signer.objects.bulk_create(signers)
+        DocumentContent.objects.bulk_create(contents)
+        self._bump_summary(_status_deltas(docs))
+        return docs
+
+    def get_documents_with_signers(self, doc_ids: list[int]) -> list[Document]:
+        by_id = Document.objects.select_related("company", "content").prefetch_related("signers").in_bulk(doc_ids)
+        return [by_id[i] for i in doc_ids if i in by_id]
+
     def get_document_with_signers(self, doc_id: int) -> Document:
         doc = Document.objects.select_related("company").prefetch_related("signers").filter(id=doc_id).first()
         if not doc:
@@ -33,35 +97,210 @@ class DocumentRepoORM:
     def save_document_fields(self, doc: Document, **fields) -> Document:
         for k, v in fields.items():
             setattr(doc, k, v)
-        doc.save(update_fields=list(fields.keys()))
+        if "status" not in fields:
+            # update_fields só grava o auto_now se ele estiver na lista (ETag/Last-Modified dependem dele)
+            doc.save(update_fields=[*fields.keys(), "last_updated_at"])
+            return doc
+
+        doc.last_updated_at = timezone.now()
+        values = {**fields, "last_updated_at": doc.last_updated_at}
+        with transaction.atomic():
+            # UPDATE condicional: só aplica o delta do resumo quem de fato fez a transição
+            # (webhook, consulta e sync em lote podem ler "sent" e gravar "signed" ao mesmo tempo)
+            old = getattr(doc, "_loaded_status", None)
+            if not Document.objects.filter(id=doc.id, status=old).update(**values):
+                old = Document.objects.select_for_update().filter(id=doc.id).values_list("status", flat=True).first()
+                if old is None:
+                    return doc  # apagado no meio do caminho
+                Document.objects.filter(id=doc.id).update(**values)
+            doc._loaded_status = old
+            self._bump_summary(_status_deltas([doc]))
         return doc
     
-    def update_signer_token_by_email(self, document_id: int, email: str, token: str):
-        try:
-            signer = Signer.objects.get(document_id=document_id, email__iexact=email)
-            signer.token = token
-            signer.save()
-        except Signer.DoesNotExist:
-            print(f"Signer com email {email} não encontrado para o documento {document_id}")
-    
-    def update_signer_status_token_by_email(self, document_id: int, email: str, status=None, token=None):
-        from documents.models import Signer
-        s = Signer.objects.filter(
-            document_id=document_id,
-            email__iexact=email
-        ).first()
-        if not s:
+    def bulk_save_documents(self, docs: list[Document], fields: list[str]):
+        if not docs:
             return
-        fields = []
-        if status:
-            s.status = status
-            fields.append("status")
+        # bulk_update não aplica auto_now
+        now = timezone.now()
+        for d in docs:
+            d.last_updated_at = now
+        with transaction.atomic():
+            if "status" in fields:
+                # deltas a partir do status atual, com as linhas travadas (não do que foi lido antes)
+                current = dict(
+                    Document.objects.select_for_update().filter(id__in=[d.id for d in docs])
+                    .order_by("id").values_list("id", "status")
+                )
+                for d in docs:
+                    d._loaded_status = current.get(d.id, d.status)  # apagado: sem delta
+            Document.objects.bulk_update(docs, [*fields, "last_updated_at"])
+            if "status" in fields:
+                self._bump_summary(_status_deltas(docs))
+
+    @transaction.atomic
+    def delete_document(self, doc: Document):
+        status = Document.objects.select_for_update().filter(id=doc.id).values_list("status", flat=True).first()
+        if status is None:
+            return  # já apagado por outra request
+        doc.delete()
+        self._bump_summary(Counter({_summary_key(doc, status): -1}))
+
+    def bulk_save_signers(self, signers: list[Signer], fields: list[str]):
+        if signers:
+            Signer.objects.bulk_update(signers, fields)
+
+    def touch_documents(self, document_ids, **fields):
+        """Marca os documentos como alterados (signatários fazem parte da representação deles)."""
+        Document.objects.filter(id__in=document_ids).update(last_updated_at=timezone.now(), **fields)
+
+    def mark_status_synced(self, document_ids, synced_at):
+        # só consultado na ZapSign, nada mudou: não conta como atualização (documentos parados, ETag)
+        Document.objects.filter(id__in=document_ids).update(status_synced_at=synced_at)
+
+    def list_documents_to_sync(self, synced_before, limit: int | None = None) -> list[Document]:
+        qs = (
+            Document.objects.filter(status=DocumentStatus.SENT)
+            .filter(Q(status_synced_at__isnull=True) | Q(status_synced_at__lt=synced_before))
+            .select_related("company")
+            .prefetch_related("signers")
+            .order_by(F("status_synced_at").asc(nulls_first=True), "id")
+        )
+        return list(qs[:limit] if limit else qs)
+
+    def count_fresh_documents(self, synced_since) -> int:
+        return Document.objects.filter(status=DocumentStatus.SENT, status_synced_at__gte=synced_since).count()
+
+    @transaction.atomic
+    def save_sync_results(self, changed_docs: list[Document], changed_signers: list[Signer],
+                          synced_ids: list[int], synced_at):
+        # status mudou -> bulk_update; só consultado -> um UPDATE do carimbo
+        self.bulk_save_documents(changed_docs, ["status", "status_synced_at"])
+        unchanged = set(synced_ids) - {d.id for d in changed_docs}
+        touched = unchanged & {s.document_id for s in changed_signers}
+        if touched:
+            self.touch_documents(touched, status_synced_at=synced_at)
+        if unchanged - touched:
+            self.mark_status_synced(unchanged - touched, synced_at)
+        self.bulk_save_signers(changed_signers, ["status", "token"])
+
+    def find_document_by_remote_id(self, token: str = "", open_id=None) -> Document | None:
+        qs = Document.objects.select_related("company").prefetch_related("signers")
         if token:
-            s.token = token
-            fields.append("token")
-        if fields:
-            s.save(update_fields=fields)
+            return qs.filter(token=token).first()
+        if open_id:
+            return qs.filter(open_id=open_id).first()
+        return None
+
+    def record_webhook_event(self, event_id: str, event_type: str, document: Document | None) -> bool:
+        """Registra o evento; False se ele já tinha sido processado."""
+        try:
+            with transaction.atomic():
+                ZapSignWebhookEvent.objects.create(event_id=event_id, event_type=event_type, document=document)
+        except IntegrityError:
+            return False
+        return True
+
+    @transaction.atomic
+    def enqueue_dispatch(self, docs: list[Document]):
+        for d in docs:
+            d.status = DocumentStatus.QUEUED
+        self.bulk_save_documents(docs, ["status"])
+        ZapSignDispatchJob.objects.bulk_create([ZapSignDispatchJob(document=d) for d in docs])
+
+    @transaction.atomic
+    def claim_dispatch_jobs(self, limit: int, lease_seconds: int) -> list[ZapSignDispatchJob]:
+        # skip_locked: vários workers/processos podem drenar a fila ao mesmo tempo
+        now = timezone.now()
+        jobs = list(
+            ZapSignDispatchJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[DispatchJobStatus.PENDING, DispatchJobStatus.RUNNING],
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at")[:limit]
+        )
+        for j in jobs:
+            j.status = DispatchJobStatus.RUNNING
+            j.attempts += 1
+            j.next_attempt_at = now + timedelta(seconds=lease_seconds)
+            j.last_updated_at = now
+        ZapSignDispatchJob.objects.bulk_update(jobs, ["status", "attempts", "next_attempt_at", "last_updated_at"])
+        return jobs
+
+    def _owned_job(self, job: ZapSignDispatchJob):
+        # o job ainda é desta tentativa: se o lease venceu e outro worker o pegou, attempts mudou
+        return ZapSignDispatchJob.objects.filter(
+            id=job.id, status=DispatchJobStatus.RUNNING, attempts=job.attempts
+        )
+
+    def start_dispatch_job(self, job: ZapSignDispatchJob, lease_seconds: int) -> bool:
+        """Renova o lease no início da execução; False se o job já não é desta tentativa."""
+        now = timezone.now()
+        job.next_attempt_at = now + timedelta(seconds=lease_seconds)
+        return self._owned_job(job).update(next_attempt_at=job.next_attempt_at, last_updated_at=now) == 1
+
+    def finish_dispatch_job(self, job: ZapSignDispatchJob) -> bool:
+        job.status = DispatchJobStatus.DONE
+        job.last_error = ""
+        return self._owned_job(job).update(
+            status=job.status, last_error="", last_updated_at=timezone.now()
+        ) == 1
+
+    def retry_dispatch_job(self, job: ZapSignDispatchJob, error: str, delay_seconds: float) -> bool:
+        now = timezone.now()
+        job.status = DispatchJobStatus.PENDING
+        job.last_error = error
+        job.next_attempt_at = now + timedelta(seconds=delay_seconds)
+        return self._owned_job(job).update(
+            status=job.status, last_error=error, next_attempt_at=job.next_attempt_at, last_updated_at=now
+        ) == 1
+
+    @transaction.atomic
+    def fail_dispatch_job(self, job: ZapSignDispatchJob, error: str) -> bool:
+        job.status = DispatchJobStatus.FAILED
+        job.last_error = error
+        owned = self._owned_job(job).update(
+            status=job.status, last_error=error, last_updated_at=timezone.now()
+        ) == 1
+        if not owned:
+            return False  # outro worker assumiu o job: o resultado dele é que vale
+        # devolve para draft para permitir reenvio manual
+        doc = Document.objects.select_for_update().filter(id=job.document_id, status=DocumentStatus.QUEUED).first()
+        if doc:
+            doc.status = DocumentStatus.DRAFT
+            self.bulk_save_documents([doc], ["status"])
+        return True
 
+    def sync_signers(self, document_id: int, remote: list[dict], signers: list[Signer] | None = None,
+                     save: bool = True) -> list[dict]:
+        """Aplica a lista de signatários da ZapSign ({email, token?, status?}) de uma vez.
+
+        `signers`: os já carregados (prefetch); sem eles, uma única query. O e-mail casa
+        sem diferenciar maiúsculas; tudo é gravado num só bulk_update. `save=False` só altera
+        os objetos em memória (quem grava em lote é o chamador, ex.: save_sync_results).
+        Retorna as mudanças: [{"id", "email", "fields": {campo: novo valor}}].
+        """
+        if signers is None:
+            signers = list(Signer.objects.filter(document_id=document_id))
+        by_email = {s.email.strip().lower(): s for s in signers}
+
+        changed, changes, fields = [], [], set()
+        for r in remote:
+            signer = by_email.get((r.get("email") or "").strip().lower())
+            if signer is None:
+                continue
+            diff = {f: r[f] for f in ("status", "token") if r.get(f) and r[f] != getattr(signer, f)}
+            if not diff:
+                continue
+            for f, v in diff.items():
+                setattr(signer, f, v)
+            fields.update(diff)
+            changed.append(signer)
+            changes.append({"id": signer.id, "email": signer.email, "fields": diff})
+
+        if changed and save:
+            Signer.objects.bulk_update(changed, sorted(fields))
+        return changes
 
     def upsert_document_content(
         self,
@@ -81,9 +320,199 @@ class DocumentRepoORM:
         if content_type == "markdown":
             content.markdown_text = markdown_text or ""
             content.pdf_url = ""
+            content.sha256 = text_sha256(content.markdown_text)
         else:  # "url_pdf"
+            if content.pdf_url != (pdf_url or ""):
+                content.clear_pdf_cache()
             content.pdf_url = pdf_url or ""
             content.markdown_text = ""
+            content.sha256 = text_sha256(content.extracted_text) if content.extracted_text else ""
 
-        content.save(update_fields=["content_type", "markdown_text", "pdf_url"])
+        content.save(update_fields=["content_type", "markdown_text", "pdf_url", "sha256", *DocumentContent.PDF_CACHE_FIELDS])
         return content
+
+    def save_pdf_text(self, content: DocumentContent, *, checked_at, text: str | None = None,
+                      etag: str = "", last_modified: str = "", pdf_sha256: str = ""):
+        # text=None: PDF não mudou (304 / mesmos bytes), só renova validadores e carimbo
+        content.text_checked_at = checked_at
+        fields = ["text_checked_at"]
+        if etag or last_modified or pdf_sha256:
+            content.pdf_etag, content.pdf_last_modified = etag, last_modified
+            content.pdf_sha256 = pdf_sha256 or content.pdf_sha256
+            fields += ["pdf_etag", "pdf_last_modified", "pdf_sha256"]
+        if text is not None:
+            content.extracted_text = text
+            content.sha256 = text_sha256(text)
+            fields += ["extracted_text", "sha256"]
+        content.save(update_fields=fields)
+
+    def set_content_sha256(self, content: DocumentContent, sha256: str):
+        if content.sha256 != sha256:
+            content.sha256 = sha256
+            content.save(update_fields=["sha256"])
+
+    # -------- resumo materializado do relatório --------
+    def _bump_summary(self, deltas: Counter):
+        # um único upsert incremental (ON CONFLICT), qualquer que seja o número de chaves
+        rows = [(c, day, st, n) for (c, day, st), n in deltas.items() if n]
+        if not rows:
+            return
+        table = DocumentStatusSummary._meta.db_table
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+        with connection.cursor() as cur:
+            cur.execute(
+                f"INSERT INTO {table} (company_id, day, status, total) VALUES {values} "
+                f"ON CONFLICT (company_id, day, status) DO UPDATE SET total = {table}.total + EXCLUDED.total",
+                [v for row in rows for v in row],
+            )
+
+    def status_summary(self, company_id: int, status: str | None = None,
+                       day_from=None, day_to=None) -> dict[str, int]:
+        qs = DocumentStatusSummary.objects.filter(company_id=company_id)
+        if status:
+            qs = qs.filter(status=status)
+        if day_from:
+            qs = qs.filter(day__gte=day_from)
+        if day_to:
+            qs = qs.filter(day__lte=day_to)
+        rows = qs.values("status").annotate(n=Sum("total")).filter(n__gt=0).values_list("status", "n")
+        return dict(rows)
+
+    def live_status_summary(self, company_id: int | None = None) -> dict[tuple, int]:
+        qs = Document.objects.all()
+        if company_id:
+            qs = qs.filter(company_id=company_id)
+        rows = (
+            qs.annotate(day=TruncDate("created_at"))
+            .values("company_id", "day", "status")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        return {(r["company_id"], r["day"], r["status"]): r["n"] for r in rows}
+
+    def stored_status_summary(self, company_id: int | None = None) -> dict[tuple, int]:
+        qs = DocumentStatusSummary.objects.filter(total__gt=0)
+        if company_id:
+            qs = qs.filter(company_id=company_id)
+        return {(r.company_id, r.day, r.status): r.total for r in qs}
+
+    @transaction.atomic
+    def rebuild_status_summary(self, company_id: int | None = None) -> int:
+        # bloqueia escritas em documentos até o commit: nenhuma transição se perde na recontagem
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cur:
+                cur.execute(f"LOCK TABLE {Document._meta.db_table} IN SHARE MODE")
+
+        stale = DocumentStatusSummary.objects.all()
+        if company_id:
+            stale = stale.filter(company_id=company_id)
+        stale.delete()
+        live = self.live_status_summary(company_id)
+        DocumentStatusSummary.objects.bulk_create([
+            DocumentStatusSummary(company_id=c, day=day, status=st, total=n)
+            for (c, day, st), n in live.items()
+        ])
+        return len(live)
+
+    # -------- cache de análises (IA) --------
+    def get_cached_analysis(self, key: str, created_after) -> dict | None:
+        entry = AnalysisCacheEntry.objects.filter(key=key, created_at__gte=created_after).only("id", "result").first()
+        if not entry:
+            return None
+        AnalysisCacheEntry.objects.filter(id=entry.id).update(hits=F("hits") + 1, last_used_at=timezone.now())
+        return entry.result
+
+    def save_cached_analysis(self, key: str, sha256: str, ai_mode: str, prompt_version: str, result: dict):
+        AnalysisCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                "sha256": sha256, "ai_mode": ai_mode, "prompt_version": prompt_version,
+                "result": result, "hits": 0, "created_at": timezone.now(), "last_used_at": timezone.now(),
+            },
+        )
+
+    def evict_analysis_cache(self, max_entries: int, created_before) -> int:
+        deleted, _ = AnalysisCacheEntry.objects.filter(created_at__lt=created_before).delete()
+        surplus = AnalysisCacheEntry.objects.count() - max_entries
+        if surplus > 0:
+            oldest = AnalysisCacheEntry.objects.order_by("last_used_at").values_list("id", flat=True)[:surplus]
+            n, _ = AnalysisCacheEntry.objects.filter(id__in=list(oldest)).delete()
+            deleted += n
+        return deleted
+
+    def count_cached_analyses(self) -> int:
+        return AnalysisCacheEntry.objects.count()
+
+    # -------- Idempotency-Key --------
+    def claim_idempotency_key(self, company_id, scope: str, key: str, request_hash: str,
+                              created_after, stale_before) -> tuple[IdempotencyKey, bool]:
+        """Reserva a chave numa transação curta (já commitada ao retornar): (linha, reservada agora?).
+
+        Reservada = linha nova "em andamento" (status_code nulo); quem chega depois vê a linha
+        alheia. Linha anterior a `created_after` expirou; "em andamento" anterior a
+        `stale_before` foi abandonada (processo morreu) — as duas são retomadas.
+        """
+        lookup = {"company_id": company_id, "scope": scope, "key": key}
+        while True:
+            with transaction.atomic():
+                entry = IdempotencyKey.objects.select_for_update().filter(**lookup).first()
+                if entry is None:
+                    try:
+                        with transaction.atomic():
+                            return IdempotencyKey.objects.create(**lookup, request_hash=request_hash), True
+                    except IntegrityError:
+                        continue  # outra request reservou entre o SELECT e o INSERT: lê a dela
+                abandoned = entry.status_code is None and entry.created_at < stale_before
+                if entry.created_at >= created_after and not abandoned:
+                    return entry, False
+                entry.request_hash, entry.status_code, entry.response_body = request_hash, None, None
+                entry.created_at = timezone.now()
+                entry.save(update_fields=["request_hash", "status_code", "response_body", "created_at"])
+                return entry, True
+
+    def save_idempotent_response(self, entry: IdempotencyKey, status_code: int, body):
+        entry.status_code, entry.response_body = status_code, body
+        entry.save(update_fields=["status_code", "response_body"])
+
+    def release_idempotency_key(self, entry: IdempotencyKey):
+        # resposta de erro não é repetida: o retry executa de novo
+        entry.delete()
+
+    def purge_idempotency_keys(self, created_before) -> int:
+        return IdempotencyKey.objects.filter(created_at__lt=created_before).delete()[0]
+
+    # -------- async (views ASGI) --------
+    async def aget_document_with_signers(self, doc_id: int) -> Document:
+        doc = await (
+            Document.objects.select_related("company", "content").prefetch_related("signers")
+            .filter(id=doc_id).afirst()
+        )
+        if not doc:
+            raise NotFoundError("Documento não encontrado.")
+        return doc
+
+    async def acreate_document_with_content(self, data: dict) -> Document:
+        # transaction.atomic ainda não tem versão async (Django 4.2)
+        docs = await sync_to_async(self.create_documents_with_signers)([data])
+        return docs[0]
+
+    async def aset_content_sha256(self, content: DocumentContent, sha256: str):
+        if content.sha256 != sha256:
+            content.sha256 = sha256
+            await content.asave(update_fields=["sha256"])
+
+    async def asave_pdf_text(self, content: DocumentContent, **kw):
+        await sync_to_async(self.save_pdf_text)(content, **kw)
+
+    async def aget_cached_analysis(self, key: str, created_after) -> dict | None:
+        entry = await AnalysisCacheEntry.objects.filter(key=key, created_at__gte=created_after).only("id", "result").afirst()
+        if not entry:
+            return None
+        await AnalysisCacheEntry.objects.filter(id=entry.id).aupdate(hits=F("hits") + 1, last_used_at=timezone.now())
+        return entry.result
+
+    async def asave_cached_analysis(self, key: str, sha256: str, ai_mode: str, prompt_version: str, result: dict):
+        await sync_to_async(self.save_cached_analysis)(key, sha256, ai_mode, prompt_version, result)
+
+    async def aevict_analysis_cache(self, max_entries: int, created_before) -> int:
+        return await sync_to_async(self.evict_analysis_cache)(max_entries, created_before)
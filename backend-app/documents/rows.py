@@ -0,0 +1,100 @@
+# documents/rows.py
+# Caminho de leitura das listagens: colunas via values() e dicts montados por funções simples,
+# sem instanciar Model nem Serializer por linha. Saída idêntica à dos serializers equivalentes.
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from .links import link_builder, links_enabled
+from .models import Signer
+
+DOCUMENT_COLUMNS = (
+    "id", "company_id", "name", "created_by", "external_id",
+    "status", "open_id", "token", "created_at", "last_updated_at",
+)
+REPORT_COLUMNS = ("id", "name", "status", "created_at", "last_updated_at")
+SIGNER_COLUMNS = ("id", "document_id", "name", "email", "external_id", "status")
+
+# mesmo formato de data do DRF (fuso atual, "Z" para UTC)
+_datetime = serializers.DateTimeField().to_representation
+
+def _dt(value):
+    return None if value is None else _datetime(value)
+
+def signers_by_document(document_ids) -> dict[int, list[dict]]:
+    """Signatários (só as colunas usadas) de vários documentos numa query, agrupados por documento."""
+    grouped = defaultdict(list)
+    rows = Signer.objects.filter(document_id__in=document_ids).order_by("id").values_list(*SIGNER_COLUMNS)
+    for row in rows:
+        grouped[row[1]].append(row)
+    return grouped
+
+def _signer(row, b) -> dict:
+    pk, document_id, name, email, external_id, status = row
+    out = {"id": pk, "name": name, "email": email, "external_id": external_id, "status": status}
+    if b is not None:
+        out["links"] = {
+            "self":     b.url("signer-detail", pk),
+            "document": b.url("document-detail", document_id),
+        }
+    return out
+
+def _wanted_fields(context: dict):
+    request = context.get("request")
+    wanted = getattr(request, "query_params", {}).get("fields") if request is not None else None
+    return {f.strip() for f in wanted.split(",")} if wanted else None
+
+def document_rows(rows: list[dict], context: dict) -> list[dict]:
+    """Equivalente a DocumentSerializer(many=True).data para linhas de values(*DOCUMENT_COLUMNS)."""
+    b = link_builder(context) if links_enabled(context) else None
+    keep = _wanted_fields(context)
+    with_signers = keep is None or "signers" in keep
+    signers = signers_by_document([r["id"] for r in rows]) if with_signers and rows else {}
+
+    out = []
+    for r in rows:
+        pk = r["id"]
+        item = {
+            "id": pk,
+            "company": r["company_id"],
+            "name": r["name"],
+            "created_by": r["created_by"],
+            "external_id": r["external_id"],
+            "status": r["status"],
+            "open_id": r["open_id"],
+            "token": r["token"],
+            "created_at": _dt(r["created_at"]),
+            "last_updated_at": _dt(r["last_updated_at"]),
+        }
+        if with_signers:
+            item["signers"] = [_signer(s, b) for s in signers.get(pk, ())]
+        if b is not None:
+            item["links"] = {
+                "self":     b.url("document-detail", pk),
+                "send":     b.url("document-send-to-zapsign", pk),
+                "status":   b.url("document-status", pk),
+                "content":  b.url("document-content", pk),
+                "analysis": b.url("document-analysis", pk),
+            }
+        if keep is not None:
+            item = {k: v for k, v in item.items() if k in keep}
+        out.append(item)
+    return out
+
+def report_rows(rows: list[dict]) -> list[dict]:
+    """Equivalente a ReportDocumentSerializer(many=True).data (sem request: links relativos)."""
+    b = link_builder({})
+    signers = signers_by_document([r["id"] for r in rows]) if rows else {}
+    out = []
+    for r in rows:
+        mine = signers.get(r["id"], ())
+        out.append({
+            "id": r["id"],
+            "name": r["name"],
+            "status": r["status"],
+            "created_at": _dt(r["created_at"]),
+            "last_updated_at": _dt(r["last_updated_at"]),
+            "signer_count": len(mine),
+            "signers": [_signer(s, b) for s in mine],
+        })
+    return out
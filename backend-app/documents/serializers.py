@@ -1,9 +1,33 @@
 from rest_framework import serializers
-from rest_framework.reverse import reverse
+from .links import link_builder, links_enabled
 from .models import Company, Document, Signer, DocumentContent
 from django.db import transaction
 from django.db.models import Count
-class CompanySerializer(serializers.ModelSerializer):
+
+class HypermediaMixin:
+    """GET com `?links=false` omite os links; `?fields=id,name` limita os campos do objeto principal."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in ("GET", "HEAD"):
+            return fields
+        if not links_enabled(self.context):
+            fields.pop("links", None)
+        wanted = getattr(request, "query_params", request.GET).get("fields")
+        if wanted and self._is_top_level():
+            keep = {f.strip() for f in wanted.split(",")}
+            for name in [n for n in fields if n not in keep]:
+                fields.pop(name)
+        return fields
+
+    def _is_top_level(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+class CompanySerializer(HypermediaMixin, serializers.ModelSerializer):
     links = serializers.SerializerMethodField()
 
     class Meta:
@@ -11,14 +35,14 @@ class CompanySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "api_token", "created_at", "last_updated_at", "links"]
 
     def get_links(self, obj):
-        req = self.context.get("request")
+        b = link_builder(self.context)
         return {
-            "self":      reverse("company-detail", args=[obj.pk], request=req), 
-            "documents": reverse("document-list", request=req) + f"?company={obj.pk}",
+            "self":      b.url("company-detail", obj.pk),
+            "documents": b.url("document-list") + f"?company={obj.pk}",
         }
 
 
-class SignerSerializer(serializers.ModelSerializer):
+class SignerSerializer(HypermediaMixin, serializers.ModelSerializer):
     links = serializers.SerializerMethodField()
 
     class Meta: 
@@ -29,14 +53,14 @@ class SignerSerializer(serializers.ModelSerializer):
         }
 
     def get_links(self, obj):
-        req = self.context.get("request") 
+        b = link_builder(self.context)
         return {
-            "self":     reverse("signer-detail", args=[obj.pk], request=req),
-            "document": reverse("document-detail", args=[obj.document_id], request=req),
+            "self":     b.url("signer-detail", obj.pk),
+            "document": b.url("document-detail", obj.document_id),
         }
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(HypermediaMixin, serializers.ModelSerializer):
     signers = SignerSerializer(many=True, required=False)
     links = serializers.SerializerMethodField()
 
@@ -49,6 +73,12 @@ class DocumentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["status", "open_id", "token", "created_at", "last_updated_at"]
 
+    def validate_company(self, value):
+        # o resumo do relatório (DocumentStatusSummary) é por empresa: documento não muda de dono
+        if self.instance is not None and value.pk != self.instance.company_id:
+            raise serializers.ValidationError("Não é possível mover o documento para outra empresa.")
+        return value
+
     @transaction.atomic
     def update(self, instance, validated_data):
         # pega e remove os signers do payload
@@ -79,17 +109,17 @@ class DocumentSerializer(serializers.ModelSerializer):
         return instance
 
     def get_links(self, obj):
-        req = self.context.get("request")
+        b = link_builder(self.context)
         return {
-            "self":     reverse("document-detail", args=[obj.pk], request=req),
-            "send":     reverse("document-send-to-zapsign", args=[obj.pk], request=req),
-            "status":   reverse("document-status", args=[obj.pk], request=req),
-            "content":  reverse("document-content", args=[obj.pk], request=req),
-            "analysis": reverse("document-analysis", args=[obj.pk], request=req),
+            "self":     b.url("document-detail", obj.pk),
+            "send":     b.url("document-send-to-zapsign", obj.pk),
+            "status":   b.url("document-status", obj.pk),
+            "content":  b.url("document-content", obj.pk),
+            "analysis": b.url("document-analysis", obj.pk),
         }
 
 
-class DocumentContentSerializer(serializers.ModelSerializer):
+class DocumentContentSerializer(HypermediaMixin, serializers.ModelSerializer):
     links = serializers.SerializerMethodField()
 
     class Meta:
@@ -97,9 +127,8 @@ class DocumentContentSerializer(serializers.ModelSerializer):
         fields = ["content_type", "markdown_text", "pdf_url", "links"]
 
     def get_links(self, obj):
-        req = self.context.get("request")
         return {
-            "document": reverse("document-detail", args=[obj.document_id], request=req),
+            "document": link_builder(self.context).url("document-detail", obj.document_id),
         }
 
 class AutomationCreateSendSerializer(serializers.Serializer):
@@ -120,12 +149,16 @@ class AutomationCreateSendSerializer(serializers.Serializer):
     
  
 class ReportDocumentSerializer(serializers.ModelSerializer):
-    signer_count = serializers.IntegerField(read_only=True)
+    # conta a partir do prefetch de signers (evita GROUP BY na query do relatório)
+    signer_count = serializers.SerializerMethodField()
     signers = SignerSerializer(many=True, required=False)
     class Meta:
         model = Document
         fields = ("id", "name", "status", "created_at", "last_updated_at", "signer_count","signers")
 
+    def get_signer_count(self, obj) -> int:
+        return len(obj.signers.all())
+
 
 # análise via automação
 class AutomationAnalysisInputSerializer(serializers.Serializer):
@@ -134,13 +167,45 @@ class AutomationAnalysisInputSerializer(serializers.Serializer):
 
 class AutomationReportFilterSerializer(serializers.Serializer):
     status = serializers.ChoiceField(
-        choices=["draft","sent","signed","canceled", "pending"], required=False
+        choices=["draft","queued","sent","signed","canceled", "pending"], required=False
     )
     date_from = serializers.DateField(required=False)
     date_to = serializers.DateField(required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=1000)
+    output = serializers.ChoiceField(choices=["json", "ndjson"], required=False, default="json")
 
     def validate(self, data):
         df, dt = data.get("date_from"), data.get("date_to")
         if df and dt and df > dt:
             raise serializers.ValidationError("date_from não pode ser maior que date_to.")
-        return data
\ No newline at end of file
+        return data
+
+class StaleDocumentSerializer(ReportDocumentSerializer):
+    age_hours = serializers.SerializerMethodField()
+
+    class Meta(ReportDocumentSerializer.Meta):
+        fields = (*ReportDocumentSerializer.Meta.fields, "age_hours")
+
+    def get_age_hours(self, obj) -> int:
+        return int((self.context["now"] - obj.last_updated_at).total_seconds() // 3600)
+
+class AutomationStaleFilterSerializer(serializers.Serializer):
+    # "pending" = qualquer status ainda em aberto (draft/queued/sent)
+    status = serializers.ChoiceField(choices=["draft", "queued", "sent", "pending"], required=False, default="pending")
+    hours = serializers.IntegerField(required=False, min_value=1, default=24)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=1000)
+
+
+# callback da ZapSign: só o formato do que o usecase lê (o resto do payload passa intacto)
+class ZapSignWebhookSignerSerializer(serializers.Serializer):
+    email = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    status = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    token = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class ZapSignWebhookSerializer(serializers.Serializer):
+    token = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    open_id = serializers.IntegerField(required=False, allow_null=True)
+    status = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    signers = ZapSignWebhookSignerSerializer(many=True, required=False)
@@ -1,92 +1,337 @@
 # documents/services/ai.py
+import asyncio
+import heapq
+import logging
 import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from documents.metrics import in_request_context, track_external
+from documents.services.loop_clients import per_loop
+
+logger = logging.getLogger(__name__)
+
+# mude ao alterar prompt/heurísticas: invalida o cache de análises
+PROMPT_VERSION = "1"
 
 STOPWORDS = {
     "de","da","do","das","dos","para","por","com","sem","entre","uma","um","uns","umas",
     "o","a","os","as","e","ou","em","no","na","nos","nas","ao","à","às","aos","que","se"
 }
 
+# palavra-chave -> peso no risco heurístico
+RISK_WEIGHTS = {
+    "multa": 15, "exclusividade": 10, "indenização": 15,
+    "prazo indeterminado": 15, "renovação automática": 10,
+    "rescisão": -5, "foro": -5, "confidencialidade": -5,
+}
+
+# cláusula esperada -> flag quando ausente
+REQUIRED_CLAUSES = {
+    "rescisão": "Possível falta de cláusula de rescisão",
+    "foro": "Possível falta de cláusula de foro",
+    "confidencialidade": "Possível falta de cláusula de confidencialidade",
+}
+
+class TextAnalyzer:
+    """Heurística local (modo mock) com padrões pré-compilados.
+
+    Uma única cópia em minúsculas serve para tópicos e palavras-chave; cada
+    termo é procurado uma vez só (risco e flags compartilham o resultado).
+    """
+
+    WORD_RE = re.compile(r"\b[\w-]{4,}\b")
+    EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+    MONEY_RE = re.compile(r"(?:R\$\s?\d[\d\.\,]*)")
+    # equivalentes a \b\d{3}... mas começando por \d, o que deixa o re pular direto para dígitos
+    CPF_RE = re.compile(r"\d(?<!\w\d)\d{2}\.\d{3}\.\d{3}-\d{2}\b")
+    CNPJ_RE = re.compile(r"\d(?<!\w\d)\d\.\d{3}\.\d{3}/\d{4}-\d{2}\b")
+
+    def __init__(self, risk_weights: dict | None = None, required_clauses: dict | None = None,
+                 stopwords=STOPWORDS, top_k: int = 5, base_risk: int = 10):
+        self.risk_weights = dict(RISK_WEIGHTS if risk_weights is None else risk_weights)
+        self.required_clauses = dict(REQUIRED_CLAUSES if required_clauses is None else required_clauses)
+        self.stopwords = frozenset(stopwords)
+        self.top_k = top_k
+        self.base_risk = base_risk
+        self._terms = tuple(dict.fromkeys([*self.risk_weights, *self.required_clauses]))
+
+    def keywords(self, lower: str) -> set:
+        # str.__contains__ (busca em C) ficou mais rápido que uma regex combinada nos benchmarks
+        return {t for t in self._terms if t in lower}
+
+    def topics(self, lower: str) -> list:
+        # WORD_RE nunca casa espaço, então rodar a regex por token distinto (peso = contagem)
+        # dá exatamente o mesmo resultado que rodá-la no texto inteiro, e bem mais rápido
+        freq = Counter()
+        for token, n in Counter(lower.split()).items():
+            for w in self.WORD_RE.findall(token):
+                freq[w] += n
+        for w in self.stopwords:
+            freq.pop(w, None)
+        return [w for w, _ in heapq.nsmallest(self.top_k, freq.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+    def extract(self, txt: str) -> dict:
+        # e-mail/CPF/CNPJ não atravessam espaço: basta procurar nos tokens que têm o
+        # caractere obrigatório de cada padrão ("@", "-", "/"), juntados por espaço
+        at, dash, slash = [], [], []
+        if "@" in txt or "-" in txt:
+            for tok in txt.split():
+                if "@" in tok:
+                    at.append(tok)
+                if "-" in tok:
+                    dash.append(tok)
+                    if "/" in tok:
+                        slash.append(tok)
+        return {
+            "emails": self.EMAIL_RE.findall(" ".join(at)) if at else [],
+            "money": self.MONEY_RE.findall(txt) if "R$" in txt else [],
+            "cpf": self.CPF_RE.findall(" ".join(dash)) if dash else [],
+            "cnpj": self.CNPJ_RE.findall(" ".join(slash)) if slash else [],
+        }
+
+    def analyze(self, text: str) -> dict:
+        txt = (text or "").strip()
+        lower = txt.lower()
+        found = self.keywords(lower)
+
+        risk = self.base_risk + sum(w for kw, w in self.risk_weights.items() if kw in found)
+        risk = max(0, min(95, risk))
+
+        summary = txt[:220] + ("..." if len(txt) > 220 else "")
+        return {
+            "summary": summary or "(sem conteúdo informado)",
+            "topics": self.topics(lower),
+            "risk_score": risk,
+            "extracted": self.extract(txt),
+            "flags": [msg for kw, msg in self.required_clauses.items() if kw not in found],
+        }
+
+_analyzer = TextAnalyzer()
+
 def _mock_analyze(text: str) -> dict:
-    txt = (text or "").strip()
-    words = re.findall(r"\b[\w-]{4,}\b", txt.lower())
-    words = [w for w in words if w not in STOPWORDS]
-    # tópicos por frequência
-    freq = {}
-    for w in words:
-        freq[w] = freq.get(w, 0) + 1
-    topics = [w for w, _ in sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:5]]
-
-    # extrações simples
-    emails = re.findall(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", txt)
-    money  = re.findall(r"(?:R\$\s?\d[\d\.\,]*)", txt)
-    cpf    = re.findall(r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b", txt)
-    cnpj   = re.findall(r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b", txt)
-
-    # risco heurístico
-    lower = txt.lower()
-    risk = 10
-    for kw, inc in [
-        ("multa", 15), ("exclusividade", 10), ("indenização", 15),
-        ("prazo indeterminado", 15), ("renovação automática", 10),
-        ("rescisão", -5), ("foro", -5), ("confidencialidade", -5),
-    ]:
-        if kw in lower:
-            risk += inc
-    risk = max(0, min(95, risk))
-
-    summary = txt[:220] + ("..." if len(txt) > 220 else "")
-    return {
-        "summary": summary or "(sem conteúdo informado)",
-        "topics": topics,
-        "risk_score": risk,
-        "extracted": {"emails": emails, "money": money, "cpf": cpf, "cnpj": cnpj},
-        "flags": [
-            msg for cond, msg in [
-                ("rescisão" not in lower, "Possível falta de cláusula de rescisão"),
-                ("foro" not in lower, "Possível falta de cláusula de foro"),
-                ("confidencialidade" not in lower, "Possível falta de cláusula de confidencialidade"),
-            ] if cond
-        ],
-    }
+    return _analyzer.analyze(text)
 
-def _openai_analyze(text: str) -> dict:
-    # se a chave faltar, cai pro mock
-    if not settings.OPENAI_API_KEY:
-        return _mock_analyze(text)
+SUMMARY_PROMPT = (
+    "Você é um assistente jurídico. Dado o texto de um contrato, produza um resumo em 2 linhas.\n"
+    "Não repita o texto inteiro; foque no essencial.\n\n"
+    "Texto:\n"
+)
+CHUNK_PROMPT = (
+    "Você é um assistente jurídico. Resuma este trecho de um contrato em até 5 linhas, "
+    "mantendo partes, valores, prazos, multas e obrigações.\n\n"
+    "Trecho:\n"
+)
+MERGE_PROMPT = (
+    "Você é um assistente jurídico. Abaixo estão resumos, em ordem, de trechos de um mesmo contrato. "
+    "Produza um resumo do contrato inteiro em 2 linhas.\n\n"
+    "Resumos:\n"
+)
 
-    prompt = (
-        "Você é um assistente jurídico. Dado o texto de um contrato, produza um resumo em 2 linhas.\n"
-        "Não repita o texto inteiro; foque no essencial.\n\n"
-        f"Texto:\n{text}"
-    )
+MAX_REDUCE_ROUNDS = 3
+
+def estimate_tokens(text: str) -> int:
+    # ~4 caracteres por token (pt-BR, modelos GPT); suficiente para orçamento de contexto
+    return (len(text) + 3) // 4
+
+def chunk_text(text: str, max_tokens: int) -> list[str]:
+    """Quebra em blocos de até `max_tokens`, preferindo fronteiras de linha."""
+    max_chars = max(1, max_tokens * 4)
+    if len(text) <= max_chars:
+        return [text]
+    chunks, cur, size = [], [], 0
+    for line in text.split("\n"):
+        while len(line) > max_chars:  # linha gigante: corte seco
+            if cur:
+                chunks.append("\n".join(cur))
+                cur, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if cur and size + len(line) + 1 > max_chars:
+            chunks.append("\n".join(cur))
+            cur, size = [], 0
+        cur.append(line)
+        size += len(line) + 1
+    if cur:
+        chunks.append("\n".join(cur))
+    return chunks
 
-    resp = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={
+_session = None
+_session_lock = threading.Lock()
+
+def _openai_session() -> requests.Session:
+    # keep-alive compartilhado entre as chamadas concorrentes
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            size = max(1, getattr(settings, "AI_MAX_CONCURRENCY", 4))
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+def _chat_request(prompt: str) -> dict:
+    return {
+        "url": f"{settings.OPENAI_BASE.rstrip('/')}/chat/completions",
+        "headers": {
             "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
             "Content-Type": "application/json",
         },
-        json={
-            "model": "gpt-4o-mini",
+        "json": {
+            "model": settings.OPENAI_MODEL,
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0.2,
         },
-        timeout=25,
+    }
+
+@track_external("openai")
+def _openai_chat(prompt: str) -> str:
+    resp = _openai_session().post(**_chat_request(prompt), timeout=getattr(settings, "OPENAI_TIMEOUT", 25))
+    resp.raise_for_status()
+    return resp.json()["choices"][0]["message"]["content"].strip()
+
+def _new_openai_async_client() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    size = max(1, getattr(settings, "AI_ASYNC_MAX_CONCURRENCY", 64))
+    return (
+        httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=min(size, 20)),
+            timeout=httpx.Timeout(getattr(settings, "OPENAI_TIMEOUT", 25), pool=None),
+        ),
+        # espera aqui, não na fila interna do httpcore (cara com centenas de pendentes)
+        asyncio.Semaphore(size),
     )
+
+async def _openai_async_client() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    # um httpx.AsyncClient (+ semáforo) por event loop, fechado quando o loop encerra;
+    # o limite de conexões é o teto de requests simultâneos
+    return await per_loop("openai", _new_openai_async_client, lambda entry: entry[0].aclose())
+
+@track_external("openai")
+async def _aopenai_chat(prompt: str) -> str:
+    req = _chat_request(prompt)
+    client, slots = await _openai_async_client()
+    async with slots:
+        resp = await client.post(req.pop("url"), **req)
     resp.raise_for_status()
-    summary = resp.json()["choices"][0]["message"]["content"].strip()
+    return resp.json()["choices"][0]["message"]["content"].strip()
+
+def _summarize_many(texts: list[str], workers: int, chunk_tokens: int) -> list[str | None]:
+    """Map-reduce por rodadas: todos os trechos de todos os documentos dividem o mesmo pool.
+
+    Documento curto: uma chamada. Longo: resume cada trecho, junta os resumos
+    e repete até caber em um bloco, que recebe o prompt final.
+    None = falhou (o chamador cai na heurística local).
+    """
+    summaries: list[str | None] = [None] * len(texts)
+    pending = {i: (chunk_text(t, chunk_tokens), False) for i, t in enumerate(texts)}
+    rounds = 1
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending:
+            futures = {}
+            for i, (parts, merged) in pending.items():
+                if len(parts) == 1:
+                    prompt = (MERGE_PROMPT if merged else SUMMARY_PROMPT) + parts[0]
+                    futures[i] = [pool.submit(in_request_context(_openai_chat), prompt)]
+                else:
+                    futures[i] = [pool.submit(in_request_context(_openai_chat), CHUNK_PROMPT + p) for p in parts]
+
+            next_round = {}
+            for i, futs in futures.items():
+                try:
+                    out = [f.result() for f in futs]
+                except Exception as e:
+                    logger.warning("Falha na análise via OpenAI (item %s): %s", i, e)
+                    continue
+                if len(pending[i][0]) == 1:
+                    summaries[i] = out[0]
+                elif rounds >= MAX_REDUCE_ROUNDS:
+                    # resumos não encolhem: fecha com o que couber num bloco
+                    next_round[i] = (["\n".join(out)[:chunk_tokens * 4]], True)
+                else:
+                    next_round[i] = (chunk_text("\n".join(out), chunk_tokens), True)
+            pending = next_round
+            rounds += 1
+    return summaries
+
+async def _asummarize(text: str, chunk_tokens: int) -> str:
+    # mesmo map-reduce de _summarize_many, um documento por corrotina
+    parts, merged, rounds = chunk_text(text, chunk_tokens), False, 1
+    while len(parts) > 1:
+        out = await asyncio.gather(*(_aopenai_chat(CHUNK_PROMPT + p) for p in parts))
+        if rounds >= MAX_REDUCE_ROUNDS:
+            parts = ["\n".join(out)[:chunk_tokens * 4]]
+        else:
+            parts = chunk_text("\n".join(out), chunk_tokens)
+        merged, rounds = True, rounds + 1
+    return await _aopenai_chat((MERGE_PROMPT if merged else SUMMARY_PROMPT) + parts[0])
 
+def _with_summary(text: str, summary: str | None) -> dict:
     # mantém heurísticas locais para tópicos/risco/extrações
     base = _mock_analyze(text)
-    base["summary"] = summary[:600]
+    if summary is None:
+        base["fallback"] = True  # resumo local; não entra no cache
+    else:
+        base["summary"] = summary[:600]
     # ligeiro ajuste: não deixar risco muito baixo quando há termos críticos
     base["risk_score"] = max(base["risk_score"], 20 if any(k in text.lower() for k in ["multa","indenização"]) else base["risk_score"])
     return base
 
+def analyze_many(texts: list[str], max_workers: int | None = None) -> list[dict]:
+    """Analisa vários textos numa chamada, com no máximo `max_workers` requests simultâneos à OpenAI."""
+    texts = [t or "" for t in texts]
+    if current_mode() != "openai":
+        return [_mock_analyze(t) for t in texts]
+
+    summaries = _summarize_many(
+        texts,
+        workers=max_workers or getattr(settings, "AI_MAX_CONCURRENCY", 4),
+        chunk_tokens=getattr(settings, "AI_CHUNK_TOKENS", 3000),
+    )
+    return [_with_summary(text, summary) for text, summary in zip(texts, summaries)]
+
+async def aanalyze_many(texts: list[str]) -> list[dict]:
+    """analyze_many para views async: as chamadas à OpenAI não ocupam threads."""
+    texts = [t or "" for t in texts]
+    if current_mode() != "openai":
+        # heurística é CPU: fora do event loop
+        return await asyncio.to_thread(lambda: [_mock_analyze(t) for t in texts])
+
+    chunk_tokens = getattr(settings, "AI_CHUNK_TOKENS", 3000)
+    out = await asyncio.gather(*(_asummarize(t, chunk_tokens) for t in texts), return_exceptions=True)
+    summaries = []
+    for i, res in enumerate(out):
+        if isinstance(res, Exception):
+            logger.warning("Falha na análise via OpenAI (item %s): %s", i, res)
+            res = None
+        summaries.append(res)
+    return await asyncio.to_thread(lambda: [_with_summary(t, sm) for t, sm in zip(texts, summaries)])
+
+def _openai_analyze(text: str) -> dict:
+    # se a chave faltar, cai pro mock
+    if not settings.OPENAI_API_KEY:
+        return _mock_analyze(text)
+    return analyze_many([text])[0]
+
+def current_mode() -> str:
+    # modo efetivo: openai sem chave cai no mock
+    mode = getattr(settings, "AI_MODE", "mock")
+    if mode == "openai" and settings.OPENAI_API_KEY:
+        return "openai"
+    return "mock"
+
 def analyze_text(text: str) -> dict:
     mode = getattr(settings, "AI_MODE", "mock")
     if mode == "openai":
         return _openai_analyze(text or "")
     return _mock_analyze(text or "")
+
+async def aanalyze_text(text: str) -> dict:
+    return (await aanalyze_many([text]))[0]
@@ -0,0 +1,30 @@
+# documents/services/loop_clients.py
+# Clientes async (httpx.AsyncClient) ficam presos ao event loop em que foram criados: um por loop,
+# fechado quando o loop encerra. Sob WSGI cada async_to_sync roda num asyncio.run novo; sem fechar,
+# sobrava um cliente (com as conexões abertas) por request.
+import asyncio
+import weakref
+
+_entries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+async def _close_at_shutdown(aclose):
+    try:
+        yield
+    finally:
+        await aclose()
+
+async def per_loop(name: str, factory, aclose):
+    """`factory()` uma vez por (loop, name); `await aclose(obj)` quando o loop encerra.
+
+    asyncio.run (uvicorn, async_to_sync) chama shutdown_asyncgens ao sair: o gerador-guarda
+    guardado aqui recebe aclose() e fecha o cliente ainda dentro do loop.
+    """
+    loop = asyncio.get_running_loop()
+    entries = _entries.setdefault(loop, {})
+    entry = entries.get(name)
+    if entry is None:
+        obj = factory()
+        guard = _close_at_shutdown(lambda: aclose(obj))
+        entry = entries[name] = (obj, guard)  # o loop só guarda referência fraca ao gerador
+        await guard.__anext__()
+    return entry[0]
@@ -1,14 +1,171 @@
-import requests, io
+import asyncio, httpx, requests, hashlib, os, tempfile, threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator
 from pdfminer.high_level import extract_text
+from pdfminer.pdfpage import PDFPage
 
-def pdf_url_to_text(url: str, max_pages: int | None = 20) -> str:
-    r = requests.get(url, timeout=20)
-    r.raise_for_status()
-    raw = io.BytesIO(r.content)
+from documents.metrics import track_external
+
+MAX_PDF_BYTES = 25 * 1024 * 1024   # corte duro do download
+SPOOL_BYTES = 2 * 1024 * 1024      # acima disso o download vai para disco
+CHUNK_PAGES = 5                    # páginas por tarefa no pool
+_READ_SIZE = 64 * 1024
+
+@dataclass
+class PdfText:
+    text: str               # vazio quando not_modified
+    etag: str = ""
+    last_modified: str = ""
+    sha256: str = ""        # dos bytes do PDF
+    not_modified: bool = False
 
-    text = extract_text(raw, maxpages=max_pages).strip()
+class PdfTooLargeError(ValueError):
+    pass
+
+def _clean(text: str) -> str:
+    text = text.strip()
     if not text:
         raise ValueError("Nenhum texto encontrado no PDF (possível PDF-imagem).")
 
     # limpa quebras duplicadas
     return "\n".join(l.rstrip() for l in text.splitlines() if l.strip())
+
+# -------- download --------
+class _Spool:
+    """Arquivo temporário + sha256 + corte de tamanho, alimentado por blocos."""
+
+    def __init__(self, headers, max_bytes: int):
+        declared = headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise PdfTooLargeError(f"PDF maior que o limite de {max_bytes} bytes.")
+        self.max_bytes = max_bytes
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self.digest, self.total = hashlib.sha256(), 0
+
+    def write(self, chunk: bytes):
+        self.total += len(chunk)
+        if self.total > self.max_bytes:
+            raise PdfTooLargeError(f"PDF maior que o limite de {self.max_bytes} bytes.")
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def done(self):
+        self.file.seek(0)
+        return self.file, self.digest.hexdigest()
+
+def _stream_to_spool(r, max_bytes: int):
+    spool = _Spool(r.headers, max_bytes)
+    try:
+        for chunk in r.iter_content(_READ_SIZE):
+            spool.write(chunk)
+    except BaseException:
+        spool.file.close()
+        raise
+    return spool.done()
+
+# -------- extração --------
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # um pool por processo (criado no primeiro uso, depois do fork do gunicorn)
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+def _extract_pages(path: str, pages: list[int]) -> str:
+    with open(path, "rb") as fp:
+        return extract_text(fp, page_numbers=pages)
+
+def iter_pdf_text(fp, max_pages: int | None = 20, workers: int = 1,
+                  chunk_pages: int = CHUNK_PAGES) -> Iterator[str]:
+    """Texto do PDF por blocos de páginas, na ordem, à medida que ficam prontos."""
+    total = sum(1 for _ in PDFPage.get_pages(fp, maxpages=max_pages or 0))
+    fp.seek(0)
+    chunks = [list(range(i, min(i + chunk_pages, total))) for i in range(0, total, chunk_pages)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        for pages in chunks:
+            yield extract_text(fp, page_numbers=pages)
+            fp.seek(0)
+        return
+
+    # processos precisam de um arquivo com nome no disco
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        while block := fp.read(_READ_SIZE):
+            tmp.write(block)
+    try:
+        pool = _get_pool(workers)
+        yield from pool.map(_extract_pages, [tmp.name] * len(chunks), chunks)
+    finally:
+        os.unlink(tmp.name)
+
+def iter_pdf_url_text(url: str, *, max_pages: int | None = 20, max_bytes: int = MAX_PDF_BYTES,
+                      workers: int = 1) -> Iterator[str]:
+    with requests.get(url, stream=True, timeout=20) as r:
+        r.raise_for_status()
+        spool, _ = _stream_to_spool(r, max_bytes)
+    with spool:
+        yield from iter_pdf_text(spool, max_pages=max_pages, workers=workers)
+
+@track_external("pdf")
+def fetch_pdf_text(url: str, *, etag: str = "", last_modified: str = "", known_sha256: str = "",
+                   max_pages: int | None = 20, max_bytes: int = MAX_PDF_BYTES, workers: int = 1) -> PdfText:
+    """GET condicional: 304 (ou bytes iguais a `known_sha256`) não re-extrai o texto."""
+    headers = _conditional_headers(etag, last_modified)
+
+    with requests.get(url, headers=headers, stream=True, timeout=20) as r:
+        if r.status_code == 304:
+            return PdfText("", etag, last_modified, known_sha256, not_modified=True)
+        r.raise_for_status()
+        new_etag = r.headers.get("ETag", "")
+        new_lm = r.headers.get("Last-Modified", "")
+        spool, sha = _stream_to_spool(r, max_bytes)
+    return _spool_to_text(spool, sha, new_etag, new_lm, known_sha256, max_pages, workers)
+
+def _conditional_headers(etag: str, last_modified: str) -> dict:
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+def _spool_to_text(spool, sha: str, etag: str, last_modified: str, known_sha256: str,
+                   max_pages: int | None, workers: int) -> PdfText:
+    with spool:
+        if known_sha256 and sha == known_sha256:
+            return PdfText("", etag, last_modified, sha, not_modified=True)
+        text = _clean("".join(iter_pdf_text(spool, max_pages=max_pages, workers=workers)))
+    return PdfText(text, etag, last_modified, sha)
+
+@track_external("pdf")
+async def afetch_pdf_text(url: str, *, etag: str = "", last_modified: str = "", known_sha256: str = "",
+                          max_pages: int | None = 20, max_bytes: int = MAX_PDF_BYTES, workers: int = 1) -> PdfText:
+    """fetch_pdf_text para views async: download sem bloquear o loop, extração numa thread."""
+    async with httpx.AsyncClient(timeout=20) as client:
+        async with client.stream("GET", url, headers=_conditional_headers(etag, last_modified)) as r:
+            if r.status_code == 304:
+                return PdfText("", etag, last_modified, known_sha256, not_modified=True)
+            r.raise_for_status()
+            spool = _Spool(r.headers, max_bytes)
+            try:
+                async for chunk in r.aiter_bytes(_READ_SIZE):
+                    spool.write(chunk)
+            except BaseException:
+                spool.file.close()
+                raise
+            file, sha = spool.done()
+    return await asyncio.to_thread(
+        _spool_to_text, file, sha, r.headers.get("ETag", ""), r.headers.get("Last-Modified", ""),
+        known_sha256, max_pages, workers,
+    )
+
+def pdf_url_to_text(url: str, max_pages: int | None = 20) -> str:
+    return fetch_pdf_text(url, max_pages=max_pages).text
@@ -1,8 +1,17 @@
 # documents/services/zapsign.py
 from django.conf import settings
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+import asyncio
+import httpx
 import requests
+import threading, time
 import uuid, random
 
+from documents.metrics import track_external
+from documents.services.loop_clients import per_loop
+
 BASE = settings.ZAPSIGN_BASE
 MODE = settings.ZS_MODE
 TIMEOUT = 20
@@ -17,20 +26,205 @@ def _raise(r):
         body = r.text
     raise ExternalServiceError(f"ZapSign {r.status_code}: {body}")
 
+# -------- CLIENT (sessão HTTP com pool/keep-alive) --------
+class _RetryPolicy:
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # POST cria documento: só repete quando a ZapSign garante que não processou
+    RETRY_STATUSES_POST = {429, 503}
+
+    def __init__(self, base: str = BASE, *, pool_size: int = 10, timeouts: dict | None = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 10.0):
+        self.base = base.rstrip("/")
+        self.pool_size = pool_size
+        self.timeouts = {"create": (5, TIMEOUT), "status": (5, 10), **(timeouts or {})}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "errors": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _delay(self, attempt: int, r) -> float:
+        retry_after = r.headers.get("Retry-After") if r is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    when = parsedate_to_datetime(retry_after)
+                    return min(self.backoff_max, max(0.0, (when - datetime.now(timezone.utc)).total_seconds()))
+                except (TypeError, ValueError):
+                    pass
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+class ZapSignClient(_RetryPolicy):
+    def __init__(self, base: str = BASE, **kw):
+        super().__init__(base, **kw)
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+    def create_document(self, api_token: str, payload: dict) -> dict:
+        return self._request("POST", "create", "/docs/", api_token, json=payload)
+
+    def get_status(self, api_token: str, token: str) -> dict:
+        return self._request("GET", "status", f"/docs/{token}/", api_token)
+
+    def metrics(self) -> dict:
+        # urllib3 conta conexões abertas e requests por pool: o resto reaproveitou conexão
+        opened = served = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            served += pool.num_requests
+        with self._lock:
+            out = dict(self._counters)
+        out.update(connections_opened=opened, pool_hits=max(0, served - opened))
+        return out
+
+    def close(self):
+        self.session.close()
+
+    @track_external("zapsign")
+    def _request(self, method: str, endpoint: str, path: str, api_token: str, **kw) -> dict:
+        retry_on = self.RETRY_STATUSES_POST if method == "POST" else self.RETRY_STATUSES
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                r = self.session.request(
+                    method, f"{self.base}{path}",
+                    headers={"Authorization": f"Bearer {api_token}"},
+                    timeout=self.timeouts[endpoint], **kw,
+                )
+            except requests.ConnectionError:
+                # GET é idempotente; POST pode já ter chegado à ZapSign
+                if method != "GET" or attempt >= self.max_retries:
+                    self._count("errors")
+                    raise
+                r = None
+
+            if r is not None and (r.status_code not in retry_on or attempt >= self.max_retries):
+                if r.status_code >= 400:
+                    self._count("errors")
+                    _raise(r)
+                return r.json()
+
+            attempt += 1
+            self._count("retries")
+            time.sleep(self._delay(attempt, r))
+
+class AsyncZapSignClient(_RetryPolicy):
+    """Mesma política do ZapSignClient sobre httpx.AsyncClient (views ASGI).
+
+    O AsyncClient fica preso ao event loop em que foi criado; use get_async_client().
+    """
+
+    def __init__(self, base: str = BASE, *, keepalive: int = 20, **kw):
+        super().__init__(base, **kw)
+        # poucas conexões ociosas: o pool do httpcore varre todas a cada request
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=min(keepalive, self.pool_size)),
+        )
+        # a fila de espera fica aqui: a fila interna do httpcore custa O(n) por conexão liberada
+        self._slots = asyncio.Semaphore(self.pool_size)
+
+    async def create_document(self, api_token: str, payload: dict) -> dict:
+        return await self._request("POST", "create", "/docs/", api_token, json=payload)
+
+    async def get_status(self, api_token: str, token: str) -> dict:
+        return await self._request("GET", "status", f"/docs/{token}/", api_token)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    @track_external("zapsign")
+    async def _request(self, method: str, endpoint: str, path: str, api_token: str, **kw) -> dict:
+        retry_on = self.RETRY_STATUSES_POST if method == "POST" else self.RETRY_STATUSES
+        connect, read = self.timeouts[endpoint]
+        # pool=None: com o pool cheio a chamada espera a vez em vez de estourar timeout
+        timeout = httpx.Timeout(read, connect=connect, pool=None)
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                async with self._slots:
+                    r = await self.client.request(
+                        method, f"{self.base}{path}",
+                        headers={"Authorization": f"Bearer {api_token}"},
+                        timeout=timeout, **kw,
+                    )
+            except httpx.TransportError as e:
+                # GET é idempotente (inclusive ReadTimeout); POST só quando nem conectou
+                retryable = method == "GET" or isinstance(e, httpx.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    self._count("errors")
+                    raise
+                r = None
+
+            if r is not None and (r.status_code not in retry_on or attempt >= self.max_retries):
+                if r.status_code >= 400:
+                    self._count("errors")
+                    _raise(r)
+                return r.json()
+
+            attempt += 1
+            self._count("retries")
+            await asyncio.sleep(self._delay(attempt, r))
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> ZapSignClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ZapSignClient(
+                    BASE,
+                    pool_size=settings.ZS_POOL_SIZE,
+                    timeouts={
+                        "create": (settings.ZS_CONNECT_TIMEOUT, settings.ZS_CREATE_TIMEOUT),
+                        "status": (settings.ZS_CONNECT_TIMEOUT, settings.ZS_STATUS_TIMEOUT),
+                    },
+                    max_retries=settings.ZS_MAX_RETRIES,
+                )
+    return _client
+
+def _new_async_client() -> AsyncZapSignClient:
+    return AsyncZapSignClient(
+        BASE,
+        pool_size=settings.ZS_ASYNC_POOL_SIZE,
+        keepalive=settings.ZS_ASYNC_KEEPALIVE,
+        timeouts={
+            "create": (settings.ZS_CONNECT_TIMEOUT, settings.ZS_CREATE_TIMEOUT),
+            "status": (settings.ZS_CONNECT_TIMEOUT, settings.ZS_STATUS_TIMEOUT),
+        },
+        max_retries=settings.ZS_MAX_RETRIES,
+    )
+
+async def get_async_client() -> AsyncZapSignClient:
+    # um por event loop (uvicorn: um loop por worker), fechado quando o loop encerra
+    return await per_loop("zapsign", _new_async_client, AsyncZapSignClient.aclose)
+
 # -------- REAL --------
 def _real_create_document(api_token: str, payload: dict) -> dict:
-    r = requests.post(f"{BASE}/docs/", json=payload,
-                      headers={"Authorization": f"Bearer {api_token}"}, timeout=TIMEOUT)
-    if r.status_code >= 400:
-        _raise(r)
-    return r.json()
+    return get_client().create_document(api_token, payload)
 
 def _real_get_status(api_token: str, token: str) -> dict:
-    r = requests.get(f"{BASE}/docs/{token}/",
-                     headers={"Authorization": f"Bearer {api_token}"}, timeout=TIMEOUT)
-    if r.status_code >= 400:
-        _raise(r)
-    return r.json()
+    return get_client().get_status(api_token, token)
 
 # -------- MOCK --------
 def _mock_create_document(_: str, payload: dict) -> dict:
@@ -62,3 +256,15 @@ def get_status(api_token: str, open_id: int) -> dict:
     if MODE == "off":
         return {"open_id": open_id, "status": "draft"}
     return _mock_get_status(api_token, open_id)
+
+async def acreate_document(api_token: str, payload: dict) -> dict:
+    if MODE == "real":
+        client = await get_async_client()
+        return await client.create_document(api_token, payload)
+    return create_document(api_token, payload)
+
+async def aget_status(api_token: str, open_id: int) -> dict:
+    if MODE == "real":
+        client = await get_async_client()
+        return await client.get_status(api_token, open_id)
+    return get_status(api_token, open_id)
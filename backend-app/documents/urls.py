@@ -4,9 +4,13 @@ from rest_framework.routers import DefaultRouter
 from .views import CompanyViewSet, DocumentViewSet, SignerViewSet
 from .views_automation import (
     AutomationCreateSendView,
+    AutomationCreateSendBulkView,
     AutomationAnalysisView,
     AutomationReportView,
+    AutomationStaleDocumentsView,
 )
+from .views_async import AsyncAutomationAnalysisView, AsyncAutomationCreateSendView
+from .views_webhooks import ZapSignWebhookView
 
 router = DefaultRouter()
 router.register(r"companies", CompanyViewSet)
@@ -16,6 +20,12 @@ router.register(r"signers", SignerViewSet)
 urlpatterns = [
     path("", include(router.urls)),
     path("automations/create_send/", AutomationCreateSendView.as_view(), name="automation-create-send"),
+    path("automations/create_send/bulk/", AutomationCreateSendBulkView.as_view(), name="automation-create-send-bulk"),
     path("automations/analysis/<int:pk>/", AutomationAnalysisView.as_view(), name="automation-analysis"),
     path("automations/reports/documents/", AutomationReportView.as_view(), name="automation-report-docs"),
+    path("automations/reports/stale/", AutomationStaleDocumentsView.as_view(), name="automation-report-stale"),
+    # async (ASGI): mesmas regras, sem prender thread nas chamadas externas
+    path("automations/async/create_send/", AsyncAutomationCreateSendView.as_view(), name="automation-create-send-async"),
+    path("automations/async/analysis/<int:pk>/", AsyncAutomationAnalysisView.as_view(), name="automation-analysis-async"),
+    path("webhooks/zapsign/", ZapSignWebhookView.as_view(), name="webhook-zapsign"),
 ]
@@ -1,25 +1,177 @@
 # documents/usecases/analyze_document.py
-from documents.services.pdf_text import pdf_url_to_text
-from documents.services.ai import analyze_text
-from documents.usecases.errors import ValidationError 
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from documents.logs import log_context
+from documents.services.pdf_text import MAX_PDF_BYTES, PdfTooLargeError, afetch_pdf_text, fetch_pdf_text
+from documents.services.ai import PROMPT_VERSION, aanalyze_text, analyze_text, current_mode
+from documents.usecases.errors import ValidationError
+
+# contadores do processo (expostos em /metrics)
+_stats_lock = threading.Lock()
+CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        CACHE_STATS[name] += n
+
+def cache_stats() -> dict:
+    with _stats_lock:
+        return dict(CACHE_STATS)
 
 class AnalyzeDocument:
     def __init__(self, repo): self.repo = repo
 
     def execute(self, doc_id: int, text: str | None = None):
-        doc = self.repo.get_document_with_signers(doc_id)
-        if not text:
-            # tenta usar conteúdo salvo
-            content = getattr(doc, "content", None)
-            if not content:
-                raise ValidationError("Documento sem conteúdo definido.")
-            if content.content_type == "markdown":
-                text = content.markdown_text or ""
-            else: 
-                print('verificando pdf url',content.pdf_url)                          # url_pdf
-                text = pdf_url_to_text(content.pdf_url)
-
-        if len(text.strip()) < 30:
-            raise ValidationError("Texto insuficiente para análise.")
-
-        return analyze_text(text)
+        with log_context(document_id=doc_id):
+            doc = self.repo.get_document_with_signers(doc_id)
+            content = None
+            if not text:
+                # tenta usar conteúdo salvo
+                content = getattr(doc, "content", None)
+                if not content:
+                    raise ValidationError("Documento sem conteúdo definido.")
+                if content.content_type == "markdown":
+                    text = content.markdown_text or ""
+                else:
+                    text = self.pdf_text(content)
+
+            if len(text.strip()) < 30:
+                raise ValidationError("Texto insuficiente para análise.")
+
+            sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if content is not None:
+                self.repo.set_content_sha256(content, sha)
+            return self.analyze_cached(text, sha)
+
+    def pdf_text(self, content) -> str:
+        """Texto do PDF com cache no DocumentContent.
+
+        Dentro de PDF_TEXT_REVALIDATE_SECONDS não há download; depois disso,
+        GET condicional (ETag/Last-Modified) e só re-extrai se os bytes mudaram.
+        """
+        now = timezone.now()
+        if self._pdf_fresh(content, now):
+            return content.extracted_text
+        try:
+            res = fetch_pdf_text(content.pdf_url, **self._pdf_fetch_args(content))
+        except PdfTooLargeError as e:
+            raise ValidationError(str(e))
+        self.repo.save_pdf_text(content, **self._pdf_saved(res, now))
+        return content.extracted_text if res.not_modified else res.text
+
+    @staticmethod
+    def _pdf_fresh(content, now) -> bool:
+        max_age = getattr(settings, "PDF_TEXT_REVALIDATE_SECONDS", 3600)
+        return bool(content.extracted_text and content.text_checked_at
+                    and now - content.text_checked_at < timedelta(seconds=max_age))
+
+    @staticmethod
+    def _pdf_fetch_args(content) -> dict:
+        cached = content.extracted_text
+        return {
+            "etag": content.pdf_etag if cached else "",
+            "last_modified": content.pdf_last_modified if cached else "",
+            "known_sha256": content.pdf_sha256 if cached else "",
+            "max_pages": getattr(settings, "PDF_MAX_PAGES", 20) or None,
+            "max_bytes": getattr(settings, "PDF_MAX_BYTES", MAX_PDF_BYTES),
+            "workers": getattr(settings, "PDF_EXTRACT_WORKERS", 1),
+        }
+
+    @staticmethod
+    def _pdf_saved(res, now) -> dict:
+        # not_modified: só renova validadores e carimbo
+        out = {"checked_at": now, "etag": res.etag, "last_modified": res.last_modified, "pdf_sha256": res.sha256}
+        if not res.not_modified:
+            out["text"] = res.text
+        return out
+
+    def analyze_cached(self, text: str, sha: str) -> dict:
+        ttl = getattr(settings, "AI_CACHE_TTL", 0)
+        if ttl <= 0:
+            return analyze_text(text)
+
+        mode = current_mode()
+        key = _cache_key(sha, mode)
+        now = timezone.now()
+        cached = self.repo.get_cached_analysis(key, now - timedelta(seconds=ttl))
+        if cached is not None:
+            _count("hits")
+            return cached
+
+        _count("misses")
+        result = analyze_text(text)
+        if result.get("fallback"):
+            return result  # OpenAI falhou: não guarda o resumo local como se fosse da IA
+        self.repo.save_cached_analysis(key, sha, mode, PROMPT_VERSION, result)
+        evicted = self.repo.evict_analysis_cache(
+            getattr(settings, "AI_CACHE_MAX_ENTRIES", 10_000), now - timedelta(seconds=ttl)
+        )
+        if evicted:
+            _count("evictions", evicted)
+        return result
+
+    # -------- async (views ASGI) --------
+    async def aexecute(self, doc_id: int, text: str | None = None):
+        with log_context(document_id=doc_id):
+            doc = await self.repo.aget_document_with_signers(doc_id)
+            content = None
+            if not text:
+                content = getattr(doc, "content", None)
+                if not content:
+                    raise ValidationError("Documento sem conteúdo definido.")
+                if content.content_type == "markdown":
+                    text = content.markdown_text or ""
+                else:
+                    text = await self.apdf_text(content)
+
+            if len(text.strip()) < 30:
+                raise ValidationError("Texto insuficiente para análise.")
+
+            sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if content is not None:
+                await self.repo.aset_content_sha256(content, sha)
+            return await self.aanalyze_cached(text, sha)
+
+    async def apdf_text(self, content) -> str:
+        now = timezone.now()
+        if self._pdf_fresh(content, now):
+            return content.extracted_text
+        try:
+            res = await afetch_pdf_text(content.pdf_url, **self._pdf_fetch_args(content))
+        except PdfTooLargeError as e:
+            raise ValidationError(str(e))
+        await self.repo.asave_pdf_text(content, **self._pdf_saved(res, now))
+        return content.extracted_text if res.not_modified else res.text
+
+    async def aanalyze_cached(self, text: str, sha: str) -> dict:
+        ttl = getattr(settings, "AI_CACHE_TTL", 0)
+        if ttl <= 0:
+            return await aanalyze_text(text)
+
+        mode = current_mode()
+        key = _cache_key(sha, mode)
+        now = timezone.now()
+        cached = await self.repo.aget_cached_analysis(key, now - timedelta(seconds=ttl))
+        if cached is not None:
+            _count("hits")
+            return cached
+
+        _count("misses")
+        result = await aanalyze_text(text)
+        if result.get("fallback"):
+            return result
+        await self.repo.asave_cached_analysis(key, sha, mode, PROMPT_VERSION, result)
+        evicted = await self.repo.aevict_analysis_cache(
+            getattr(settings, "AI_CACHE_MAX_ENTRIES", 10_000), now - timedelta(seconds=ttl)
+        )
+        if evicted:
+            _count("evictions", evicted)
+        return result
+
+def _cache_key(sha: str, mode: str) -> str:
+    return hashlib.sha256(f"{sha}:{mode}:{PROMPT_VERSION}".encode()).hexdigest()
@@ -1,11 +1,33 @@
 import uuid
-from .errors import ValidationError
+from .errors import BulkValidationError, ValidationError
 
 class CreateDocument:
     def __init__(self, repo):
         self.repo = repo
 
     def execute(self, data: dict):
+        return self.repo.create_document_with_signers(self.normalize(data))
+
+    def execute_many(self, items: list[dict]):
+        """Cria vários documentos (com signers/conteúdo) numa única transação.
+
+        Valida todos antes de gravar qualquer um; erros são devolvidos por índice.
+        """
+        payloads, errors = [], {}
+        for i, data in enumerate(items):
+            try:
+                payload = self.normalize(data)
+            except ValidationError as e:
+                errors[i] = str(e)
+                continue
+            if data.get("content"):
+                payload["content"] = data["content"]
+            payloads.append(payload)
+        if errors:
+            raise BulkValidationError(errors)
+        return self.repo.create_documents_with_signers(payloads)
+
+    def normalize(self, data: dict) -> dict:
         name = (data.get("name") or "").strip()
         if not name:
             raise ValidationError("Nome do documento é obrigatório.")
@@ -34,12 +56,10 @@ class CreateDocument:
                 "external_id": (s.get("external_id") or str(uuid.uuid4())).strip(),
             })
 
-        payload = {
+        return {
             "company": company_id,
             "name": name,
             "created_by": (data.get("created_by") or "").strip(),
             "external_id": (data.get("external_id") or str(uuid.uuid4())).strip(),
             "signers": signers,
         }
-
-        return self.repo.create_document_with_signers(payload)
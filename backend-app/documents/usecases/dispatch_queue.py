@@ -0,0 +1,54 @@
+# documents/usecases/dispatch_queue.py
+import logging
+import random
+
+from .errors import NotFoundError, ValidationError
+from .send_to_zapsign import SendToZapSign
+from documents.logs import log_context
+from documents.models import DocumentStatus
+
+logger = logging.getLogger(__name__)
+
+class ProcessZapSignQueue:
+    """Drena a outbox de envios à ZapSign (ver ZapSignDispatchJob)."""
+
+    def __init__(self, repo, max_attempts: int = 5, backoff_base: float = 2.0,
+                 backoff_max: float = 300.0, lease_seconds: int = 120):
+        self.repo = repo
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+
+    def claim(self, limit: int):
+        return self.repo.claim_dispatch_jobs(limit, self.lease_seconds)
+
+    def backoff(self, attempts: int) -> float:
+        # exponencial com "equal jitter": metade fixa (nunca volta na hora) + metade aleatória
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def run_job(self, job) -> bool | None:
+        """True enviado, False falhou, None se outro worker assumiu o job (lease vencido)."""
+        with log_context(document_id=job.document_id, job_id=job.pk):
+            # o lease conta a partir daqui, não da reserva (o job pode ter esperado na fila do pool)
+            if not self.repo.start_dispatch_job(job, self.lease_seconds):
+                logger.warning("Job %s assumido por outro worker antes de começar; ignorado.", job.pk)
+                return None
+            try:
+                doc = self.repo.get_document_with_signers(job.document_id)
+                SendToZapSign(self.repo).dispatch(doc, expected_status=DocumentStatus.QUEUED)
+            except (ValidationError, NotFoundError) as e:
+                # erro de dados: não adianta tentar de novo
+                self.repo.fail_dispatch_job(job, str(e))
+                return False
+            except Exception as e:
+                logger.warning("Falha no envio à ZapSign (job=%s, tentativa %s): %s", job.pk, job.attempts, e)
+                if job.attempts >= self.max_attempts:
+                    self.repo.fail_dispatch_job(job, str(e))
+                else:
+                    self.repo.retry_dispatch_job(job, str(e), self.backoff(job.attempts))
+                return False
+            if not self.repo.finish_dispatch_job(job):
+                logger.warning("Job %s enviado, mas o lease venceu durante o envio (aumente --lease).", job.pk)
+            return True
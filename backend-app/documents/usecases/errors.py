@@ -3,3 +3,8 @@ class ValidationError(Exception):
 
 class NotFoundError(Exception):
     pass
+
+class BulkValidationError(ValidationError):
+    def __init__(self, errors: dict):
+        super().__init__("Itens inválidos no lote.")
+        self.errors = errors
@@ -1,6 +1,14 @@
 # documents/usecases/get_status.py
 import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.utils import timezone
+
 from .errors import ValidationError
+from documents.logs import log_context
 from documents.services.zapsign import get_status as zs_status
 from documents.models import DocumentStatus, SignerStatus  # aproveitando enums já existentes
 
@@ -15,6 +23,9 @@ STATUS_MAP = {
     "rejected": DocumentStatus.CANCELED,  # normalizamos como cancelado
 }
 
+# callbacks chegam fora de ordem: um "sent" atrasado não desfaz assinatura/cancelamento
+TERMINAL_STATUSES = {DocumentStatus.SIGNED, DocumentStatus.CANCELED}
+
 SIGNER_STATUS_MAP = {
     "pending": SignerStatus.PENDING,
     "signed": SignerStatus.SIGNED,
@@ -26,46 +37,141 @@ class GetZapSignStatus:
         self.repo = repo
 
     def execute(self, document_id: int):
-        doc = self.repo.get_document_with_signers(document_id)
-
-        if not doc.company.api_token:
-            raise ValidationError("Empresa sem api_token configurado.")
-        if not (doc.token or doc.open_id):
-            raise ValidationError("Documento não possui identificadores remotos (open_id/token).")
-
-        try:
-            remote_id = doc.token or str(doc.open_id)
-            data = zs_status(doc.company.api_token, remote_id)
-        except Exception as e:
-            logger.exception("Falha ao consultar status na ZapSign (doc_id=%s)", document_id)
-            raise ValidationError(f"Falha ao consultar status na ZapSign: {e}")
-
-        logger.info("Status retornado ZapSign (doc_id=%s): %s", document_id, data)
-
-        # Normaliza status
-        raw_status = (data or {}).get("status") or doc.status
-        new_status = STATUS_MAP.get(raw_status.lower(), raw_status)
-
-        # Atualiza documento se status mudou
-        if new_status and new_status != doc.status:
-            self.repo.save_document_fields(doc, status=new_status)
-
-        # Atualiza signatários
-        for s in (data or {}).get("signers", []):
-            email = (s.get("email") or "").strip()
-            if not email:
+        with log_context(document_id=document_id):
+            doc = self.repo.get_document_with_signers(document_id)
+
+            if not doc.company.api_token:
+                raise ValidationError("Empresa sem api_token configurado.")
+            if not (doc.token or doc.open_id):
+                raise ValidationError("Documento não possui identificadores remotos (open_id/token).")
+
+            try:
+                remote_id = doc.token or str(doc.open_id)
+                data = zs_status(doc.company.api_token, remote_id)
+            except Exception as e:
+                logger.exception("Falha ao consultar status na ZapSign (doc_id=%s)", document_id)
+                raise ValidationError(f"Falha ao consultar status na ZapSign: {e}")
+
+            # payload completo só em DEBUG; o INFO por consulta é amostrado (LOG_SAMPLE_RATES)
+            logger.debug("Status retornado ZapSign (doc_id=%s): %s", document_id, data)
+            logger.info("Status consultado na ZapSign (doc_id=%s): %s", document_id, (data or {}).get("status"))
+
+            # Normaliza status
+            raw_status = (data or {}).get("status") or doc.status
+            new_status = STATUS_MAP.get(raw_status.lower(), raw_status)
+
+            # Atualiza signatários (um bulk_update para todos)
+            signer_changes = self.repo.sync_signers(doc.id, _remote_signers(data), signers=doc.signers.all())
+
+            # Atualiza documento se status (ou algum signatário) mudou; senão só o carimbo da consulta
+            if new_status and new_status != doc.status:
+                self.repo.save_document_fields(doc, status=new_status, status_synced_at=timezone.now())
+            elif signer_changes:
+                self.repo.save_document_fields(doc, status_synced_at=timezone.now())
+            else:
+                self.repo.mark_status_synced([doc.id], timezone.now())
+
+            return {
+                "document_id": doc.id,
+                "status": new_status,
+                "raw": data,
+            }
+
+
+def _remote_id(doc) -> str:
+    return doc.token or str(doc.open_id)
+
+def _remote_signers(data: dict) -> list[dict]:
+    return [
+        {
+            "email": s.get("email"),
+            "status": SIGNER_STATUS_MAP.get((s.get("status") or "").lower()),
+            "token": s.get("token"),
+        }
+        for s in (data or {}).get("signers", [])
+    ]
+
+def _apply_remote(repo, doc, data: dict) -> tuple[bool, list]:
+    """Aplica o payload remoto em memória; retorna (status mudou, signers alterados)."""
+    raw_status = (data or {}).get("status") or doc.status
+    new_status = STATUS_MAP.get(raw_status.lower(), raw_status)
+    doc_changed = bool(new_status) and new_status != doc.status
+    if doc_changed and doc.status in TERMINAL_STATUSES:
+        logger.info("Status remoto %s ignorado: documento %s já está %s", new_status, doc.id, doc.status)
+        doc_changed = False
+    if doc_changed:
+        doc.status = new_status
+
+    # mesmo casamento por e-mail do GetZapSignStatus/SendToZapSign; a gravação fica para o lote
+    signers = list(doc.signers.all())
+    changed_ids = {c["id"] for c in repo.sync_signers(doc.id, _remote_signers(data), signers=signers, save=False)}
+    return doc_changed, [s for s in signers if s.id in changed_ids]
+
+class SyncZapSignStatus:
+    """Atualiza em lote o status de todos os documentos 'sent'.
+
+    Consulta a ZapSign em paralelo (pool limitado) e grava com bulk_update,
+    uma transação por empresa. Documentos consultados há menos de
+    `fresh_seconds` são ignorados.
+    """
+
+    def __init__(self, repo, workers: int = 8, fresh_seconds: int = 300, limit: int | None = None):
+        self.repo = repo
+        self.workers = workers
+        self.fresh_seconds = fresh_seconds
+        self.limit = limit
+
+    def execute(self) -> dict:
+        started = time.monotonic()
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=self.fresh_seconds)
+
+        docs = [
+            d for d in self.repo.list_documents_to_sync(cutoff, self.limit)
+            if d.company.api_token and (d.token or d.open_id)
+        ]
+        skipped_fresh = self.repo.count_fresh_documents(cutoff)
+
+        def fetch(doc):
+            try:
+                return doc, zs_status(doc.company.api_token, _remote_id(doc)), None
+            except Exception as e:
+                return doc, None, e
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            fetched = list(pool.map(fetch, docs))
+
+        by_company = defaultdict(list)
+        errors = 0
+        for doc, data, err in fetched:
+            if err is not None:
+                errors += 1
+                logger.warning("Falha ao consultar status na ZapSign (doc_id=%s): %s", doc.id, err)
                 continue
-            signer_status = SIGNER_STATUS_MAP.get((s.get("status") or "").lower())
-            signer_token = s.get("token")
-            self.repo.update_signer_status_token_by_email(
-                document_id=doc.id,
-                email=email,
-                status=signer_status,
-                token=signer_token
-            )
+            by_company[doc.company_id].append((doc, data))
+
+        docs_updated = signers_updated = 0
+        for items in by_company.values():
+            changed_docs, changed_signers, synced = [], [], []
+            for doc, data in items:
+                doc_changed, signers = _apply_remote(self.repo, doc, data)
+                doc.status_synced_at = now
+                synced.append(doc.id)
+                if doc_changed:
+                    changed_docs.append(doc)
+                changed_signers.extend(signers)
+            self.repo.save_sync_results(changed_docs, changed_signers, synced, now)
+            docs_updated += len(changed_docs)
+            signers_updated += len(changed_signers)
 
+        elapsed = time.monotonic() - started
         return {
-            "document_id": doc.id,
-            "status": new_status,
-            "raw": data,
+            "checked": len(docs),
+            "errors": errors,
+            "skipped_fresh": skipped_fresh,
+            "documents_updated": docs_updated,
+            "signers_updated": signers_updated,
+            "companies": len(by_company),
+            "elapsed_s": round(elapsed, 3),
+            "docs_per_s": round(len(docs) / elapsed, 1) if elapsed else 0.0,
         }
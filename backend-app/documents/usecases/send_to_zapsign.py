@@ -1,14 +1,124 @@
 # documents/usecases/send_to_zapsign.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
 from .errors import ValidationError
-from documents.services.zapsign import create_document as zs_create
+from documents.logs import log_context
+from documents.metrics import in_request_context
+from documents.models import DocumentStatus
+from documents.services.zapsign import acreate_document as zs_acreate, create_document as zs_create
+
+logger = logging.getLogger(__name__)
 
 class SendToZapSign:
     def __init__(self, repo): self.repo = repo
 
     def execute(self, document_id: int):
         doc = self.repo.get_document_with_signers(document_id)
-        if doc.status != "draft":
-            raise ValidationError("Apenas documentos em 'draft' podem ser enviados.")
+        return self.dispatch(doc)
+
+    def dispatch(self, doc, expected_status: str = DocumentStatus.DRAFT):
+        with log_context(document_id=doc.id):
+            payload = self.build_payload(doc, expected_status)
+            data = zs_create(doc.company.api_token, payload)
+            logger.debug("Resposta ZapSign (doc_id=%s): %s", doc.id, data)
+            return self.apply_result(doc, data)
+
+    async def adispatch(self, doc, expected_status: str = DocumentStatus.DRAFT):
+        # só o HTTP é async; a gravação do resultado reaproveita apply_result
+        with log_context(document_id=doc.id):
+            payload = self.build_payload(doc, expected_status)
+            data = await zs_acreate(doc.company.api_token, payload)
+            logger.debug("Resposta ZapSign (doc_id=%s): %s", doc.id, data)
+            return await sync_to_async(self.apply_result)(doc, data)
+
+    def enqueue(self, document_id: int):
+        # valida agora (erro volta na request) e deixa o HTTP para o worker
+        doc = self.repo.get_document_with_signers(document_id)
+        self.build_payload(doc)
+        self.repo.enqueue_dispatch([doc])
+        return doc
+
+    def enqueue_many(self, docs: list) -> list[tuple]:
+        results, ok = [], []
+        for doc in docs:
+            try:
+                self.build_payload(doc)
+            except ValidationError as e:
+                results.append((doc, str(e)))
+                continue
+            ok.append(doc)
+            results.append((doc, None))
+        self.repo.enqueue_dispatch(ok)
+        return results
+
+    def apply_result(self, doc, data: dict):
+        open_id = data.get("open_id") or data.get("id")
+        token   = data.get("token") or ""
+        status  = data.get("status") or "sent"
+
+        self.repo.save_document_fields(doc, open_id=open_id, token=token, status=status)
+
+        # tokens individuais dos signatários (quando a API retorna)
+        self.repo.sync_signers(doc.id, [
+            {"email": s.get("email"), "token": s.get("token")} for s in data.get("signers", [])
+        ], signers=doc.signers.all())
+
+        return doc
+
+    def execute_many(self, docs: list, max_workers: int | None = None) -> list[tuple]:
+        """Envia vários documentos já carregados (com company/signers/content).
+
+        Só as chamadas HTTP vão para o pool; leitura e escrita no banco ficam
+        no thread da request e são gravadas com bulk_update.
+        Retorna [(doc, erro | None), ...] na mesma ordem de `docs`.
+        """
+        results = [None] * len(docs)
+        pending = []
+        for i, doc in enumerate(docs):
+            try:
+                pending.append((i, doc, self.build_payload(doc)))
+            except ValidationError as e:
+                results[i] = (doc, str(e))
+
+        workers = max_workers or getattr(settings, "ZS_MAX_WORKERS", 8)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending) or 1))) as pool:
+            futures = [(i, doc, pool.submit(in_request_context(zs_create), doc.company.api_token, payload))
+                       for i, doc, payload in pending]
+
+        changed_docs, changed_signers = [], []
+        for i, doc, fut in futures:
+            try:
+                data = fut.result()
+            except Exception as e:
+                results[i] = (doc, f"Falha ao enviar para ZapSign: {e}")
+                continue
+            doc.open_id = data.get("open_id") or data.get("id")
+            doc.token = data.get("token") or ""
+            doc.status = data.get("status") or "sent"
+            changed_docs.append(doc)
+
+            tokens = {
+                (s.get("email") or "").strip().lower(): s.get("token")
+                for s in data.get("signers", []) if s.get("email") and s.get("token")
+            }
+            for signer in doc.signers.all():
+                tok = tokens.get(signer.email.lower())
+                if tok:
+                    signer.token = tok
+                    changed_signers.append(signer)
+            results[i] = (doc, None)
+
+        self.repo.bulk_save_documents(changed_docs, ["open_id", "token", "status"])
+        self.repo.bulk_save_signers(changed_signers, ["token"])
+        return results
+
+    def build_payload(self, doc, expected_status: str = DocumentStatus.DRAFT) -> dict:
+        if doc.status != expected_status:
+            raise ValidationError(f"Apenas documentos em '{expected_status}' podem ser enviados.")
         if not doc.company.api_token:
             raise ValidationError("Empresa sem api_token configurado.")
 
@@ -27,24 +137,4 @@ class SendToZapSign:
         chosen = ({"url_pdf": content.pdf_url} if content.content_type == "url_pdf"
                   else {"markdown_text": content.markdown_text})
 
-        payload = {"name": doc.name, "signers": signers, **chosen}
-        data = zs_create(doc.company.api_token, payload)
-        print('data return   ', data)
-        open_id = data.get("open_id") or data.get("id")
-        token   = data.get("token") or ""
-        status  = data.get("status") or "sent"
-
-        self.repo.save_document_fields(doc, open_id=open_id, token=token, status=status)
-
-        # Atualiza cada signer (caso a API tenha retornado tokens individuais)
-        signers_data = data.get("signers", [])
-        if signers_data:
-            for s_data in signers_data:
-                email = s_data.get("email")
-                signer_token = s_data.get("token")
-                if not (email and signer_token):
-                    continue
-                # Atualiza o signer com base no email
-                self.repo.update_signer_token_by_email(doc.id, email, signer_token)
-
-        return doc
\ No newline at end of file
+        return {"name": doc.name, "signers": signers, **chosen}
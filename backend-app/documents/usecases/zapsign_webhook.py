@@ -0,0 +1,53 @@
+# documents/usecases/zapsign_webhook.py
+import hashlib
+import json
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .get_status import _apply_remote
+
+logger = logging.getLogger(__name__)
+
+class ApplyZapSignWebhook:
+    """Aplica um callback da ZapSign em Document/Signer (idempotente por event_id)."""
+
+    def __init__(self, repo): self.repo = repo
+
+    def execute(self, payload: dict, event_id: str = "") -> dict:
+        event_id = event_id or self.event_id(payload)
+        event_type = str(payload.get("event_type") or "")[:60]
+
+        doc = self.repo.find_document_by_remote_id(
+            token=payload.get("token") or "", open_id=payload.get("open_id")
+        )
+        if not doc:
+            logger.info("Webhook ZapSign sem documento local (event_id=%s)", event_id)
+            return {"result": "ignored", "event_id": event_id}
+
+        with transaction.atomic():
+            # se a aplicação falhar, o registro do evento é desfeito e a reentrega funciona
+            if not self.repo.record_webhook_event(event_id, event_type, doc):
+                return {"result": "duplicate", "event_id": event_id, "document_id": doc.id}
+            now = timezone.now()
+            doc_changed, signers = _apply_remote(self.repo, doc, payload)
+            doc.status_synced_at = now
+            self.repo.save_sync_results([doc] if doc_changed else [], signers, [doc.id], now)
+
+        return {
+            "result": "applied",
+            "event_id": event_id,
+            "document_id": doc.id,
+            "status": doc.status,
+            "signers_updated": len(signers),
+        }
+
+    @staticmethod
+    def event_id(payload: dict) -> str:
+        explicit = payload.get("event_id") or payload.get("id")
+        if explicit:
+            return str(explicit)[:128]
+        # sem id no payload: o próprio conteúdo identifica a reentrega
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
@@ -1,17 +1,23 @@
+import functools
+
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import Company, Document, Signer, DocumentStatus, DocumentContent
 from .serializers import CompanySerializer, DocumentContentSerializer, DocumentSerializer, SignerSerializer
+from .rows import DOCUMENT_COLUMNS, document_rows
+from .conditional import conditional, content_validators, document_validators, validators_for
+from .idempotency import idempotent
 
 from documents.usecases.create_document import CreateDocument
 from documents.usecases.errors import ValidationError, NotFoundError
-from documents.repo.orm import DocumentRepoORM
+from documents.repo.orm import DocumentRepoORM, text_sha256
 
 from rest_framework.decorators import action
 from documents.usecases.send_to_zapsign import SendToZapSign
 from documents.usecases.get_status import GetZapSignStatus
 from documents.usecases.analyze_document import AnalyzeDocument
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
  
 class CompanyViewSet(viewsets.ModelViewSet):
@@ -22,6 +28,23 @@ class DocumentViewSet(viewsets.ModelViewSet):
     queryset = Document.objects.select_related("company").prefetch_related("signers").order_by("-created_at")
     serializer_class = DocumentSerializer
 
+    def list(self, request, *args, **kwargs):
+        # 304 pelo agregado (Max(last_updated_at) + count) antes de ler as linhas
+        return conditional(request, validators_for(Document.objects.all()), functools.partial(self._list, request))
+
+    def _list(self, request):
+        # leitura: só as colunas da resposta, sem Model/Serializer por linha (saída igual à do DocumentSerializer)
+        qs = Document.objects.order_by("-created_at", "-id").values(*DOCUMENT_COLUMNS)
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(document_rows(page, self.get_serializer_context()))
+        return Response(document_rows(list(qs), self.get_serializer_context()))
+
+    def retrieve(self, request, *args, **kwargs):
+        build = functools.partial(super().retrieve, request, *args, **kwargs)
+        return conditional(request, document_validators(kwargs["pk"]), build)
+
+    @idempotent("document_create")
     def create(self, request, *args, **kwargs):
         uc = CreateDocument(repo=DocumentRepoORM())
         try:
@@ -36,7 +59,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         # guard-rail de negócio (rápido): não permitir excluir assinado
         if instance.status == DocumentStatus.SIGNED:
             raise ValidationError("Documento assinado não pode ser excluído.")
-        instance.delete()
+        DocumentRepoORM().delete_document(instance)
     
     @action(detail=True, methods=["get"])
     def status(self, request, pk=None):
@@ -58,18 +81,16 @@ class DocumentViewSet(viewsets.ModelViewSet):
             out = uc.execute(int(pk), text=txt)
         except NotFoundError as e:
             return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(out, status=status.HTTP_200_OK)  
 
     @action(detail=True, methods=["get", "put", "patch"])
     def content(self, request, pk=None):
-        doc = self.get_object()
-
-        # GET → retorna conteúdo atual
         if request.method == "GET":
-            body = getattr(doc, "content", None)
-            if not body:
-                return Response({"detail": "Sem conteúdo definido."}, status=status.HTTP_404_NOT_FOUND)
-            return Response(DocumentContentSerializer(body).data, status=status.HTTP_200_OK)
+            # GET → retorna conteúdo atual (304 se o cliente já tem esta versão)
+            return conditional(request, content_validators(pk), self._content)
+        doc = self.get_object()
 
         # PUT/PATCH → salva conteúdo
         ctype = request.data.get("content_type", "markdown")
@@ -86,30 +107,55 @@ class DocumentViewSet(viewsets.ModelViewSet):
         body, created = DocumentContent.objects.get_or_create(document=doc)
         if ctype == "markdown":
             body.content_type, body.markdown_text, body.pdf_url = "markdown", md, ""
+            body.sha256 = text_sha256(md)
         else:
+            # texto do PDF (e seu sha256) é extraído/cacheado na análise
+            if body.pdf_url != url:
+                body.clear_pdf_cache()
             body.content_type, body.markdown_text, body.pdf_url = "url_pdf", "", url
+            body.sha256 = text_sha256(body.extracted_text) if body.extracted_text else ""
 
-        body.save(update_fields=["content_type", "markdown_text", "pdf_url"])
+        body.save(update_fields=["content_type", "markdown_text", "pdf_url", "sha256", *DocumentContent.PDF_CACHE_FIELDS])
         return Response(
             DocumentContentSerializer(body).data,
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
 
+    def _content(self):
+        body = getattr(self.get_object(), "content", None)
+        if not body:
+            return Response({"detail": "Sem conteúdo definido."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(DocumentContentSerializer(body).data, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["post"])
+    @idempotent("send_to_zapsign")
     def send_to_zapsign(self, request, pk=None):
         #pdf_url = request.data.get("pdf_url")
         #markdown = request.data.get("markdown_text")
         uc = SendToZapSign(repo=DocumentRepoORM()) 
+        queued = settings.ZS_DISPATCH == "queue"
         try:
             #doc = uc.execute(int(pk), pdf_url=pdf_url, markdown_text=markdown)
-            doc = uc.execute(int(pk))
+            doc = uc.enqueue(int(pk)) if queued else uc.execute(int(pk))
         except NotFoundError as e:
             return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except ValidationError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(self.get_serializer(doc).data, status=status.HTTP_200_OK)
+        return Response(
+            self.get_serializer(doc).data,
+            status=status.HTTP_202_ACCEPTED if queued else status.HTTP_200_OK,
+        )
 
 
 class SignerViewSet(viewsets.ModelViewSet):
     queryset = Signer.objects.select_related("document").order_by("-id")
     serializer_class = SignerSerializer
+
+    # signatários aparecem dentro do documento: alterar um muda o ETag dele
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        DocumentRepoORM().touch_documents([serializer.instance.document_id])
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        DocumentRepoORM().touch_documents([instance.document_id])
@@ -0,0 +1,95 @@
+# documents/views_async.py
+# Versões async (ASGI) das automações mais chamadas: create_send e analysis.
+# Rodando em uvicorn/daphne, as chamadas à ZapSign/OpenAI não prendem threads.
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+
+from .auth import APIKEY_HEADER, acompany_for_api_key
+from .logs import bind_context
+from .serializers import AutomationAnalysisInputSerializer, AutomationCreateSendSerializer
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.analyze_document import AnalyzeDocument
+from documents.usecases.create_document import CreateDocument
+from documents.usecases.errors import NotFoundError, ValidationError
+from documents.usecases.send_to_zapsign import SendToZapSign
+
+class AsyncApiKeyView(View):
+    """Autenticação por X-API-Key (mesmas regras do ApiKeyAuthentication) + corpo JSON."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True  # sem sessão: igual às APIViews do DRF
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        api_key = request.META.get(APIKEY_HEADER)
+        if not api_key:
+            return JsonResponse({"detail": "As credenciais de autenticação não foram fornecidas."}, status=403)
+        company = await acompany_for_api_key(api_key)
+        if company is None:
+            return JsonResponse({"detail": "API key inválida."}, status=403)
+        request.company = company
+        bind_context(company_id=company.id)
+        try:
+            request.json = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"detail": "JSON inválido."}, status=400)
+        return await super().dispatch(request, *args, **kwargs)
+
+class AsyncAutomationCreateSendView(AsyncApiKeyView):
+    async def post(self, request):
+        ser = AutomationCreateSendSerializer(data=request.json)
+        if not ser.is_valid():
+            return JsonResponse(ser.errors, status=400)
+        payload = ser.validated_data
+
+        repo = DocumentRepoORM()
+        uc = SendToZapSign(repo)
+        queued = settings.ZS_DISPATCH == "queue"
+        try:
+            data = CreateDocument(repo).normalize({
+                "company": request.company.id,
+                "name": payload["name"],
+                "created_by": payload.get("created_by") or "automation",
+                "signers": payload["signers"],
+            })
+            data["content"] = {
+                "content_type": payload["content_type"],
+                "markdown_text": payload.get("markdown_text", ""),
+                "pdf_url": payload.get("pdf_url", ""),
+            }
+            doc = await repo.acreate_document_with_content(data)
+            if queued:
+                doc = await sync_to_async(uc.enqueue)(doc.id)
+            else:
+                doc = await uc.adispatch(await repo.aget_document_with_signers(doc.id))
+        except ValidationError as e:
+            return JsonResponse({"detail": str(e)}, status=400)
+
+        return JsonResponse({
+            "document_id": doc.id,
+            "status": doc.status,
+            "open_id": doc.open_id,
+            "token": doc.token,
+        }, status=202 if queued else 201)
+
+class AsyncAutomationAnalysisView(AsyncApiKeyView):
+    async def get(self, request, pk: int):
+        ser = AutomationAnalysisInputSerializer(data=request.json)
+        if not ser.is_valid():
+            return JsonResponse(ser.errors, status=400)
+        uc = AnalyzeDocument(repo=DocumentRepoORM())
+        try:
+            result = await uc.aexecute(int(pk), text=ser.validated_data.get("text"))
+        except NotFoundError as e:
+            return JsonResponse({"detail": str(e)}, status=404)
+        except ValidationError as e:
+            return JsonResponse({"detail": str(e)}, status=400)
+        return JsonResponse(result, status=200)
+
+    post = get
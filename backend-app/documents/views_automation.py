@@ -2,31 +2,43 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from django.db.models import Count
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+import functools
 
 from .auth import ApiKeyAuthentication
+from .idempotency import idempotent
 from .serializers import (
     AutomationCreateSendSerializer,
     AutomationAnalysisInputSerializer,
     AutomationReportFilterSerializer,
+    AutomationStaleFilterSerializer,
     ReportDocumentSerializer,
+    StaleDocumentSerializer,
 )
 from documents.repo.orm import DocumentRepoORM
-from documents.models import Document
+from documents.models import Document, DocumentStatus
+from documents.conditional import conditional, validators_for
+from documents.pagination import keyset_page
+from documents.renderers import dumps
+from documents.rows import REPORT_COLUMNS, report_rows
 from documents.usecases.analyze_document import AnalyzeDocument
+from documents.usecases.create_document import CreateDocument
+from documents.usecases.errors import BulkValidationError, NotFoundError, ValidationError
+from documents.usecases.send_to_zapsign import SendToZapSign
  
 class AutomationCreateSendView(APIView):
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    @idempotent("create_send")
     def post(self, request):
         ser = AutomationCreateSendSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         payload = ser.validated_data
 
-        from documents.usecases.create_document import CreateDocument
-        from documents.usecases.send_to_zapsign import SendToZapSign
-
         repo = DocumentRepoORM()
         doc = CreateDocument(repo).execute({
             "company": request.company.id,
@@ -39,14 +51,69 @@ class AutomationCreateSendView(APIView):
         else:
             repo.upsert_document_content(doc.id, "url_pdf", pdf_url=payload["pdf_url"])
 
-        doc = SendToZapSign(repo).execute(doc.id)
+        queued = settings.ZS_DISPATCH == "queue"
+        uc = SendToZapSign(repo)
+        doc = uc.enqueue(doc.id) if queued else uc.execute(doc.id)
 
         return Response({
             "document_id": doc.id,
             "status": doc.status,
             "open_id": getattr(doc, "open_id", None),
             "token": getattr(doc, "token", None),
-        }, status=status.HTTP_201_CREATED)
+        }, status=status.HTTP_202_ACCEPTED if queued else status.HTTP_201_CREATED)
+
+class AutomationCreateSendBulkView(APIView):
+    authentication_classes = [ApiKeyAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        ser = AutomationCreateSendSerializer(
+            data=request.data, many=True, allow_empty=False, max_length=settings.AUTOMATION_BULK_MAX
+        )
+        ser.is_valid(raise_exception=True)
+
+        items = []
+        for payload in ser.validated_data:
+            items.append({
+                "company": request.company.id,
+                "name": payload["name"],
+                "created_by": payload.get("created_by") or "automation",
+                "signers": payload["signers"],
+                "content": {
+                    "content_type": payload["content_type"],
+                    "markdown_text": payload.get("markdown_text", ""),
+                    "pdf_url": payload.get("pdf_url", ""),
+                },
+            })
+
+        repo = DocumentRepoORM()
+        try:
+            docs = CreateDocument(repo).execute_many(items)
+        except BulkValidationError as e:
+            return Response({"detail": str(e), "errors": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except NotFoundError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        docs = repo.get_documents_with_signers([d.id for d in docs])
+        queued = settings.ZS_DISPATCH == "queue"
+        uc = SendToZapSign(repo)
+        results = []
+        for doc, error in (uc.enqueue_many(docs) if queued else uc.execute_many(docs)):
+            item = {
+                "document_id": doc.id,
+                "status": doc.status,
+                "open_id": doc.open_id,
+                "token": doc.token,
+            }
+            if error:
+                item["error"] = error
+            results.append(item)
+
+        if any("error" in r for r in results):
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_202_ACCEPTED if queued else status.HTTP_201_CREATED
+        return Response({"results": results}, status=code)
 
 class AutomationAnalysisView(APIView):
     authentication_classes = [ApiKeyAuthentication]
@@ -57,7 +124,12 @@ class AutomationAnalysisView(APIView):
         ser.is_valid(raise_exception=True)
         text_override = ser.validated_data.get("text") 
         uc = AnalyzeDocument(repo=DocumentRepoORM())
-        result = uc.execute(int(pk), text=text_override)
+        try:
+            result = uc.execute(int(pk), text=text_override)
+        except NotFoundError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(result, status=status.HTTP_200_OK)
 
 class AutomationReportView(APIView):
@@ -69,20 +141,62 @@ class AutomationReportView(APIView):
         s.is_valid(raise_exception=True)
         q = s.validated_data
 
-        qs = (
-            Document.objects.filter(company=request.company)
-            .annotate(signer_count=Count("signers"))
-            .order_by("-created_at")
-        )
+        qs = Document.objects.filter(company=request.company)
         if q.get("status"):
             qs = qs.filter(status=q["status"])
+        # faixa de created_at (não created_at__date, que impede o uso do índice)
         if q.get("date_from"):
-            qs = qs.filter(created_at__date__gte=q["date_from"])
+            qs = qs.filter(created_at__gte=_day_start(q["date_from"]))
         if q.get("date_to"):
-            qs = qs.filter(created_at__date__lte=q["date_to"])
+            qs = qs.filter(created_at__lt=_day_start(q["date_to"] + timedelta(days=1)))
 
-        summary = dict(
-            qs.values_list("status").annotate(total=Count("id"))
+        # 304 pelo agregado dos documentos filtrados, antes do resumo e da página
+        return conditional(request, validators_for(qs, scope=request.company.id), functools.partial(self._report, request, qs, q))
+
+    def _report(self, request, qs, q):
+        items = qs.prefetch_related("signers")
+        if q["output"] == "ndjson":
+            # relatório inteiro, um documento por linha, sem montar a lista em memória
+            items = items.order_by("-created_at", "-id").iterator(chunk_size=settings.REPORT_STREAM_CHUNK)
+            return StreamingHttpResponse(_ndjson(items), content_type="application/x-ndjson")
+
+        # filtros são por dia: o resumo materializado responde sem varrer os documentos
+        summary = DocumentRepoORM().status_summary(
+            request.company.id, q.get("status"), q.get("date_from"), q.get("date_to")
         )
-        data = ReportDocumentSerializer(qs, many=True).data
-        return Response({"summary": summary, "items": data}, status=200)
\ No newline at end of file
+        page, next_cursor = keyset_page(qs.values(*REPORT_COLUMNS), q.get("cursor"),
+                                        q.get("limit") or settings.REPORT_PAGE_SIZE)
+        data = report_rows(page)
+        return Response({"summary": summary, "items": data, "next_cursor": next_cursor}, status=200)
+
+class AutomationStaleDocumentsView(APIView):
+    """Documentos parados: sem atualização há pelo menos `hours` horas."""
+    authentication_classes = [ApiKeyAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    OPEN_STATUSES = [DocumentStatus.DRAFT, DocumentStatus.QUEUED, DocumentStatus.SENT]
+
+    def get(self, request):
+        s = AutomationStaleFilterSerializer(data=request.query_params)
+        s.is_valid(raise_exception=True)
+        q = s.validated_data
+
+        now = timezone.now()
+        statuses = self.OPEN_STATUSES if q["status"] == "pending" else [q["status"]]
+        # coberto pelo índice (company, status, last_updated_at)
+        qs = (
+            Document.objects.filter(company=request.company, status__in=statuses,
+                                    last_updated_at__lte=now - timedelta(hours=q["hours"]))
+            .prefetch_related("signers")
+        )
+        page, next_cursor = keyset_page(qs, q.get("cursor"), q.get("limit") or settings.REPORT_PAGE_SIZE,
+                                        field="last_updated_at")
+        data = StaleDocumentSerializer(page, many=True, context={"now": now}).data
+        return Response({"threshold_hours": q["hours"], "items": data, "next_cursor": next_cursor}, status=200)
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def _ndjson(docs):
+    for doc in docs:
+        yield dumps(ReportDocumentSerializer(doc).data) + b"\n"
\ No newline at end of file
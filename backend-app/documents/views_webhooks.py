@@ -0,0 +1,25 @@
+# documents/views_webhooks.py
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+
+from .auth import ZapSignWebhookAuthentication
+from .serializers import ZapSignWebhookSerializer
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.zapsign_webhook import ApplyZapSignWebhook
+
+class ZapSignWebhookView(APIView):
+    authentication_classes = [ZapSignWebhookAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({"detail": "Payload inválido."}, status=status.HTTP_400_BAD_REQUEST)
+        # 400 (e não 500) para formato errado: a ZapSign não reentrega o mesmo evento para sempre
+        ser = ZapSignWebhookSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        out = ApplyZapSignWebhook(DocumentRepoORM()).execute(
+            {**request.data, **ser.validated_data},
+            event_id=ApplyZapSignWebhook.event_id(request.data),
+        )
+        return Response(out, status=status.HTTP_200_OK)
@@ -7,6 +7,14 @@ from documents.models import Company
 def api():
     return APIClient()
 
+@pytest.fixture(autouse=True)
+def clear_api_key_cache():
+    # o rollback entre testes não passa por Company.save/delete
+    from documents.apikeys import get_cache
+    get_cache().clear()
+    yield
+    get_cache().clear()
+
 @pytest.fixture
 def company(db):
     return Company.objects.create(name="Acme", api_token="secret-token-123")
@@ -40,6 +48,12 @@ def mock_zapsign(monkeypatch):
         fake_create_document
     ) 
 
+    async def fake_acreate_document(api_token, payload):
+        return fake_create_document(api_token, payload)
+
+    # variante usada pelas views async
+    monkeypatch.setattr("documents.usecases.send_to_zapsign.zs_acreate", fake_acreate_document)
+
 from documents.models import Company, Document   
 
 @pytest.fixture
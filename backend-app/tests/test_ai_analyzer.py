@@ -0,0 +1,63 @@
+import random
+import re
+
+from documents.services.ai import TextAnalyzer, _mock_analyze
+
+# padrões originais de _mock_analyze, usados como referência
+LEGACY = {
+    "emails": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "money": r"(?:R\$\s?\d[\d\.\,]*)",
+    "cpf": r"\b\d{3}\.\d{3}\.\d{3}-\d{2}\b",
+    "cnpj": r"\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b",
+}
+LEGACY_WORDS = re.compile(r"\b[\w-]{4,}\b")
+
+TEXT = (
+    "Contrato entre ACME LTDA (CNPJ 12.345.678/0001-99) e João, CPF 123.456.789-00, "
+    "contato joao@ex.com. Valor de R$ 1.500,00 com multa de 10% e renovação automática. "
+    "Foro da comarca de São Paulo. Contrato contrato serviço-serviço."
+)
+
+
+def test_mock_analyze_output():
+    out = _mock_analyze(TEXT)
+    assert out["risk_score"] == 10 + 15 + 10 - 5
+    assert out["topics"][0] == "contrato"
+    assert out["extracted"] == {
+        "emails": ["joao@ex.com"],
+        "money": ["R$ 1.500,00"],
+        "cpf": ["123.456.789-00"],
+        "cnpj": ["12.345.678/0001-99"],
+    }
+    assert out["flags"] == [
+        "Possível falta de cláusula de rescisão",
+        "Possível falta de cláusula de confidencialidade",
+    ]
+
+
+def test_custom_keyword_table():
+    analyzer = TextAnalyzer(risk_weights={"multa": 50}, required_clauses={"garantia": "Sem garantia"}, top_k=2)
+    out = analyzer.analyze(TEXT)
+    assert out["risk_score"] == 60
+    assert out["flags"] == ["Sem garantia"]
+    assert len(out["topics"]) == 2
+
+
+def test_matches_legacy_regexes_on_random_text():
+    rnd = random.Random(42)
+    pieces = ["a@b.com", "x.y@z.co", "@", "R$", " ", "\n", "-", "/", ".", "123", "45", "0001",
+              "12.345.678/0001-99", "123.456.789-00", "_", "ção", "abcd", "multa", "foro", "é"]
+    analyzer = TextAnalyzer()
+    for _ in range(3000):
+        txt = "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 25))).strip()
+        got = analyzer.extract(txt)
+        for key, pattern in LEGACY.items():
+            assert got[key] == re.findall(pattern, txt), (key, txt)
+
+        lower = txt.lower()
+        freq = {}
+        for w in LEGACY_WORDS.findall(lower):
+            if w not in analyzer.stopwords:
+                freq[w] = freq.get(w, 0) + 1
+        expected = [w for w, _ in sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:5]]
+        assert analyzer.topics(lower) == expected, txt
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from stubs import StubServer
+
+from documents.services import ai
+
+DELAY = 0.15
+
+
+@pytest.fixture
+def llm(settings):
+    state = {"in_flight": 0, "peak": 0, "prompts": []}
+    lock = threading.Lock()
+
+    def handler(method, path, body):
+        prompt = body["messages"][0]["content"]
+        with lock:
+            state["prompts"].append(prompt)
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(DELAY)
+        with lock:
+            state["in_flight"] -= 1
+        kind = "final" if prompt.startswith((ai.SUMMARY_PROMPT, ai.MERGE_PROMPT)) else "parcial"
+        return 200, {}, {"choices": [{"message": {"content": f"resumo {kind}"}}]}
+
+    srv = StubServer(handler)
+    srv.state = state
+    settings.AI_MODE = "openai"
+    settings.OPENAI_API_KEY = "sk-test"
+    settings.OPENAI_BASE = srv.url
+    settings.AI_CHUNK_TOKENS = 50
+    settings.AI_MAX_CONCURRENCY = 8
+    ai._session = None
+    yield srv
+    srv.close()
+    ai._session = None
+
+
+def contract(lines: int) -> str:
+    return "\n".join(f"Cláusula {i}: o contratante pagará multa de R$ {i},00 em caso de atraso." for i in range(lines))
+
+
+def test_chunk_text_respects_budget():
+    text = contract(40)
+    chunks = ai.chunk_text(text, 50)
+    assert len(chunks) > 1
+    assert all(ai.estimate_tokens(c) <= 50 for c in chunks)
+    assert "\n".join(chunks) == text
+    assert ai.chunk_text("x" * 450, 50) == ["x" * 200, "x" * 200, "x" * 50]
+
+
+def test_short_document_is_one_call(llm):
+    [out] = ai.analyze_many(["Contrato curto com multa de 10%."])
+    assert out["summary"] == "resumo final"
+    assert len(llm.state["prompts"]) == 1
+
+
+def test_long_document_is_map_reduced(llm):
+    [out] = ai.analyze_many([contract(20)])
+    prompts = llm.state["prompts"]
+    assert out["summary"] == "resumo final"
+    assert sum(p.startswith(ai.CHUNK_PROMPT) for p in prompts) == len(ai.chunk_text(contract(20), 50))
+    assert prompts[-1].startswith(ai.MERGE_PROMPT)
+    assert out["risk_score"] >= 20 and "extracted" in out
+
+
+def test_concurrency_scales_until_limit(llm):
+    texts = [f"Contrato {i} com multa rescisória." for i in range(8)]
+
+    t = time.perf_counter()
+    ai.analyze_many(texts, max_workers=1)
+    serial = time.perf_counter() - t
+
+    t = time.perf_counter()
+    ai.analyze_many(texts, max_workers=4)
+    four = time.perf_counter() - t
+
+    llm.state["peak"] = 0
+    t = time.perf_counter()
+    ai.analyze_many(texts, max_workers=8)
+    eight = time.perf_counter() - t
+
+    assert serial >= 8 * DELAY
+    assert four < serial / 2.5      # ~4x
+    assert eight < four * 0.8       # ~2x sobre 4
+    assert llm.state["peak"] == 8
+
+
+def test_failed_item_falls_back_to_local_heuristics(llm):
+    def handler(method, path, body):
+        if "quebra" in body["messages"][0]["content"]:
+            return 500, {}, {"error": "boom"}
+        return 200, {}, {"choices": [{"message": {"content": "ok"}}]}
+
+    llm.handler = handler
+    good, bad = ai.analyze_many(["Contrato bom", "Contrato quebra"])
+    assert good["summary"] == "ok" and "fallback" not in good
+    assert bad["fallback"] is True and bad["summary"] == "Contrato quebra"
+
+
+def test_async_map_reduce_overlaps_all_calls(llm, settings):
+    settings.AI_ASYNC_MAX_CONCURRENCY = 64
+    texts = [contract(40), "Contrato curto com multa de 10%.", contract(40)]
+    out = asyncio.run(ai.aanalyze_many(texts))
+
+    assert [o["summary"] for o in out] == ["resumo final"] * 3
+    assert not any(o.get("fallback") for o in out)
+    # todos os trechos da rodada em voo juntos, acima do pool de threads do caminho síncrono
+    assert llm.state["peak"] > settings.AI_MAX_CONCURRENCY
@@ -0,0 +1,68 @@
+import pytest
+from documents.models import AnalysisCacheEntry, DocumentContent
+from documents.usecases import analyze_document
+
+pytestmark = pytest.mark.django_db
+
+TEXT = "Contrato de prestação de serviços com multa rescisória e foro em São Paulo."
+
+
+@pytest.fixture
+def analyzer_calls(monkeypatch):
+    calls = []
+    real = analyze_document.analyze_text
+
+    def spy(text):
+        calls.append(text)
+        return real(text)
+
+    monkeypatch.setattr(analyze_document, "analyze_text", spy)
+    return calls
+
+
+@pytest.fixture
+def doc_with_content(company, make_document):
+    doc = make_document(company)
+    DocumentContent.objects.create(document=doc, content_type="markdown", markdown_text=TEXT)
+    return doc
+
+
+def test_repeated_analysis_is_served_from_cache(api, doc_with_content, analyzer_calls):
+    url = f"/api/documents/{doc_with_content.id}/analysis/"
+    before = analyze_document.cache_stats()
+    first = api.post(url, {}, format="json").json()
+    second = api.post(url, {}, format="json").json()
+
+    assert first == second
+    assert len(analyzer_calls) == 1
+    after = analyze_document.cache_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+    assert AnalysisCacheEntry.objects.get().hits == 1
+    assert DocumentContent.objects.get(document=doc_with_content).sha256 == AnalysisCacheEntry.objects.get().sha256
+
+
+def test_cache_key_includes_mode_and_prompt_version(api, doc_with_content, analyzer_calls, monkeypatch):
+    url = f"/api/documents/{doc_with_content.id}/analysis/"
+    api.post(url, {}, format="json")
+    monkeypatch.setattr(analyze_document, "PROMPT_VERSION", "2")
+    api.post(url, {}, format="json")
+    assert len(analyzer_calls) == 2
+
+
+def test_lru_eviction(api, company, make_document, analyzer_calls, settings):
+    settings.AI_CACHE_MAX_ENTRIES = 2
+    doc = make_document(company)
+    for i in range(3):
+        api.post(f"/api/documents/{doc.id}/analysis/", {"text": f"{TEXT} versão {i}"}, format="json")
+    assert AnalysisCacheEntry.objects.count() == 2
+
+
+def test_cache_stats_are_only_in_metrics(api, auth_headers, doc_with_content, analyzer_calls, settings):
+    assert api.get("/api/automations/analysis/cache/", **auth_headers).status_code == 404  # API key de empresa não vê
+
+    api.post(f"/api/documents/{doc_with_content.id}/analysis/", {"text": TEXT}, format="json")
+    settings.METRICS_TOKEN = "scrape-me"
+    text = api.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-me").content.decode()
+    assert "# TYPE zapflow_analysis_cache_hits_total counter" in text
+    assert "zapflow_analysis_cache_entries 1" in text
@@ -0,0 +1,80 @@
+import pytest
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+
+from documents.apikeys import CompanyKeyCache, hash_api_key
+from documents.auth import ApiKeyAuthentication
+from documents.models import Company
+
+
+def authenticate(key):
+    request = APIRequestFactory().get("/", HTTP_X_API_KEY=key)
+    return ApiKeyAuthentication().authenticate(request)
+
+
+def test_token_is_stored_hashed(company):
+    assert company.api_token_hash == hash_api_key("secret-token-123")
+
+
+def test_warm_path_does_no_queries(company, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        authenticate("secret-token-123")
+    with django_assert_num_queries(0):
+        user, _ = authenticate("secret-token-123")
+    assert user.company.id == company.id
+
+
+def test_rotated_token_is_invalidated(company):
+    authenticate("secret-token-123")
+    company.api_token = "rotated-token"
+    company.save(update_fields=["api_token"])
+
+    with pytest.raises(exceptions.AuthenticationFailed):
+        authenticate("secret-token-123")
+    assert authenticate("rotated-token")[0].company.id == company.id
+
+
+def test_deleted_company_is_invalidated(company):
+    authenticate("secret-token-123")
+    Company.objects.get(id=company.id).delete()
+    with pytest.raises(exceptions.AuthenticationFailed):
+        authenticate("secret-token-123")
+
+
+def test_lru_and_ttl(monkeypatch):
+    cache = CompanyKeyCache(ttl=10, max_entries=2)
+    clock = [0.0]
+    monkeypatch.setattr("documents.apikeys.time.monotonic", lambda: clock[0])
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+    cache.set("c", "C")  # "b" é o menos usado
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+    clock[0] = 11
+    assert cache.get("a") is None
+
+
+def test_shared_django_cache_backs_local_layer(company, settings, django_assert_num_queries):
+    settings.CACHES = {"apikeys": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    shared = CompanyKeyCache(ttl=60, max_entries=10, alias="apikeys")
+    shared.set(company.api_token_hash, (company.id, company.name))
+
+    other_process = CompanyKeyCache(ttl=60, max_entries=10, alias="apikeys")
+    with django_assert_num_queries(0):
+        assert other_process.get(company.api_token_hash) == (company.id, company.name)
+
+    shared.invalidate(company.api_token_hash)
+    assert caches["apikeys"].get("apikey:" + company.api_token_hash) is None
+
+
+def test_cache_holds_no_secret_and_requests_get_their_own_company(company, settings, monkeypatch):
+    settings.API_KEY_CACHE_ALIAS = "apikeys"
+    settings.CACHES = {**settings.CACHES, "apikeys": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    monkeypatch.setattr("documents.apikeys._cache", None)  # recria com o alias
+
+    first, _ = authenticate("secret-token-123")
+    second, _ = authenticate("secret-token-123")
+    assert caches["apikeys"].get("apikey:" + company.api_token_hash) == (company.id, "Acme")
+    assert first.company is not second.company
+    assert first.company.api_token == "secret-token-123"  # adiado: lido do banco sob demanda
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from documents.models import Document, DocumentContent, Signer
+from documents.services.pdf_text import afetch_pdf_text
+from documents.services import ai, zapsign
+from documents.services.zapsign import AsyncZapSignClient
+from stubs import StubServer, make_pdf
+
+PAYLOAD = {
+    "name": "Contrato",
+    "signers": [{"name": "João", "email": "Joao@ex.com"}],
+    "content_type": "markdown",
+    "markdown_text": "# Contrato",
+}
+
+
+def call(method, url, key="secret-token-123", **kw):
+    async def go():
+        client = AsyncClient()
+        return await getattr(client, method)(url, content_type="application/json", headers={"X-API-Key": key}, **kw)
+    return async_to_sync(go)()
+
+
+def test_async_create_send(company):
+    r = call("post", "/api/automations/async/create_send/", data=PAYLOAD)
+    assert r.status_code == 201
+    body = r.json()
+    assert body["status"] == "sent" and body["open_id"] == 999
+
+    doc = Document.objects.get(id=body["document_id"])
+    assert doc.content.markdown_text == "# Contrato"
+    assert doc.signers.get().token == "sign-token"
+
+
+def test_async_create_send_queue_mode(company, settings):
+    settings.ZS_DISPATCH = "queue"
+    r = call("post", "/api/automations/async/create_send/", data=PAYLOAD)
+    assert r.status_code == 202
+    assert r.json()["status"] == "queued"
+
+
+def test_async_create_send_validates_and_authenticates(company):
+    assert call("post", "/api/automations/async/create_send/", data={"name": "x"}).status_code == 400
+    assert call("post", "/api/automations/async/create_send/", key="nope", data=PAYLOAD).status_code == 403
+
+
+def test_async_analysis(company, make_document):
+    doc = make_document(company)
+    Signer.objects.create(document=doc, name="A", email="a@ex.com")
+    DocumentContent.objects.create(document=doc, content_type="markdown",
+                                   markdown_text="Contrato com multa de R$ 1.000,00 e foro em São Paulo.")
+    r = call("post", f"/api/automations/async/analysis/{doc.id}/", data={})
+    assert r.status_code == 200
+    assert r.json()["extracted"]["money"] == ["R$ 1.000,00"]
+
+    assert call("get", "/api/automations/async/analysis/999999/").status_code == 404
+
+
+def test_async_client_overlaps_calls_and_retries():
+    lock, calls = threading.Lock(), {"n": 0}
+
+    def handler(method, path, body):
+        with lock:
+            calls["n"] += 1
+            first = calls["n"] == 1
+        if first:
+            return 503, {"Retry-After": "0"}, {"detail": "busy"}
+        time.sleep(0.2)
+        return 200, {}, {"status": "sent"}
+
+    srv = StubServer(handler)
+
+    async def run():
+        client = AsyncZapSignClient(srv.url, pool_size=50, backoff_base=0)
+        try:
+            started = time.monotonic()
+            out = await asyncio.gather(*(client.get_status("tok", f"d{i}") for i in range(20)))
+            return out, time.monotonic() - started, client.metrics()
+        finally:
+            await client.aclose()
+
+    try:
+        out, elapsed, metrics = asyncio.run(run())
+    finally:
+        srv.close()
+    assert all(o["status"] == "sent" for o in out)
+    assert elapsed < 2.0  # 20 x 0.2s em sequência seriam 4s
+    assert metrics["retries"] == 1
+
+
+def test_async_client_retries_get_read_timeout_but_not_post():
+    calls = {"n": 0}
+
+    def handler(method, path, body):
+        calls["n"] += 1
+        if calls["n"] in (1, 3):
+            time.sleep(0.3)  # estoura o read timeout
+        return 200, {}, {"status": "sent"}
+
+    srv = StubServer(handler)
+
+    async def run():
+        client = AsyncZapSignClient(srv.url, backoff_base=0, timeouts={"status": (1, 0.1), "create": (1, 0.1)})
+        try:
+            status = await client.get_status("tok", "abc")
+            with pytest.raises(httpx.ReadTimeout):
+                await client.create_document("tok", {})  # pode ter sido criado: não repete
+            return status, client.metrics()
+        finally:
+            await client.aclose()
+
+    try:
+        status, metrics = asyncio.run(run())
+    finally:
+        srv.close()
+    assert status == {"status": "sent"}
+    assert metrics == {"requests": 3, "retries": 1, "errors": 1}
+
+
+def test_per_loop_clients_are_closed_with_their_loop():
+    async def grab():
+        return await zapsign.get_async_client(), (await ai._openai_async_client())[0]
+
+    first = async_to_sync(grab)()  # sob WSGI: cada chamada é um asyncio.run novo
+    second = async_to_sync(grab)()
+    assert first[0] is not second[0]
+    assert all(c.client.is_closed if isinstance(c, AsyncZapSignClient) else c.is_closed for c in first + second)
+
+    async def same_loop():
+        return await zapsign.get_async_client() is await zapsign.get_async_client()
+
+    assert asyncio.run(same_loop())
+
+
+def test_afetch_pdf_text():
+    pdf = make_pdf(["Primeira pagina", "Segunda pagina"])
+    srv = StubServer(lambda m, p, b: (200, {"ETag": '"v1"'}, pdf))
+    try:
+        res = asyncio.run(afetch_pdf_text(f"{srv.url}/a.pdf"))
+    finally:
+        srv.close()
+    assert res.text == "Primeira pagina\nSegunda pagina"
+    assert res.etag == '"v1"'
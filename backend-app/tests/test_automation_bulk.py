@@ -0,0 +1,94 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from documents.models import Document, DocumentContent, Signer
+from documents.repo.orm import DocumentRepoORM
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/automations/create_send/bulk/"
+
+
+def _item(i, **extra):
+    return {
+        "name": f"Contrato {i}",
+        "signers": [
+            {"name": "João", "email": f"joao{i}@ex.com"},
+            {"name": "Maria", "email": f"maria{i}@ex.com"},
+        ],
+        "content_type": "markdown",
+        "markdown_text": f"# Contrato {i}",
+        **extra,
+    }
+
+
+def test_bulk_create_send(api, auth_headers, company):
+    r = api.post(URL, [_item(i) for i in range(3)], format="json", **auth_headers)
+    assert r.status_code == 201
+    results = r.json()["results"]
+    assert [x["status"] for x in results] == ["sent"] * 3
+    assert all(x["open_id"] == 999 and x["token"] == "doc-token" for x in results)
+
+    ids = [x["document_id"] for x in results]
+    assert Document.objects.filter(id__in=ids, company=company).count() == 3
+    assert DocumentContent.objects.filter(document_id__in=ids).count() == 3
+    assert set(Signer.objects.filter(document_id__in=ids).values_list("token", flat=True)) == {"sign-token"}
+
+
+def test_bulk_query_count_is_constant(api, auth_headers, company, django_assert_max_num_queries):
+    # auth + company + 3 inserts + reload (3) + 2 bulk_update + 2 upserts do resumo (+ savepoints)
+    with django_assert_max_num_queries(16):
+        r = api.post(URL, [_item(i) for i in range(25)], format="json", **auth_headers)
+    assert r.status_code == 201
+
+
+def test_bulk_rejects_whole_batch_on_invalid_item(api, auth_headers):
+    bad = _item(1, signers=[{"name": "A", "email": "a@ex.com"}, {"name": "B", "email": "A@ex.com"}])
+    r = api.post(URL, [_item(0), bad], format="json", **auth_headers)
+    assert r.status_code == 400
+    assert "1" in r.json()["errors"]
+    assert Document.objects.count() == 0
+
+
+def test_bulk_reports_per_item_dispatch_errors(api, auth_headers, monkeypatch):
+    def flaky(api_token, payload):
+        if payload["name"].endswith("1"):
+            raise RuntimeError("timeout")
+        return {"open_id": 1, "token": "t", "status": "sent", "signers": []}
+
+    monkeypatch.setattr("documents.usecases.send_to_zapsign.zs_create", flaky)
+    r = api.post(URL, [_item(0), _item(1)], format="json", **auth_headers)
+    assert r.status_code == 207
+    a, b = r.json()["results"]
+    assert a["status"] == "sent" and "error" not in a
+    assert b["status"] == "draft" and "timeout" in b["error"]
+
+
+def _payload(company, i, signers=5):
+    return {
+        "company": company.id,
+        "name": f"Doc {i}",
+        "signers": [{"name": f"S{j}", "email": f"s{j}@ex.com"} for j in range(signers)],
+    }
+
+
+def test_repo_create_queries_do_not_grow_with_batch(company):
+    repo = DocumentRepoORM()
+    with CaptureQueriesContext(connection) as one:
+        doc = repo.create_document_with_signers(_payload(company, 0))
+    with CaptureQueriesContext(connection) as many:
+        docs = repo.create_documents_with_signers([_payload(company, i, signers=20) for i in range(30)])
+
+    assert doc.signers.count() == 5
+    assert Signer.objects.filter(document__in=docs).count() == 600
+    # savepoint + company + 1 INSERT por tabela + upsert do resumo + release
+    assert len(many) == len(one) == 6
+
+
+def test_repo_create_rolls_back_document_when_signers_fail(company):
+    dup = _payload(company, 0, signers=1)
+    dup["signers"].append(dict(dup["signers"][0]))  # viola uniq_signer_per_document
+    with pytest.raises(IntegrityError):
+        DocumentRepoORM().create_document_with_signers(dup)
+    assert not Document.objects.filter(name="Doc 0").exists()
@@ -0,0 +1,82 @@
+import pytest
+from django.utils import timezone
+
+from documents.models import Document, DocumentContent, Signer
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.get_status import GetZapSignStatus
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def doc(company, make_document):
+    d = make_document(company, status="sent")
+    d.token = "tok"
+    d.save(update_fields=["token"])
+    Signer.objects.create(document=d, name="A", email="a@ex.com")
+    DocumentContent.objects.create(document=d, content_type="markdown", markdown_text="# Oi", sha256="abc")
+    return d
+
+
+@pytest.mark.parametrize("url", ["/api/documents/", "/api/documents/{id}/"])
+def test_document_list_and_detail_return_304_without_reading_rows(api, doc, url, django_assert_num_queries):
+    url = url.format(id=doc.id)
+    r = api.get(url)
+    assert r.status_code == 200 and r["ETag"].startswith('W/"')
+
+    with django_assert_num_queries(1):  # só o agregado
+        again = api.get(url, HTTP_IF_NONE_MATCH=r["ETag"])
+    assert again.status_code == 304 and not again.content
+
+    DocumentRepoORM().save_document_fields(Document.objects.get(pk=doc.pk), name="Outro")
+    assert api.get(url, HTTP_IF_NONE_MATCH=r["ETag"]).status_code == 200
+
+
+def test_only_detail_sends_last_modified(api, doc):
+    r = api.get(f"/api/documents/{doc.id}/")
+    assert api.get(f"/api/documents/{doc.id}/", HTTP_IF_MODIFIED_SINCE=r["Last-Modified"]).status_code == 304
+    assert "Last-Modified" not in api.get("/api/documents/")
+
+
+def test_list_etag_changes_when_a_document_is_deleted(api, company, doc, make_document):
+    other = make_document(company, name="Velho")
+    r = api.get("/api/documents/")
+    other.delete()
+    assert api.get("/api/documents/", HTTP_IF_NONE_MATCH=r["ETag"]).status_code == 200
+    # só com If-Modified-Since (sem Last-Modified na coleção) nunca é 304
+    assert api.get("/api/documents/", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT").status_code == 200
+
+
+def test_signer_change_from_status_poll_invalidates_document(api, auth_headers, doc, monkeypatch):
+    etag = api.get(f"/api/documents/{doc.id}/")["ETag"]
+    payload = {"status": "sent", "signers": []}
+    monkeypatch.setattr("documents.usecases.get_status.zs_status", lambda api_token, remote_id: payload)
+
+    # consulta sem mudanças: só status_synced_at, o documento não conta como alterado
+    GetZapSignStatus(repo=DocumentRepoORM()).execute(doc.id)
+    assert api.get(f"/api/documents/{doc.id}/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    payload["signers"] = [{"email": "A@ex.com", "status": "signed"}]
+    GetZapSignStatus(repo=DocumentRepoORM()).execute(doc.id)
+    r = api.get(f"/api/documents/{doc.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200 and r.json()["signers"][0]["status"] == "signed"
+
+
+def test_content_etag_follows_the_text(api, doc):
+    url = f"/api/documents/{doc.id}/content/"
+    etag = api.get(url)["ETag"]
+    assert api.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    api.put(url, {"content_type": "markdown", "markdown_text": "# Novo"}, format="json")
+    r = api.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200 and r.json()["markdown_text"] == "# Novo"
+
+
+def test_report_returns_304_per_company(api, auth_headers, doc, company):
+    url = "/api/automations/reports/documents/"
+    r = api.get(url, **auth_headers)
+    assert r.status_code == 200 and "ETag" in r and "Last-Modified" not in r
+
+    assert api.get(url, HTTP_IF_NONE_MATCH=r["ETag"], **auth_headers).status_code == 304
+    Document.objects.filter(pk=doc.pk).update(last_updated_at=timezone.now())
+    assert api.get(url, HTTP_IF_NONE_MATCH=r["ETag"], **auth_headers).status_code == 200
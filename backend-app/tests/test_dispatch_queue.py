@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+import documents.usecases.send_to_zapsign as send_mod
+from documents.models import DispatchJobStatus, Document, DocumentContent, Signer, ZapSignDispatchJob
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.dispatch_queue import ProcessZapSignQueue
+
+# o worker usa conexões próprias (threads), então os dados precisam estar commitados
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def queue_mode(settings):
+    settings.ZS_DISPATCH = "queue"
+
+
+@pytest.fixture
+def ready_document(company, make_document):
+    doc = make_document(company, name="Contrato")
+    Signer.objects.create(document=doc, name="João", email="joao@ex.com")
+    DocumentContent.objects.create(document=doc, content_type="markdown", markdown_text="# Contrato")
+    return doc
+
+
+def test_send_enqueues_and_returns_202(api, ready_document):
+    r = api.post(f"/api/documents/{ready_document.id}/send_to_zapsign/")
+    assert r.status_code == 202
+    assert r.json()["status"] == "queued"
+    job = ZapSignDispatchJob.objects.get(document=ready_document)
+    assert job.status == DispatchJobStatus.PENDING
+
+
+def test_worker_drains_queue(api, ready_document):
+    api.post(f"/api/documents/{ready_document.id}/send_to_zapsign/")
+    call_command("process_zapsign_queue", "--once", "--workers", "2")
+
+    ready_document.refresh_from_db()
+    assert ready_document.status == "sent"
+    assert ready_document.open_id == 999
+    assert ready_document.signers.get().token == "sign-token"
+    assert ZapSignDispatchJob.objects.get().status == DispatchJobStatus.DONE
+
+
+def test_worker_retries_then_fails_back_to_draft(api, ready_document, monkeypatch):
+    def boom(api_token, payload):
+        raise RuntimeError("ZapSign 503")
+
+    monkeypatch.setattr("documents.usecases.send_to_zapsign.zs_create", boom)
+    api.post(f"/api/documents/{ready_document.id}/send_to_zapsign/")
+
+    call_command("process_zapsign_queue", "--once", "--max-attempts", "2", "--backoff-base", "0")
+    job = ZapSignDispatchJob.objects.get()
+    assert job.status == DispatchJobStatus.FAILED
+    assert job.attempts == 2
+    assert "503" in job.last_error
+    assert Document.objects.get(id=ready_document.id).status == "draft"
+
+
+def test_create_send_automation_is_accepted(api, auth_headers):
+    r = api.post("/api/automations/create_send/", {
+        "name": "Contrato",
+        "signers": [{"name": "João", "email": "joao@ex.com"}],
+        "content_type": "markdown",
+        "markdown_text": "# Contrato",
+    }, format="json", **auth_headers)
+    assert r.status_code == 202
+    assert r.json()["status"] == "queued"
+
+
+def test_job_taken_over_after_lease_expiry_is_not_sent_twice(api, ready_document, monkeypatch):
+    calls, real = [], send_mod.zs_create
+    monkeypatch.setattr(send_mod, "zs_create", lambda token, payload: calls.append(payload) or real(token, payload))
+    api.post(f"/api/documents/{ready_document.id}/send_to_zapsign/")
+
+    slow = ProcessZapSignQueue(DocumentRepoORM(), lease_seconds=60)
+    fast = ProcessZapSignQueue(DocumentRepoORM(), lease_seconds=60)
+    [stale] = slow.claim(1)
+    # ficou na fila do pool além do lease: outro worker reserva e envia
+    ZapSignDispatchJob.objects.update(next_attempt_at=timezone.now())
+    [fresh] = fast.claim(1)
+    assert fast.run_job(fresh) is True
+
+    assert slow.run_job(stale) is None  # não começa: a tentativa já não é dele
+    assert len(calls) == 1
+    assert ZapSignDispatchJob.objects.get().status == DispatchJobStatus.DONE
+    assert not DocumentRepoORM().fail_dispatch_job(stale, "atrasado")
+    assert ZapSignDispatchJob.objects.get().status == DispatchJobStatus.DONE
+
+
+def test_worker_claims_only_for_free_threads(api, company, make_document, monkeypatch):
+    for i in range(5):
+        doc = make_document(company, name=f"Doc {i}")
+        Signer.objects.create(document=doc, name="A", email="a@ex.com")
+        DocumentContent.objects.create(document=doc, content_type="markdown", markdown_text="# Oi")
+        api.post(f"/api/documents/{doc.id}/send_to_zapsign/")
+
+    limits, real = [], DocumentRepoORM.claim_dispatch_jobs
+    monkeypatch.setattr(DocumentRepoORM, "claim_dispatch_jobs",
+                        lambda self, limit, lease: limits.append(limit) or real(self, limit, lease))
+    call_command("process_zapsign_queue", "--once", "--workers", "2", "--batch", "50")
+
+    assert max(limits) <= 2
+    assert set(ZapSignDispatchJob.objects.values_list("status", flat=True)) == {DispatchJobStatus.DONE}
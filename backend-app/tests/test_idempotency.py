@@ -0,0 +1,140 @@
+import io
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from documents.models import Company, Document, IdempotencyKey
+
+URL = "/api/automations/create_send/"
+BODY = {
+    "name": "Contrato", "signers": [{"name": "A", "email": "a@ex.com"}],
+    "content_type": "markdown", "markdown_text": "# Oi",
+}
+
+
+@pytest.fixture
+def zs_calls(monkeypatch):
+    import documents.usecases.send_to_zapsign as mod
+
+    calls, real = [], mod.zs_create
+
+    def counting(api_token, payload):
+        calls.append(payload)
+        return real(api_token, payload)
+
+    monkeypatch.setattr(mod, "zs_create", counting)
+    return calls
+
+
+@pytest.mark.django_db
+def test_create_send_retry_replays_first_response(api, auth_headers, zs_calls):
+    first = api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="n8n-1", **auth_headers)
+    again = api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="n8n-1", **auth_headers)
+
+    assert first.status_code == again.status_code == 201
+    assert again.json() == first.json() and again["Idempotent-Replayed"] == "true"
+    assert Document.objects.count() == 1 and len(zs_calls) == 1
+
+    other = api.post(URL, {**BODY, "name": "Outro"}, format="json", HTTP_IDEMPOTENCY_KEY="n8n-1", **auth_headers)
+    assert other.status_code == 422
+    assert api.post(URL, BODY, format="json", **auth_headers).status_code == 201  # sem header: nada muda
+    assert Document.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_keys_are_scoped_per_company(api, auth_headers, company, zs_calls):
+    Company.objects.create(name="Outra", api_token="other-token")
+    api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="k", **auth_headers)
+    r = api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="k", HTTP_X_API_KEY="other-token")
+    assert r.status_code == 201 and "Idempotent-Replayed" not in r
+    assert IdempotencyKey.objects.filter(key="k").count() == 2
+
+
+@pytest.mark.django_db
+def test_errors_are_not_stored_and_send_is_replayed(api, company, zs_calls):
+    bad = api.post("/api/documents/", {"company": company.id, "name": "X", "signers": []},
+                   format="json", HTTP_IDEMPOTENCY_KEY="doc-1")
+    assert bad.status_code == 400 and not IdempotencyKey.objects.exists()
+
+    ok = api.post("/api/documents/", {"company": company.id, "name": "X", "signers": [{"name": "A", "email": "a@ex.com"}]},
+                  format="json", HTTP_IDEMPOTENCY_KEY="doc-1")
+    assert ok.status_code == 201
+
+    url = f"/api/documents/{ok.json()['id']}/send_to_zapsign/"
+    api.put(f"/api/documents/{ok.json()['id']}/content/", {"content_type": "markdown", "markdown_text": "# Oi"},
+            format="json")
+    sent = api.post(url, HTTP_IDEMPOTENCY_KEY="send-1")
+    again = api.post(url, HTTP_IDEMPOTENCY_KEY="send-1")  # sem a chave seria 400 (já enviado)
+    assert sent.status_code == again.status_code == 200 and len(zs_calls) == 1
+    assert api.post(url).status_code == 400
+
+
+@pytest.mark.django_db
+def test_expired_keys_run_again_and_are_purged(api, auth_headers, zs_calls, settings):
+    api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="old", **auth_headers)
+    IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS + 1))
+
+    r = api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="old", **auth_headers)
+    assert r.status_code == 201 and "Idempotent-Replayed" not in r and len(zs_calls) == 2
+
+    IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=3))
+    call_command("purge_idempotency_keys", stdout=io.StringIO())
+    assert not IdempotencyKey.objects.exists()
+
+
+@pytest.mark.django_db
+def test_abandoned_in_progress_key_is_taken_over(api, auth_headers, company, zs_calls, settings):
+    api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="crash", **auth_headers)
+    IdempotencyKey.objects.update(status_code=None, response_body=None)  # processo morreu no meio
+    busy = api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="crash", **auth_headers)
+    assert busy.status_code == 409 and busy["Retry-After"]
+
+    IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS + 1))
+    r = api.post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="crash", **auth_headers)
+    assert r.status_code == 201 and "Idempotent-Replayed" not in r and len(zs_calls) == 2
+    assert IdempotencyKey.objects.get().status_code == 201
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_duplicate_gets_409_and_nothing_is_locked_during_the_call(company, zs_calls, monkeypatch):
+    import documents.usecases.send_to_zapsign as mod
+
+    counting, in_transaction = mod.zs_create, []
+    entered, dup_answered = threading.Event(), threading.Event()
+
+    def checking(api_token, payload):
+        in_transaction.append(connection.in_atomic_block)
+        entered.set()  # a chave já está reservada
+        dup_answered.wait(10)  # segura a primeira até a duplicata responder
+        return counting(api_token, payload)
+
+    monkeypatch.setattr(mod, "zs_create", checking)
+    results = []
+
+    def post():
+        try:
+            r = APIClient().post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="race",
+                                 HTTP_X_API_KEY=company.api_token)
+            results.append((r.status_code, r.get("Retry-After")))
+        finally:
+            connection.close()
+
+    first = threading.Thread(target=post)
+    first.start()
+    assert entered.wait(10)
+    try:
+        post()  # duplicata, com a primeira dentro da chamada à ZapSign
+    finally:
+        dup_answered.set()
+    first.join()
+
+    assert sorted(results) == [(201, None), (409, "2")]
+    assert in_transaction == [False]  # a chamada HTTP não segura transação/lock
+    replay = APIClient().post(URL, BODY, format="json", HTTP_IDEMPOTENCY_KEY="race", HTTP_X_API_KEY=company.api_token)
+    assert replay.status_code == 201 and replay["Idempotent-Replayed"] == "true"
+    assert Document.objects.count() == 1 and len(zs_calls) == 1
@@ -0,0 +1,61 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+
+from documents.models import DocumentContent, Signer
+from documents.serializers import CompanySerializer, DocumentContentSerializer, DocumentSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def doc(company, make_document):
+    d = make_document(company)
+    Signer.objects.create(document=d, name="A", email="a@ex.com")
+    DocumentContent.objects.create(document=d, content_type="markdown", markdown_text="# Oi")
+    return d
+
+
+def test_links_match_drf_reverse(company, doc):
+    req = Request(APIRequestFactory().get("/api/documents/", HTTP_HOST="localhost:8000"))
+    ctx = {"request": req}
+
+    data = DocumentSerializer(doc, context=ctx).data
+    assert data["links"] == {
+        "self": reverse("document-detail", args=[doc.pk], request=req),
+        "send": reverse("document-send-to-zapsign", args=[doc.pk], request=req),
+        "status": reverse("document-status", args=[doc.pk], request=req),
+        "content": reverse("document-content", args=[doc.pk], request=req),
+        "analysis": reverse("document-analysis", args=[doc.pk], request=req),
+    }
+    assert data["links"]["self"].startswith("http://localhost:8000/")
+    signer = doc.signers.get()
+    assert data["signers"][0]["links"] == {
+        "self": reverse("signer-detail", args=[signer.pk], request=req),
+        "document": reverse("document-detail", args=[doc.pk], request=req),
+    }
+    assert CompanySerializer(company, context=ctx).data["links"]["documents"] == (
+        reverse("document-list", request=req) + f"?company={company.pk}"
+    )
+    # sem request: caminhos relativos, como o reverse do DRF
+    assert DocumentContentSerializer(doc.content).data["links"] == {
+        "document": reverse("document-detail", args=[doc.pk]),
+    }
+
+
+def test_links_false_drops_links_everywhere(api, doc):
+    item = api.get("/api/documents/?links=false").json()[0]
+    assert "links" not in item and "links" not in item["signers"][0]
+    assert "links" in api.get("/api/documents/").json()[0]
+
+
+def test_fields_limits_top_level_only_on_reads(api, company, doc):
+    item = api.get("/api/documents/?fields=id,status,signers").json()[0]
+    assert set(item) == {"id", "status", "signers"}
+    assert set(item["signers"][0]) == {"id", "name", "email", "external_id", "status", "links"}
+
+    r = api.post("/api/documents/?fields=id", {
+        "company": company.id, "name": "Novo", "signers": [{"name": "B", "email": "b@ex.com"}],
+    }, format="json")
+    assert r.status_code == 201 and r.json()["name"] == "Novo"
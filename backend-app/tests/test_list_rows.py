@@ -0,0 +1,58 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from documents.models import Document, Signer
+from documents.serializers import DocumentSerializer, ReportDocumentSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def documents(company, make_document):
+    docs = []
+    for i in range(4):
+        doc = make_document(company, name=f"Doc {i}", status="sent" if i % 2 else "draft")
+        for j in range(i):  # Doc 0 sem signatários
+            Signer.objects.create(document=doc, name=f"S{j}", email=f"s{j}-{i}@ex.com")
+        docs.append(doc)
+    return docs
+
+
+def _expected(query=""):
+    req = Request(APIRequestFactory().get(f"/api/documents/{query}", HTTP_HOST="testserver"))
+    qs = Document.objects.prefetch_related("signers").order_by("-created_at", "-id")
+    data = DocumentSerializer(qs, many=True, context={"request": req}).data
+    for item in data:
+        if "signers" in item:
+            item["signers"] = sorted(item["signers"], key=lambda s: s["id"])
+    return data
+
+
+@pytest.mark.parametrize("query", ["", "?links=false", "?fields=id,status,signers", "?fields=name"])
+def test_list_matches_document_serializer(api, documents, query):
+    assert api.get(f"/api/documents/{query}").json() == _expected(query)
+
+
+def test_list_queries_do_not_grow_with_rows(api, documents, django_assert_num_queries):
+    # agregado do ETag + documentos + signatários
+    with django_assert_num_queries(3):
+        assert len(api.get("/api/documents/").json()) == 4
+
+
+def test_list_paginates_only_with_limit(api, documents):
+    assert isinstance(api.get("/api/documents/").json(), list)
+
+    body = api.get("/api/documents/?limit=3&offset=0").json()
+    assert body["count"] == 4 and body["previous"] is None
+    assert [d["name"] for d in body["results"]] == ["Doc 3", "Doc 2", "Doc 1"]
+    assert [d["name"] for d in api.get(body["next"]).json()["results"]] == ["Doc 0"]
+
+
+def test_report_items_match_report_serializer(api, auth_headers, documents):
+    items = api.get("/api/automations/reports/documents/", **auth_headers).json()["items"]
+    qs = Document.objects.prefetch_related("signers").order_by("-created_at", "-id")
+    expected = ReportDocumentSerializer(qs, many=True).data
+    for item in expected:
+        item["signers"] = sorted(item["signers"], key=lambda s: s["id"])
+    assert items == expected
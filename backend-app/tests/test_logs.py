@@ -0,0 +1,126 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from documents.logs import (
+    CorrelationFilter, JsonFormatter, QueueLogHandler, SamplingFilter, current_context, dropped_records, log_context,
+)
+
+
+@pytest.fixture
+def records():
+    # handler com os mesmos filtros da config, guardando os records
+    got = []
+
+    class _Keep(logging.Handler):
+        def emit(self, record):
+            got.append(record)
+
+    h = _Keep(level=logging.DEBUG)
+    h.addFilter(CorrelationFilter())
+    root = logging.getLogger("documents")
+    old_level = root.level
+    root.addHandler(h)
+    root.setLevel(logging.DEBUG)
+    yield got
+    root.removeHandler(h)
+    root.setLevel(old_level)
+
+
+def test_sampling_filter_only_drops_low_levels():
+    f = SamplingFilter("documents.usecases.get_status=0,documents.services=1")
+    mk = lambda name, level: logging.makeLogRecord({"name": name, "levelno": level})  # noqa: E731
+
+    assert not f.filter(mk("documents.usecases.get_status", logging.INFO))
+    assert not f.filter(mk("documents.usecases.get_status.poll", logging.DEBUG))  # filho herda
+    assert f.filter(mk("documents.usecases.get_status", logging.WARNING))
+    assert f.filter(mk("documents.services.ai", logging.INFO))
+    assert f.filter(mk("outro", logging.INFO))
+
+
+def test_json_formatter_includes_context_extra_and_exception():
+    logger = logging.getLogger("documents.tests")
+    record = None
+    with log_context(request_id="r-1", document_id=7):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            record = logger.makeRecord(logger.name, logging.ERROR, __file__, 1, "falhou %s", ("x",),
+                                       exc_info=sys.exc_info(), extra={"attempt": 2})
+        CorrelationFilter().filter(record)
+    assert current_context() == {}
+
+    out = json.loads(JsonFormatter().format(record))
+    assert out["msg"] == "falhou x" and out["level"] == "ERROR"
+    assert (out["request_id"], out["document_id"], out["attempt"]) == ("r-1", 7, 2)
+    assert "ZeroDivisionError" in out["exc"]
+
+
+def test_queue_handler_writes_json_off_thread(capsys):
+    h = QueueLogHandler()
+    h.addFilter(CorrelationFilter())
+    logger = logging.getLogger("documents.tests.queue")
+    logger.addHandler(h)
+    logger.propagate = False
+    try:
+        with log_context(request_id="abc"):
+            logger.warning("evento %d", 1)
+        h.flush()
+    finally:
+        logger.removeHandler(h)
+        logger.propagate = True
+        h.close()
+
+    line = json.loads(capsys.readouterr().out.strip())
+    assert line["msg"] == "evento 1" and line["request_id"] == "abc"
+
+
+def test_full_queue_drops_only_below_warning(capsys):
+    h = QueueLogHandler(fmt="text", maxsize=1)  # listener parado: a fila enche no primeiro
+    before = dropped_records()
+    try:
+        for level, msg in [(logging.INFO, "primeiro"), (logging.INFO, "descartado"), (logging.ERROR, "erro")]:
+            h.enqueue(h.prepare(logging.LogRecord("x", level, __file__, 1, msg, None, None)))
+    finally:
+        h.close()
+
+    out = capsys.readouterr().out
+    assert "erro" in out and "descartado" not in out
+    assert h.dropped == 1 and dropped_records() == before + 1
+
+
+@pytest.mark.django_db
+def test_request_id_reaches_logs_and_response(api, auth_headers, company, make_document, monkeypatch, records):
+    doc = make_document(company, status="sent")
+    doc.token = "tok"
+    doc.save(update_fields=["token"])
+    monkeypatch.setattr("documents.usecases.get_status.zs_status",
+                        lambda api_token, remote_id: {"status": "signed", "signers": []})
+
+    r = api.get(f"/api/documents/{doc.id}/status/", HTTP_X_REQUEST_ID="req-42", **auth_headers)
+    assert r.status_code == 200 and r["X-Request-ID"] == "req-42"
+    assert api.get("/health/")["X-Request-ID"]  # gerado quando não vem do proxy
+
+    mine = [x for x in records if x.name == "documents.usecases.get_status"]
+    assert {x.levelname for x in mine} == {"DEBUG", "INFO"}
+    assert all((x.request_id, x.document_id) == ("req-42", doc.id) for x in mine)
+
+
+@pytest.mark.django_db
+def test_create_send_logs_structured_debug_instead_of_print(api, auth_headers, company, capsys, records):
+    r = api.post("/api/automations/create_send/", {
+        "name": "Contrato", "signers": [{"name": "A", "email": "a@ex.com"}],
+        "content_type": "markdown", "markdown_text": "# Oi",
+    }, format="json", HTTP_X_REQUEST_ID="req-7", **auth_headers)
+    assert r.status_code == 201
+
+    sent = [x for x in records if x.name == "documents.usecases.send_to_zapsign"]
+    assert [x.levelno for x in sent] == [logging.DEBUG]
+    assert (sent[0].request_id, sent[0].document_id, sent[0].company_id) == ("req-7", r.json()["document_id"], company.id)
+
+    for h in logging.getLogger().handlers:
+        h.flush()
+    out = capsys.readouterr().out
+    assert all(json.loads(line) for line in out.splitlines())  # só logs JSON, nenhum print
@@ -0,0 +1,133 @@
+import re
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from documents import metrics
+from documents.services.zapsign import ZapSignClient
+from stubs import StubServer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(settings):
+    settings.METRICS_SERVER_TIMING = True
+    for h in metrics.HISTOGRAMS:
+        h.clear()
+
+
+def _timing(response) -> dict:
+    out = {}
+    for part in response["Server-Timing"].split(", "):
+        name, *attrs = part.split(";")
+        out[name] = dict(a.split("=", 1) for a in attrs)
+    return out
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    want = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    for line in text.splitlines():
+        if line.startswith(f"{name}{{") and want in line:
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{name} {labels} não encontrado")
+
+
+def test_server_timing_counts_queries(api, auth_headers, company, make_document):
+    for i in range(3):
+        make_document(company, name=f"D{i}")
+    r = api.get("/api/documents/", **auth_headers)
+    assert r.status_code == 200
+
+    timing = _timing(r)
+    assert re.fullmatch(r'"\d+ queries"', timing["db"]["desc"])
+    assert int(timing["db"]["desc"].strip('"').split()[0]) >= 1
+    assert float(timing["total"]["dur"]) >= float(timing["db"]["dur"])
+
+
+def test_server_timing_is_off_unless_enabled(api, settings):
+    settings.METRICS_SERVER_TIMING = False
+    assert "Server-Timing" not in api.get("/api/documents/")
+
+
+def test_metrics_endpoint_exposes_histograms(api, auth_headers, company, settings):
+    settings.METRICS_PUBLIC = True
+    api.get("/api/documents/", **auth_headers)
+    r = api.get("/metrics")
+    assert r.status_code == 200 and r["Content-Type"].startswith("text/plain")
+    text = r.content.decode()
+
+    assert "# TYPE zapflow_http_request_duration_seconds histogram" in text
+    assert "# TYPE zapflow_log_records_dropped_total counter" in text
+    view = re.search(r'zapflow_db_queries_per_request_count\{view="([^"]*documents[^"]*)"\} 1', text).group(1)
+    # buckets acumulados terminam em +Inf == _count
+    assert _sample(text, "zapflow_db_queries_per_request_bucket", view=view, le="+Inf") == 1
+    assert _sample(text, "zapflow_http_request_duration_seconds_count", view=view, method="GET", status="200") == 1
+
+
+def test_metrics_token(api, settings):
+    settings.METRICS_TOKEN = ""
+    assert api.get("/metrics").status_code == 403  # sem token configurado: fechado
+
+    settings.METRICS_TOKEN = "scrape-me"
+    assert api.get("/metrics").status_code == 401
+    assert api.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-me").status_code == 200
+
+
+def test_query_counters_are_safe_across_pool_threads():
+    stats = metrics.RequestStats()
+
+    def work():
+        for _ in range(10_000):
+            stats.add_query(0.001)
+
+    threads = [threading.Thread(target=metrics.in_request_context(work)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stats.db_count == 80_000 and stats.db_time == pytest.approx(80.0)
+
+
+def test_external_calls_are_timed_per_request_and_outside_requests():
+    stub = StubServer(lambda m, p, b: (200, {}, {"status": "sent"}) if m == "GET" else (400, {}, {"x": 1}))
+    client = ZapSignClient(stub.url, max_retries=0)
+    try:
+        stats = metrics.RequestStats()
+        token = metrics._current.set(stats)
+        try:
+            client.get_status("tok", "abc")
+            with pytest.raises(Exception):
+                client.create_document("tok", {})
+        finally:
+            metrics._current.reset(token)
+        client.get_status("tok", "abc")  # fora de request (ex.: comando)
+    finally:
+        client.close()
+        stub.close()
+
+    assert [s for s, _ in stats.calls] == ["zapsign", "zapsign"]
+    assert 'zapsign;dur=' in metrics.server_timing(stats, 0.1) and 'desc="2 calls"' in metrics.server_timing(stats, 0.1)
+    text = "\n".join(metrics.EXTERNAL_SECONDS.render())
+    assert _sample(text, "zapflow_external_call_duration_seconds_count",
+                   service="zapsign", view="unmatched", outcome="ok") == 1
+    assert _sample(text, "zapflow_external_call_duration_seconds_count",
+                   service="zapsign", view="unmatched", outcome="error") == 1
+    assert _sample(text, "zapflow_external_call_duration_seconds_count",
+                   service="zapsign", view="-", outcome="ok") == 1
+
+
+def test_async_views_count_queries_made_in_sync_to_async(company):
+    async def go():
+        return await AsyncClient().post(
+            "/api/automations/async/create_send/",
+            {"name": "C", "signers": [{"name": "A", "email": "a@ex.com"}],
+             "content_type": "markdown", "markdown_text": "# C"},
+            content_type="application/json", headers={"X-API-Key": company.api_token},
+        )
+
+    r = async_to_sync(go)()
+    assert r.status_code == 201
+    assert int(_timing(r)["db"]["desc"].strip('"').split()[0]) >= 3
@@ -0,0 +1,51 @@
+import hashlib
+import io
+
+import pytest
+from stubs import StubServer, make_pdf
+
+from documents.services.pdf_text import PdfTooLargeError, fetch_pdf_text, iter_pdf_text, iter_pdf_url_text
+
+PAGES = [f"Pagina {i} do contrato" for i in range(1, 13)]
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    return make_pdf(PAGES)
+
+
+@pytest.fixture
+def server(pdf_bytes):
+    srv = StubServer(lambda m, p, b: (200, {"Content-Type": "application/pdf"}, pdf_bytes))
+    yield srv
+    srv.close()
+
+
+def test_iter_yields_page_chunks_in_order(pdf_bytes):
+    chunks = list(iter_pdf_text(io.BytesIO(pdf_bytes), max_pages=None, chunk_pages=5))
+    assert len(chunks) == 3
+    assert "Pagina 1 " in chunks[0] and "Pagina 6 " in chunks[1] and "Pagina 12 " in chunks[2]
+
+
+def test_parallel_matches_serial(pdf_bytes):
+    serial = list(iter_pdf_text(io.BytesIO(pdf_bytes), max_pages=None, workers=1, chunk_pages=3))
+    parallel = list(iter_pdf_text(io.BytesIO(pdf_bytes), max_pages=None, workers=2, chunk_pages=3))
+    assert parallel == serial
+
+
+def test_max_pages_limits_extraction(pdf_bytes):
+    text = "".join(iter_pdf_text(io.BytesIO(pdf_bytes), max_pages=2))
+    assert "Pagina 2 " in text and "Pagina 3 " not in text
+
+
+def test_fetch_streams_and_hashes(server, pdf_bytes):
+    res = fetch_pdf_text(f"{server.url}/c.pdf", max_pages=None, workers=2)
+    assert res.sha256 == hashlib.sha256(pdf_bytes).hexdigest()
+    assert res.text.splitlines() == PAGES
+
+
+def test_download_is_capped(server, pdf_bytes):
+    with pytest.raises(PdfTooLargeError):
+        fetch_pdf_text(f"{server.url}/c.pdf", max_bytes=len(pdf_bytes) - 1)
+    with pytest.raises(PdfTooLargeError):
+        list(iter_pdf_url_text(f"{server.url}/c.pdf", max_bytes=100))
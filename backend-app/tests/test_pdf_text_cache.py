@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from stubs import StubServer, make_pdf
+
+from documents.models import DocumentContent
+from documents.services import pdf_text
+
+pytestmark = pytest.mark.django_db
+
+PAGES = ["Contrato de prestacao de servicos entre ACME e Cliente", "Clausula de multa e foro em Sao Paulo"]
+
+
+@pytest.fixture
+def pdf_server():
+    state = {"pdf": make_pdf(PAGES), "etag": '"v1"'}
+
+    def handler(method, path, body):
+        if srv.requests[-1][2].get("If-None-Match") == state["etag"]:
+            return 304, {"ETag": state["etag"]}, b""
+        return 200, {"ETag": state["etag"], "Content-Type": "application/pdf"}, state["pdf"]
+
+    srv = StubServer(handler)
+    srv.state = state
+    yield srv
+    srv.close()
+
+
+@pytest.fixture
+def pdf_doc(company, make_document, pdf_server):
+    doc = make_document(company)
+    DocumentContent.objects.create(document=doc, content_type="url_pdf", pdf_url=f"{pdf_server.url}/c.pdf")
+    return doc
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    real = pdf_text.extract_text
+
+    def spy(*a, **kw):
+        calls.append(1)
+        return real(*a, **kw)
+
+    monkeypatch.setattr(pdf_text, "extract_text", spy)
+    return calls
+
+
+def _expire(doc):
+    DocumentContent.objects.filter(document=doc).update(text_checked_at=timezone.now() - timedelta(days=1))
+
+
+def test_text_is_extracted_once_and_stored(api, pdf_doc, pdf_server, extractions):
+    url = f"/api/documents/{pdf_doc.id}/analysis/"
+    assert api.post(url, {}, format="json").status_code == 200
+    assert api.post(url, {}, format="json").status_code == 200
+
+    assert len(pdf_server.requests) == 1
+    assert len(extractions) == 1
+    content = DocumentContent.objects.get(document=pdf_doc)
+    assert "multa" in content.extracted_text
+    assert content.pdf_etag == '"v1"'
+    assert content.sha256 and content.pdf_sha256
+
+
+def test_revalidation_uses_conditional_get(api, pdf_doc, pdf_server, extractions):
+    url = f"/api/documents/{pdf_doc.id}/analysis/"
+    api.post(url, {}, format="json")
+    _expire(pdf_doc)
+    api.post(url, {}, format="json")
+
+    assert len(pdf_server.requests) == 2
+    assert pdf_server.requests[1][2]["If-None-Match"] == '"v1"'
+    assert len(extractions) == 1
+
+
+def test_changed_pdf_is_reextracted(api, pdf_doc, pdf_server, extractions):
+    url = f"/api/documents/{pdf_doc.id}/analysis/"
+    api.post(url, {}, format="json")
+    pdf_server.state.update(pdf=make_pdf(PAGES + ["Renovacao automatica"]), etag='"v2"')
+    _expire(pdf_doc)
+    api.post(url, {}, format="json")
+
+    assert len(extractions) == 2
+    assert "Renovacao" in DocumentContent.objects.get(document=pdf_doc).extracted_text
+
+
+def test_changing_pdf_url_clears_cached_text(api, pdf_doc, pdf_server):
+    api.post(f"/api/documents/{pdf_doc.id}/analysis/", {}, format="json")
+    r = api.put(f"/api/documents/{pdf_doc.id}/content/",
+                {"content_type": "url_pdf", "pdf_url": f"{pdf_server.url}/outro.pdf"}, format="json")
+    assert r.status_code == 200
+    content = DocumentContent.objects.get(document=pdf_doc)
+    assert content.extracted_text == "" and content.pdf_etag == "" and content.text_checked_at is None
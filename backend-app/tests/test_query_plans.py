@@ -0,0 +1,80 @@
+# Regressão de plano: as queries quentes precisam usar índice (não Seq Scan).
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from documents.models import Company, Document, Signer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="EXPLAIN específico do PostgreSQL"),
+]
+
+
+@pytest.fixture(autouse=True)
+def tenant(db):
+    # volume e estatísticas parecidos com produção: várias empresas/status/dias
+    companies = Company.objects.bulk_create([Company(name=f"E{i}", api_token=f"t{i}") for i in range(10)])
+    statuses = ["draft", "queued", "sent", "signed", "canceled"]
+    docs = Document.objects.bulk_create([
+        Document(company=companies[i % 10], name=f"D{i}", status=statuses[i % 5], token=f"tok-{i}")
+        for i in range(1500)
+    ])
+    Signer.objects.bulk_create([
+        Signer(document=d, name="S", email=f"s{d.id}@ex.com") for d in docs
+    ])
+    with connection.cursor() as cur:
+        cur.execute(
+            "UPDATE documents_document SET created_at = now() - (id % 365) * interval '1 day', "
+            "last_updated_at = now() - (id % 720) * interval '1 hour'"
+        )
+        cur.execute("ANALYZE documents_document")
+        cur.execute("ANALYZE documents_signer")
+        # o resto do custo fica com o planner; só tira o Seq Scan da mesa
+        cur.execute("SET LOCAL enable_seqscan = off")
+    return companies[0]
+
+
+def assert_index_cond(qs, *columns):
+    """Sem Seq Scan e com cada coluna resolvida pelo índice (Index Cond), não por Filter."""
+    out = qs.explain()
+    assert "Seq Scan" not in out, out
+    conds = " ".join(l for l in out.splitlines() if "Index Cond" in l)
+    for col in columns:
+        assert col in conds, out
+
+
+def test_report_by_company_and_date_range(tenant):
+    now = timezone.now()
+    qs = (
+        Document.objects.filter(company=tenant, created_at__gte=now - timedelta(days=7), created_at__lt=now)
+        .order_by("-created_at", "-id")[:50]
+    )
+    assert_index_cond(qs, "company_id", "created_at")
+
+
+def test_report_by_company_status_and_date_range(tenant):
+    now = timezone.now()
+    qs = (
+        Document.objects.filter(company=tenant, status="sent",
+                                created_at__gte=now - timedelta(days=7), created_at__lt=now)
+        .order_by("-created_at", "-id")[:50]
+    )
+    assert_index_cond(qs, "company_id", "status", "created_at")
+
+
+def test_document_list_ordering():
+    out = Document.objects.order_by("-created_at")[:20].explain()
+    assert "Seq Scan" not in out and "Sort" not in out, out
+
+
+def test_stale_documents(tenant):
+    qs = Document.objects.filter(company=tenant, status__in=["draft", "sent"],
+                                 last_updated_at__lte=timezone.now() - timedelta(hours=24))
+    assert_index_cond(qs, "company_id", "status", "last_updated_at")
+
+
+def test_webhook_lookup_by_token():
+    assert_index_cond(Document.objects.filter(token="abc"), "token")
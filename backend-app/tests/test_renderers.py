@@ -0,0 +1,57 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from documents import renderers
+from documents.renderers import ORJSONParser, ORJSONRenderer
+
+PAYLOAD = {
+    "items": ReturnList([ReturnDict({"id": 1, "name": "Contrato ç"}, serializer=None)], serializer=None),
+    "created_at": datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+    "day": datetime.date(2026, 1, 2),
+    "total": decimal.Decimal("10.50"),
+    "label": gettext_lazy("Rascunho"),
+    "uid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "elapsed": datetime.timedelta(seconds=90),
+    "text": "linha\u2028outra",
+    "none": None,
+}
+
+
+@pytest.mark.parametrize("payload", [PAYLOAD, {1: "chave int"}, [], "x"])
+def test_renderer_output_matches_drf(payload):
+    assert ORJSONRenderer().render(payload) == JSONRenderer().render(payload)
+
+
+def test_renderer_falls_back_without_orjson_and_for_indent(monkeypatch):
+    expected = JSONRenderer().render(PAYLOAD, "application/json; indent=4")
+    assert ORJSONRenderer().render(PAYLOAD, "application/json; indent=4") == expected
+
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+    assert ORJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}')) == {"a": [1, 2]}
+
+
+def test_parser_matches_drf_and_rejects_bad_json():
+    body = '{"name": "Ação", "n": 1.5, "ok": true, "x": null}'.encode()
+    assert ORJSONParser().parse(io.BytesIO(body)) == {"name": "Ação", "n": 1.5, "ok": True, "x": None}
+    for bad in (b"{nope", b'{"n": NaN}'):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(bad))
+
+
+@pytest.mark.django_db
+def test_api_uses_fast_json(api, company, make_document):
+    make_document(company)
+    r = api.get("/api/documents/")
+    assert r.status_code == 200 and r.accepted_renderer.__class__ is ORJSONRenderer
+
+    r = api.post("/api/documents/", b"{quebrado", content_type="application/json")
+    assert r.status_code == 400 and r.json()["detail"].startswith("JSON parse error")
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+
+import pytest
+from django.utils import timezone
+from documents.models import Document, Signer
+from documents.repo.orm import DocumentRepoORM
+
+URL = "/api/automations/reports/documents/"
+
+
+@pytest.fixture
+def documents(company, make_document):
+    docs = []
+    for i in range(5):
+        doc = make_document(company, name=f"Doc {i}", status="sent" if i % 2 else "draft")
+        Signer.objects.create(document=doc, name="A", email=f"a{i}@ex.com")
+        Signer.objects.create(document=doc, name="B", email=f"b{i}@ex.com")
+        docs.append(doc)
+    # make_document grava direto no ORM, sem passar pelo resumo materializado
+    DocumentRepoORM().rebuild_status_summary(company.id)
+    return docs
+
+
+def test_report_walks_pages_with_cursor(api, auth_headers, documents):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = api.get(URL, params, **auth_headers).json()
+        assert body["summary"] == {"draft": 3, "sent": 2}
+        seen += [item["id"] for item in body["items"]]
+        assert all(item["signer_count"] == 2 for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [d.id for d in reversed(documents)]
+
+
+def test_report_page_queries_do_not_grow_with_signers(api, auth_headers, documents, django_assert_max_num_queries):
+    # auth + agregado do ETag + summary + página + signers
+    with django_assert_max_num_queries(5):
+        r = api.get(URL, {"limit": 5}, **auth_headers)
+    assert len(r.json()["items"]) == 5
+
+
+def test_report_rejects_bad_cursor(api, auth_headers, documents):
+    r = api.get(URL, {"cursor": "!!nope"}, **auth_headers)
+    assert r.status_code == 400
+
+
+def test_report_streams_ndjson(api, auth_headers, documents):
+    r = api.get(URL, {"output": "ndjson", "status": "draft"}, **auth_headers)
+    assert r.status_code == 200
+    assert r["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(l) for l in b"".join(r.streaming_content).decode().splitlines()]
+    assert [l["name"] for l in lines] == ["Doc 4", "Doc 2", "Doc 0"]
+    assert lines[0]["signer_count"] == 2
+
+
+def test_report_date_range_includes_whole_last_day(api, auth_headers, documents):
+    late = timezone.make_aware(datetime(2025, 3, 10, 23, 59))
+    Document.objects.filter(id=documents[0].id).update(created_at=late)
+    Document.objects.filter(id=documents[1].id).update(created_at=late.replace(day=11, hour=0, minute=0))
+
+    body = api.get(URL, {"date_from": "2025-03-10", "date_to": "2025-03-10"}, **auth_headers).json()
+    assert [i["id"] for i in body["items"]] == [documents[0].id]
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from documents.models import Document, Signer
+
+URL = "/api/automations/reports/stale/"
+
+
+@pytest.fixture
+def aged(company, make_document):
+    def _mk(name, hours, status="sent"):
+        doc = make_document(company, name=name, status=status)
+        Signer.objects.create(document=doc, name="A", email=f"{name}@ex.com")
+        Document.objects.filter(id=doc.id).update(last_updated_at=timezone.now() - timedelta(hours=hours))
+        return doc
+    return _mk
+
+
+def test_stale_returns_only_open_documents_past_threshold(api, auth_headers, aged):
+    aged("velho", 30)
+    aged("rascunho", 48, status="draft")
+    aged("novo", 2)
+    aged("assinado", 72, status="signed")
+
+    body = api.get(URL, {"hours": 24}, **auth_headers).json()
+    assert body["threshold_hours"] == 24
+    assert [i["name"] for i in body["items"]] == ["velho", "rascunho"]
+    assert body["items"][0]["age_hours"] == 30
+    assert body["items"][0]["signer_count"] == 1
+    assert body["next_cursor"] is None
+
+
+def test_stale_filters_status_and_paginates(api, auth_headers, aged, company_b, make_document):
+    for i in range(3):
+        aged(f"doc{i}", 25 + i)
+    aged("rascunho", 48, status="draft")
+    other = make_document(company_b, name="outra empresa", status="sent")
+    Document.objects.filter(id=other.id).update(last_updated_at=timezone.now() - timedelta(days=3))
+
+    first = api.get(URL, {"status": "sent", "limit": 2}, **auth_headers).json()
+    second = api.get(URL, {"status": "sent", "limit": 2, "cursor": first["next_cursor"]}, **auth_headers).json()
+    assert [i["name"] for i in first["items"] + second["items"]] == ["doc0", "doc1", "doc2"]
+    assert second["next_cursor"] is None
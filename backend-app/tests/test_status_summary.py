@@ -0,0 +1,93 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from documents.models import Company, Document, DocumentStatusSummary
+from documents.repo.orm import DocumentRepoORM
+
+URL = "/api/automations/reports/documents/"
+
+
+def summary(company):
+    return DocumentRepoORM().status_summary(company.id)
+
+
+@pytest.fixture
+def create_send(api, auth_headers):
+    def _post(name="Contrato"):
+        return api.post("/api/automations/create_send/", {
+            "name": name,
+            "signers": [{"name": "João", "email": "joao@ex.com"}],
+            "content_type": "markdown",
+            "markdown_text": "# Contrato",
+        }, format="json", **auth_headers)
+    return _post
+
+
+def test_create_send_moves_count_to_sent(company, create_send):
+    create_send()
+    create_send()
+    assert summary(company) == {"sent": 2}
+
+
+def test_status_sync_and_delete_update_summary(api, company, create_send, monkeypatch):
+    doc_id = create_send().json()["document_id"]
+    draft_id = api.post("/api/documents/", {
+        "company": company.id, "name": "Rascunho",
+        "signers": [{"name": "Ana", "email": "ana@ex.com"}],
+    }, format="json").json()["id"]
+    assert summary(company) == {"sent": 1, "draft": 1}
+
+    monkeypatch.setattr("documents.usecases.get_status.zs_status",
+                        lambda token, rid: {"status": "signed", "signers": []})
+    api.get(f"/api/documents/{doc_id}/status/")
+    assert summary(company) == {"signed": 1, "draft": 1}
+
+    assert api.delete(f"/api/documents/{draft_id}/").status_code == 204
+    assert summary(company) == {"signed": 1}
+
+
+def test_report_summary_reads_materialized_table(api, auth_headers, company, create_send):
+    create_send()
+    # a tabela é a fonte do summary: uma divergência proposital aparece no relatório
+    DocumentStatusSummary.objects.filter(company=company, total__gt=0).update(total=42)
+    assert api.get(URL, **auth_headers).json()["summary"] == {"sent": 42}
+
+
+def test_rebuild_command_checks_and_repairs(company, make_document, create_send):
+    create_send()
+    make_document(company, name="Fora do repo")  # criado sem passar pelo repo
+
+    with pytest.raises(CommandError):
+        call_command("rebuild_status_summary", "--check")
+    call_command("rebuild_status_summary")
+    call_command("rebuild_status_summary", "--check")
+    assert summary(company) == {"sent": 1, "draft": 1}
+
+
+def test_concurrent_writers_of_the_same_transition_count_once(company, create_send):
+    doc_id = create_send().json()["document_id"]
+    repo = DocumentRepoORM()
+    # webhook e consulta de status leram "sent" antes de qualquer um gravar
+    first, second, third = (Document.objects.get(id=doc_id) for _ in range(3))
+
+    repo.save_document_fields(first, status="signed")
+    repo.save_document_fields(second, status="signed")
+    third.status = "signed"
+    repo.bulk_save_documents([third], ["status"])
+    assert summary(company) == {"signed": 1}
+
+    repo.delete_document(first)
+    repo.delete_document(second)
+    assert summary(company) == {}
+
+
+def test_document_cannot_move_to_another_company(api, company):
+    other = Company.objects.create(name="Outra", api_token="other-token")
+    doc_id = api.post("/api/documents/", {
+        "company": company.id, "name": "Rascunho", "signers": [{"name": "Ana", "email": "ana@ex.com"}],
+    }, format="json").json()["id"]
+
+    r = api.patch(f"/api/documents/{doc_id}/", {"company": other.id}, format="json")
+    assert r.status_code == 400 and "company" in r.json()
+    assert api.patch(f"/api/documents/{doc_id}/", {"company": company.id, "name": "Novo"}, format="json").status_code == 200
+    assert summary(company) == {"draft": 1} and summary(other) == {}
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from documents.models import Document, Signer
+from documents.repo.orm import DocumentRepoORM
+from documents.usecases.get_status import GetZapSignStatus, SyncZapSignStatus
+from documents.usecases.send_to_zapsign import SendToZapSign
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    calls = []
+
+    def fake_status(api_token, remote_id):
+        calls.append(remote_id)
+        if remote_id == "tok-signed":
+            return {"status": "signed", "signers": [{"email": "JOAO@ex.com", "status": "signed", "token": "s1"}]}
+        if remote_id == "tok-boom":
+            raise RuntimeError("timeout")
+        return {"status": "sent", "signers": []}
+
+    monkeypatch.setattr("documents.usecases.get_status.zs_status", fake_status)
+    return calls
+
+
+def _sent(company, make_document, token, synced_at=None):
+    doc = make_document(company, name=token, status="sent")
+    Document.objects.filter(id=doc.id).update(token=token, status_synced_at=synced_at)
+    Signer.objects.create(document=doc, name="João", email="joao@ex.com")
+    return doc
+
+
+def test_sync_updates_changed_documents_and_signers(company, company_b, make_document, remote):
+    signed = _sent(company, make_document, "tok-signed")
+    same = _sent(company_b, make_document, "tok-same")
+    failing = _sent(company, make_document, "tok-boom")
+    fresh_at = timezone.now()
+    fresh = _sent(company, make_document, "tok-fresh", synced_at=fresh_at)
+    make_document(company, name="draft")
+
+    out = SyncZapSignStatus(DocumentRepoORM(), workers=4, fresh_seconds=60).execute()
+
+    assert sorted(remote) == ["tok-boom", "tok-same", "tok-signed"]
+    assert out["checked"] == 3 and out["errors"] == 1 and out["skipped_fresh"] == 1
+    assert out["documents_updated"] == 1 and out["signers_updated"] == 1
+    assert out["companies"] == 2
+
+    signed.refresh_from_db()
+    assert signed.status == "signed" and signed.status_synced_at is not None
+    s = signed.signers.get()
+    assert (s.status, s.token) == ("signed", "s1")
+
+    same.refresh_from_db()
+    assert same.status == "sent" and same.status_synced_at is not None
+    failing.refresh_from_db()
+    assert failing.status_synced_at is None
+    fresh.refresh_from_db()
+    assert fresh.status_synced_at == fresh_at
+
+
+def test_sync_respects_freshness_window(company, make_document, remote):
+    _sent(company, make_document, "tok-same", synced_at=timezone.now() - timedelta(minutes=10))
+    SyncZapSignStatus(DocumentRepoORM(), fresh_seconds=3600).execute()
+    assert remote == []
+    SyncZapSignStatus(DocumentRepoORM(), fresh_seconds=60).execute()
+    assert remote == ["tok-same"]
+
+
+def test_sync_command_reports_throughput(company, make_document, remote, capsys):
+    _sent(company, make_document, "tok-same")
+    call_command("sync_zapsign_status", "--workers", "2")
+    out = capsys.readouterr().out
+    assert "consultados=1" in out and "docs/s" in out
+
+
+def _many_signers(doc, n=25):
+    Signer.objects.bulk_create([Signer(document=doc, name=f"S{i}", email=f"s{i}@ex.com") for i in range(n)])
+
+
+def test_sync_signers_matches_case_insensitively_and_reports_changes(company, make_document):
+    doc = make_document(company)
+    Signer.objects.create(document=doc, name="João", email="Joao@Ex.com", token="t0")
+    Signer.objects.create(document=doc, name="Ana", email="ana@ex.com", token="same")
+
+    changes = DocumentRepoORM().sync_signers(doc.id, [
+        {"email": " JOAO@ex.com ", "status": "signed", "token": "t1"},
+        {"email": "ana@ex.com", "token": "same"},        # sem mudança
+        {"email": "ghost@ex.com", "token": "x"},         # não pertence ao documento
+        {"email": "ana@ex.com", "status": None},
+    ])
+
+    assert changes == [{"id": doc.signers.get(name="João").id, "email": "Joao@Ex.com",
+                        "fields": {"status": "signed", "token": "t1"}}]
+    assert doc.signers.get(name="João").token == "t1"
+
+
+def test_get_status_updates_all_signers_with_constant_queries(company, make_document, monkeypatch,
+                                                              django_assert_num_queries):
+    doc = _sent(company, make_document, "tok-many")
+    _many_signers(doc)
+    remote = [{"email": f"S{i}@EX.com", "status": "signed", "token": f"t{i}"} for i in range(25)]
+    monkeypatch.setattr("documents.usecases.get_status.zs_status",
+                        lambda api_token, remote_id: {"status": "signed", "signers": remote})
+
+    # doc + signers (prefetch), save do documento + resumo, bulk_update dos signatários
+    with django_assert_num_queries(7):
+        GetZapSignStatus(DocumentRepoORM()).execute(doc.id)
+
+    assert set(doc.signers.exclude(email="joao@ex.com").values_list("status", flat=True)) == {"signed"}
+    assert doc.signers.get(email="s7@ex.com").token == "t7"
+
+
+def test_send_applies_signer_tokens_in_one_update(company, make_document, django_assert_max_num_queries):
+    doc = make_document(company)
+    DocumentRepoORM().upsert_document_content(doc.id, "markdown", markdown_text="# Oi")
+    _many_signers(doc)
+
+    with django_assert_max_num_queries(8):
+        SendToZapSign(DocumentRepoORM()).execute(doc.id)
+
+    assert set(doc.signers.values_list("token", flat=True)) == {"sign-token"}
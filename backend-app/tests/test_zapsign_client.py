@@ -0,0 +1,67 @@
+import pytest
+from stubs import StubServer
+
+from documents.services import zapsign
+from documents.services.zapsign import ExternalServiceError, ZapSignClient
+
+
+@pytest.fixture
+def stub():
+    responses = []
+
+    def handler(method, path, body):
+        if responses:
+            return responses.pop(0)
+        return 200, {}, {"token": "doc-token", "status": "sent", "echo": body}
+
+    s = StubServer(handler)
+    s.responses = responses
+    yield s
+    s.close()
+
+
+def test_reuses_pooled_connection(stub):
+    client = ZapSignClient(stub.url, pool_size=2)
+    for _ in range(5):
+        assert client.get_status("tok", "abc")["status"] == "sent"
+    assert client.create_document("tok", {"name": "x"})["echo"] == {"name": "x"}
+
+    assert stub.connections == 1
+    m = client.metrics()
+    assert m["requests"] == 6
+    assert m["connections_opened"] == 1
+    assert m["pool_hits"] == 5
+    method, path, headers, _ = stub.requests[0]
+    assert (method, path, headers["Authorization"]) == ("GET", "/docs/abc/", "Bearer tok")
+
+
+def test_retries_honouring_retry_after(stub, monkeypatch):
+    slept = []
+    monkeypatch.setattr(zapsign.time, "sleep", slept.append)
+    stub.responses += [(429, {"Retry-After": "3"}, {}), (503, {}, {})]
+
+    client = ZapSignClient(stub.url, max_retries=3, backoff_base=0.5)
+    assert client.get_status("tok", "abc")["status"] == "sent"
+    assert slept[0] == 3.0
+    assert 0 <= slept[1] <= 1.0
+    assert client.metrics()["retries"] == 2
+
+
+def test_post_is_not_retried_on_500(stub, monkeypatch):
+    monkeypatch.setattr(zapsign.time, "sleep", lambda s: None)
+    stub.responses.append((500, {}, {"detail": "erro"}))
+
+    client = ZapSignClient(stub.url)
+    with pytest.raises(ExternalServiceError, match="500"):
+        client.create_document("tok", {"name": "x"})
+    assert len(stub.requests) == 1
+
+
+def test_gives_up_after_max_retries(stub, monkeypatch):
+    monkeypatch.setattr(zapsign.time, "sleep", lambda s: None)
+    stub.responses += [(502, {}, {})] * 3
+
+    client = ZapSignClient(stub.url, max_retries=2)
+    with pytest.raises(ExternalServiceError, match="502"):
+        client.get_status("tok", "abc")
+    assert len(stub.requests) == 3
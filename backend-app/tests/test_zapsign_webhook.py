@@ -0,0 +1,97 @@
+import pytest
+from documents.models import Document, Signer, ZapSignWebhookEvent
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/webhooks/zapsign/"
+SECRET = {"HTTP_X_ZAPSIGN_SECRET": "whsec"}
+
+
+@pytest.fixture(autouse=True)
+def webhook_secret(settings):
+    settings.ZAPSIGN_WEBHOOK_SECRET = "whsec"
+
+
+@pytest.fixture
+def sent_doc(company, make_document):
+    doc = make_document(company, status="sent")
+    Document.objects.filter(id=doc.id).update(token="doc-token")
+    Signer.objects.create(document=doc, name="João", email="joao@ex.com")
+    return doc
+
+
+def _payload(**extra):
+    return {
+        "event_type": "doc_signed",
+        "token": "doc-token",
+        "status": "signed",
+        "signers": [{"email": "Joao@ex.com", "status": "signed", "token": "s-1"}],
+        **extra,
+    }
+
+
+def test_rejects_missing_or_wrong_secret(api, sent_doc):
+    assert api.post(URL, _payload(), format="json").status_code in (401, 403)
+    r = api.post(URL, _payload(), format="json", HTTP_X_ZAPSIGN_SECRET="nope")
+    assert r.status_code in (401, 403)
+    assert Document.objects.get(id=sent_doc.id).status == "sent"
+
+
+def test_applies_status_and_dedupes(api, sent_doc):
+    r = api.post(URL, _payload(event_id="evt-1"), format="json", **SECRET)
+    assert r.status_code == 200
+    assert r.json()["result"] == "applied"
+    sent_doc.refresh_from_db()
+    assert sent_doc.status == "signed"
+    assert sent_doc.status_synced_at is not None
+    assert (sent_doc.signers.get().status, sent_doc.signers.get().token) == ("signed", "s-1")
+
+    r = api.post(URL, _payload(event_id="evt-1"), format="json", **SECRET)
+    assert r.json()["result"] == "duplicate"
+    assert ZapSignWebhookEvent.objects.count() == 1
+
+
+def test_dedupes_by_content_without_event_id(api, sent_doc):
+    api.post(URL, _payload(), format="json", **SECRET)
+    r = api.post(URL, _payload(), format="json", **SECRET)
+    assert r.json()["result"] == "duplicate"
+
+
+def test_unknown_document_is_ignored(api, sent_doc):
+    r = api.post(URL, _payload(token="outro"), format="json", **SECRET)
+    assert r.status_code == 200
+    assert r.json()["result"] == "ignored"
+    assert ZapSignWebhookEvent.objects.count() == 0
+
+
+@pytest.mark.parametrize("bad", [
+    {"status": ["signed"]},
+    {"signers": "joao@ex.com"},
+    {"signers": ["joao@ex.com"]},
+    {"signers": [{"email": {"x": 1}}]},
+    {"open_id": "abc", "token": ""},
+])
+def test_malformed_payload_is_a_400(api, sent_doc, bad):
+    r = api.post(URL, _payload(**bad), format="json", **SECRET)
+    assert r.status_code == 400
+    assert ZapSignWebhookEvent.objects.count() == 0
+    assert Document.objects.get(id=sent_doc.id).status == "sent"
+
+
+def test_late_event_does_not_leave_terminal_status(api, sent_doc):
+    api.post(URL, _payload(event_id="evt-signed"), format="json", **SECRET)
+    r = api.post(URL, _payload(event_id="evt-late", status="sent",
+                               signers=[{"email": "joao@ex.com", "token": "s-2"}]), format="json", **SECRET)
+    assert r.status_code == 200 and r.json()["status"] == "signed"
+    sent_doc.refresh_from_db()
+    assert sent_doc.status == "signed" and sent_doc.signers.get().token == "s-2"
+
+
+
+def test_signers_match_like_the_status_poll(api, sent_doc):
+    # mesmo casamento do sync_signers: sem maiúsculas e sem espaços nas pontas
+    Signer.objects.create(document=sent_doc, name="Maria", email=" Maria@Ex.com")
+    r = api.post(URL, _payload(signers=[{"email": "maria@ex.com ", "status": "signed", "token": "m-1"}]),
+                 format="json", **SECRET)
+    assert r.json()["signers_updated"] == 1
+    assert sent_doc.signers.get(name="Maria").token == "m-1"
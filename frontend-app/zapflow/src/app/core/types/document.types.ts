@@ -13,7 +13,7 @@ export interface Document {
   name: string;
   created_by?: string;
   external_id?: string;
-  status?: 'draft'|'sent'|'signed'|'canceled';
+  status?: 'draft'|'queued'|'sent'|'signed'|'canceled';
   open_id?: number|null;
   token?: string;
   created_at?: string;